@@ -0,0 +1,321 @@
+##############################################################
+# NumPy ile BG-NBD ve Gamma-Gamma Modelleri
+##############################################################
+
+# CLTV adımı artık bakımı yapılmayan lifetimes paketine bağlı. lifetimes log-likelihood'un
+# gradyanını autograd ile sayısal/otomatik türetiyor; milyon müşterili tablolarda yavaş ve
+# zaman zaman yakınsamıyor. Burada aynı modeller:
+# - vektörize log-likelihood ve analitik gradyan (log-parametreler üzerinde) ile,
+# - aynı (frequency, recency, T) ya da (frequency, monetary) değerine sahip müşteriler
+#   ağırlıklı tek satıra sıkıştırılarak (compress=True)
+# kurulur. cltv_prediction.py'deki kullanımla aynı arayüz:
+# BetaGeoFitter(penalizer_coef=...).fit(frequency, recency, T), .predict(t, ...), .params_
+# GammaGammaFitter(penalizer_coef=...).fit(frequency, monetary), .conditional_expected_average_profit,
+# .customer_lifetime_value. Optimizasyon lifetimes ile aynı başlangıç noktası, zaman ölçeklemesi ve
+# cezalandırma ile yapılır; parametreler lifetimes ile aynı çıkar (test_cltv_models.py).
+
+# 1. Log-Likelihood ve Gradyanlar
+# 2. Müşterilerin Sıkıştırılması
+# 3. BetaGeoFitter
+# 4. GammaGammaFitter
+
+import numpy as np
+import pandas as pd
+from scipy.optimize import minimize
+from scipy.special import digamma, gammaln
+
+from bgnbd_predict import customer_lifetime_value, expected_purchases
+
+
+class ConvergenceError(ValueError):
+    pass
+
+
+##############################################################
+# 1. Log-Likelihood ve Gradyanlar
+##############################################################
+
+def _at_counts(function, shift, x, step=1.0):
+    # function(shift + step * x) tamsayı x'ler için: sadece 0..max(x) üzerinde hesaplanıp x ile indekslenir
+    return function(shift + step * np.arange(x.max() + 1))[x]
+
+
+def bgnbd_negative_log_likelihood(log_params, frequency, recency, T, weights, penalizer_coef=0.0):
+    """
+    BG-NBD ortalama negatif log-likelihood'u ve log(r, alpha, a, b)'ye göre gradyanı.
+
+    lifetimes.BetaGeoFitter._negative_log_likelihood ile aynı değer
+    (Fader, Hardie & Lee 2005, bölüm 7). frequency tamsayı olmalı; gammaln/digamma terimleri
+    sadece frequency'ye bağlı olduğu için her müşteri yerine 0..max(frequency) için hesaplanır.
+
+    Returns
+    -------
+    value: float
+    gradient: np.ndarray
+        (4,)
+
+    """
+    params = np.exp(log_params)
+    r, alpha, a, b = params
+    x = frequency
+    repeat = x > 0
+    b_x = b + np.maximum(x, 1) - 1
+    log_alpha_T = np.log(alpha + T)
+    log_alpha_recency = np.log(recency + alpha)
+
+    A_1 = _at_counts(gammaln, r, x) - gammaln(r) + r * np.log(alpha)
+    A_2 = gammaln(a + b) + _at_counts(gammaln, b, x) - gammaln(b) - _at_counts(gammaln, a + b, x)
+    A_3 = -(r + x) * log_alpha_T
+    A_4 = np.log(a) - np.log(b_x) - (r + x) * log_alpha_recency
+    max_A_3_A_4 = np.maximum(A_3, A_4)
+    exp_3 = np.exp(A_3 - max_A_3_A_4)
+    exp_4 = np.exp(A_4 - max_A_3_A_4) * repeat
+    ll = A_1 + A_2 + np.log(exp_3 + exp_4) + max_A_3_A_4
+
+    # log(exp(A_3) + exp(A_4)) türevinde A_3 ve A_4'ün payları
+    w_4 = exp_4 / (exp_3 + exp_4)
+    w_3 = 1 - w_4
+    psi_a_b_x, psi_a_b = _at_counts(digamma, a + b, x), digamma(a + b)
+    d_r = _at_counts(digamma, r, x) - digamma(r) + np.log(alpha) - w_3 * log_alpha_T - w_4 * log_alpha_recency
+    d_alpha = r / alpha - (r + x) * (w_3 / (alpha + T) + w_4 / (recency + alpha))
+    d_a = psi_a_b - psi_a_b_x + w_4 / a
+    d_b = psi_a_b + _at_counts(digamma, b, x) - digamma(b) - psi_a_b_x - w_4 / b_x
+
+    total = weights.sum()
+    value = -(weights @ ll) / total + penalizer_coef * (params ** 2).sum()
+    gradient = -np.array([weights @ d_r, weights @ d_alpha, weights @ d_a, weights @ d_b]) / total
+    gradient = (gradient + 2 * penalizer_coef * params) * params
+    return value, gradient
+
+
+def gamma_gamma_negative_log_likelihood(log_params, frequency, monetary_value, weights, penalizer_coef=0.0):
+    """
+    Gamma-Gamma ortalama negatif log-likelihood'u ve log(p, q, v)'ye göre gradyanı.
+
+    lifetimes.GammaGammaFitter._negative_log_likelihood ile aynı değer (Fader & Hardie, note 025).
+    frequency tamsayı olmalı (gammaln/digamma terimleri 0..max(frequency) için hesaplanır).
+
+    Returns
+    -------
+    value: float
+    gradient: np.ndarray
+        (3,)
+
+    """
+    params = np.exp(log_params)
+    p, q, v = params
+    x = frequency
+    m = monetary_value
+    log_m, log_x = np.log(m), np.log(x)
+    log_x_m_v = np.log(x * m + v)
+
+    ll = (_at_counts(gammaln, q, x, p) - _at_counts(gammaln, 0.0, x, p) - gammaln(q) + q * np.log(v)
+          + (p * x - 1) * log_m + (p * x) * log_x - (p * x + q) * log_x_m_v)
+
+    psi_p_x_q = _at_counts(digamma, q, x, p)
+    d_p = x * (psi_p_x_q - _at_counts(digamma, 0.0, x, p) + log_m + log_x - log_x_m_v)
+    d_q = psi_p_x_q - digamma(q) + np.log(v) - log_x_m_v
+    d_v = q / v - (p * x + q) / (x * m + v)
+
+    total = weights.sum()
+    value = -(weights @ ll) / total + penalizer_coef * (params ** 2).sum()
+    gradient = -np.array([weights @ d_p, weights @ d_q, weights @ d_v]) / total
+    gradient = (gradient + 2 * penalizer_coef * params) * params
+    return value, gradient
+
+
+##############################################################
+# 2. Müşterilerin Sıkıştırılması
+##############################################################
+
+def compress_rows(*columns, weights=None):
+    """
+    Aynı değerlere sahip satırları ağırlıklı tek satıra indirir.
+
+    Kolonlar tek tek factorize edilip kodlar ikişer ikişer birleştirilir (np.unique(axis=0)'dan hızlı).
+
+    Returns
+    -------
+    columns: list of np.ndarray
+        tekil satırlar
+    weights: np.ndarray
+        her tekil satırın toplam ağırlığı
+
+    """
+    inverse = np.zeros(len(columns[0]), dtype=np.int64)
+    n_groups = 1
+    for column in columns:
+        codes, uniques = pd.factorize(np.asarray(column))
+        inverse, groups = pd.factorize(inverse * len(uniques) + codes)
+        n_groups = len(groups)
+    first = np.full(n_groups, len(inverse), dtype=np.int64)
+    np.minimum.at(first, inverse, np.arange(len(inverse)))
+    weights = np.ones(len(inverse)) if weights is None else np.asarray(weights, dtype=np.float64)
+    return [np.asarray(column)[first] for column in columns], np.bincount(inverse, weights=weights, minlength=n_groups)
+
+
+def _minimize(negative_log_likelihood, initial_params, args, n_params, verbose, tol, bounds=None, **kwargs):
+    # lifetimes BaseFitter._fit ile aynı: başlangıç 0.1, scipy.minimize varsayılan yöntemi
+    initial_params = 0.1 * np.ones(n_params) if initial_params is None else np.asarray(initial_params, dtype=np.float64)
+    options = {"disp": verbose}
+    options.update(kwargs)
+    output = minimize(negative_log_likelihood, initial_params, args=args, jac=True, tol=tol, bounds=bounds,
+                      options=options)
+    if not output.success:
+        raise ConvergenceError(f"Model yakınsamadı ({output.message}); penalizer_coef'i artırmayı deneyin.")
+    return output
+
+
+##############################################################
+# 3. BetaGeoFitter
+##############################################################
+
+class BetaGeoFitter:
+    """
+    BG-NBD modeli (lifetimes.BetaGeoFitter yerine).
+
+    Attributes
+    ----------
+    params_: pd.Series
+        r, alpha, a, b
+    data: pd.DataFrame
+        fit'te kullanılan frequency, recency, T, weights (sıkıştırılmamış)
+
+    """
+
+    def __init__(self, penalizer_coef=0.0):
+        self.penalizer_coef = penalizer_coef
+
+    def fit(self, frequency, recency, T, weights=None, initial_params=None, verbose=False, tol=1e-7, index=None,
+            compress=True, **kwargs):
+        frequency = np.asarray(frequency).astype(int)
+        recency = np.asarray(recency, dtype=np.float64)
+        T = np.asarray(T, dtype=np.float64)
+        if (recency > T).any() or (recency < 0).any() or (frequency < 0).any():
+            raise ValueError("0 <= recency <= T ve frequency >= 0 olmalı")
+        if ((frequency == 0) & (recency != 0)).any():
+            raise ValueError("frequency 0 olan müşterilerin recency'si 0 olmalı")
+        weights = np.ones(len(frequency)) if weights is None else np.asarray(weights, dtype=np.float64)
+
+        # lifetimes ile aynı ölçekleme: T / max(T)
+        self._scale = 1.0 / T.max()
+        if compress:
+            (x, tx, age), w = compress_rows(frequency, recency * self._scale, T * self._scale, weights=weights)
+        else:
+            x, tx, age, w = frequency, recency * self._scale, T * self._scale, weights
+        output = _minimize(bgnbd_negative_log_likelihood, initial_params,
+                           (x, tx, age, w, self.penalizer_coef), 4, verbose, tol, **kwargs)
+        self._negative_log_likelihood_ = output.fun
+        self.params_ = pd.Series(np.exp(output.x), index=["r", "alpha", "a", "b"])
+        self.params_["alpha"] /= self._scale
+        self.data = pd.DataFrame({"frequency": frequency, "recency": recency, "T": T, "weights": weights},
+                                 index=index)
+        return self
+
+    def conditional_expected_number_of_purchases_up_to_time(self, t, frequency, recency, T):
+        # t tek bir ufuk ya da (lifetimes'taki gibi) müşterilerle broadcast edilen bir dizi;
+        # her müşteri için birden fazla ufuk gerekiyorsa bgnbd_predict.expected_purchases
+        t = np.asarray(t, dtype=np.float64)
+        if t.ndim == 0:
+            expected = expected_purchases(self, frequency, recency, T, [t])[:, 0]
+        else:
+            t, x, tx, age = np.broadcast_arrays(t, *(np.asarray(col, dtype=np.float64)
+                                                     for col in (frequency, recency, T)))
+            # her tekil ufuk bir kere hesaplanır, müşterinin kendi ufkundaki değer seçilir
+            horizons, inverse = np.unique(t.reshape(-1), return_inverse=True)
+            expected = expected_purchases(self, x.reshape(-1), tx.reshape(-1), age.reshape(-1), horizons)
+            expected = expected[np.arange(len(inverse)), inverse.reshape(-1)].reshape(t.shape)
+        if isinstance(frequency, pd.Series) and expected.shape == frequency.shape:
+            return pd.Series(expected, index=frequency.index)
+        return expected
+
+    predict = conditional_expected_number_of_purchases_up_to_time
+
+    def conditional_probability_alive(self, frequency, recency, T):
+        r, alpha, a, b = self.params_[["r", "alpha", "a", "b"]]
+        x = np.asarray(frequency, dtype=np.float64)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            odds = np.where(x > 0, a / (b + x - 1) * ((alpha + np.asarray(T)) / (alpha + np.asarray(recency))) ** (r + x),
+                            0.0)
+        return 1 / (1 + odds)
+
+    def generate_new_data(self, size=1, random_state=None):
+        """
+        Modelden fit'teki T'lerle müşteri simülasyonu (plot_period_transactions için).
+
+        Her müşteri için lambda ~ Gamma(r, 1 / alpha), p ~ Beta(a, b); T içindeki satın alma sayısı
+        Poisson(lambda * T) ile terk etmeden önceki en fazla satın alma sayısı Geometric(p)'nin minimumu,
+        recency de x. satın almanın zamanıdır (düzgün dağılımın sıra istatistiği).
+
+        """
+        rng = np.random.default_rng(random_state)
+        r, alpha, a, b = self.params_[["r", "alpha", "a", "b"]]
+        T = self.data["T"].to_numpy() if hasattr(self, "data") else np.ones(size)
+        lam = rng.gamma(r, 1 / alpha, len(T))
+        p = rng.beta(a, b, len(T))
+        n_purchases = rng.poisson(lam * T)
+        max_purchases = rng.geometric(p)
+        frequency = np.minimum(n_purchases, max_purchases)
+        recency = np.where(frequency > 0, T * rng.beta(np.maximum(frequency, 1), n_purchases - frequency + 1), 0.0)
+        return pd.DataFrame({"frequency": frequency, "recency": recency, "T": T, "lambda": lam, "p": p,
+                             "alive": n_purchases < max_purchases})
+
+
+##############################################################
+# 4. GammaGammaFitter
+##############################################################
+
+class GammaGammaFitter:
+    """
+    Gamma-Gamma modeli (lifetimes.GammaGammaFitter yerine).
+
+    Attributes
+    ----------
+    params_: pd.Series
+        p, q, v
+
+    """
+
+    def __init__(self, penalizer_coef=0.0):
+        self.penalizer_coef = penalizer_coef
+
+    def fit(self, frequency, monetary_value, weights=None, initial_params=None, verbose=False, tol=1e-7, index=None,
+            q_constraint=False, compress=True, **kwargs):
+        frequency = np.asarray(frequency).astype(int)
+        monetary_value = np.asarray(monetary_value, dtype=np.float64)
+        if (frequency <= 0).any() or (monetary_value <= 0).any():
+            raise ValueError("frequency ve monetary_value pozitif olmalı (tekrar satın alan müşteriler)")
+        weights = np.ones(len(frequency)) if weights is None else np.asarray(weights, dtype=np.float64)
+        if compress:
+            (x, m), w = compress_rows(frequency, monetary_value, weights=weights)
+        else:
+            x, m, w = frequency, monetary_value, weights
+        # q_constraint: q > 1 (log q > 0), beklenen ortalama kazancın tanımlı olması için
+        bounds = ((None, None), (0, None), (None, None)) if q_constraint else None
+        output = _minimize(gamma_gamma_negative_log_likelihood, initial_params, (x, m, w, self.penalizer_coef), 3,
+                           verbose, tol, bounds=bounds, **kwargs)
+        self._negative_log_likelihood_ = output.fun
+        self.params_ = pd.Series(np.exp(output.x), index=["p", "q", "v"])
+        self.data = pd.DataFrame({"monetary_value": monetary_value, "frequency": frequency, "weights": weights},
+                                 index=index)
+        return self
+
+    def conditional_expected_average_profit(self, frequency=None, monetary_value=None):
+        if monetary_value is None:
+            monetary_value = self.data["monetary_value"]
+        if frequency is None:
+            frequency = self.data["frequency"]
+        p, q, v = self.params_[["p", "q", "v"]]
+        # bireysel ortalama ile popülasyon ortalamasının ağırlıklı ortalaması
+        individual_weight = p * frequency / (p * frequency + q - 1)
+        population_mean = v * p / (q - 1)
+        return (1 - individual_weight) * population_mean + individual_weight * monetary_value
+
+    def customer_lifetime_value(self, transaction_prediction_model, frequency, recency, T, monetary_value, time=12,
+                                discount_rate=0.01, freq="D"):
+        # transaction_prediction_model: BG-NBD (bu modüldeki ya da lifetimes'taki BetaGeoFitter)
+        adjusted_monetary_value = self.conditional_expected_average_profit(frequency, monetary_value)
+        clv = customer_lifetime_value(transaction_prediction_model, frequency, recency, T, adjusted_monetary_value,
+                                      time=time, discount_rate=discount_rate, freq=freq)
+        index = frequency.index if isinstance(frequency, pd.Series) else None
+        return pd.Series(clv, index=index, name="clv")
@@ -44,14 +44,19 @@
 import datetime as dt
 import pandas as pd
 import matplotlib.pyplot as plt
-from lifetimes import BetaGeoFitter
-from lifetimes import GammaGammaFitter
+# lifetimes.BetaGeoFitter / GammaGammaFitter yerine NumPy ile analitik gradyanlı sürümleri (cltv_models.py);
+# plot_period_transactions bu modellerle de çalışır
+from cltv_models import BetaGeoFitter
+from cltv_models import GammaGammaFitter
 from lifetimes.plotting import plot_period_transactions
 
 pd.set_option('display.max_columns', None)
 pd.set_option('display.width', 500)
 pd.set_option('display.float_format', lambda x: '%.4f' % x)
 from sklearn.preprocessing import MinMaxScaler
+from lifetime_table import create_lifetime_table
+from transactions_io import read_transactions
+from bgnbd_predict import expected_purchases, customer_lifetime_value
 
 
 def outlier_thresholds(dataframe, variable):
@@ -73,8 +78,10 @@ def replace_with_thresholds(dataframe, variable):
 # Verinin Okunması
 #########################
 
-df_ = pd.read_excel("datasets/online_retail_II.xlsx",
-                    sheet_name="Year 2010-2011")
+# pd.read_excel yerine: ilk çalıştırmada sayfa datasets/.cache altına parquet olarak yazılır,
+# sonrakilerde sadece parquet okunur (transactions_io.py)
+df_ = read_transactions("datasets/online_retail_II.xlsx",
+                        sheet_name="Year 2010-2011")
 df = df_.copy()
 df.describe().T
 df.head()
@@ -126,6 +133,10 @@ cltv_df["recency"] = cltv_df["recency"] / 7
 
 cltv_df["T"] = cltv_df["T"] / 7
 
+# Aynı tablo müşteri grupları üzerinde lambda çağırmadan (create_cltv_p bunu kullanır):
+create_lifetime_table(df, today_date).head()
+# lambda'lı sürümle eşitliği test_lifetime_table.py'de test edilir
+
 ##############################################################
 # 2. BG-NBD Modelinin Kurulması
 ##############################################################
@@ -136,57 +147,40 @@ bgf.fit(cltv_df['frequency'],
         cltv_df['recency'],
         cltv_df['T'])
 
-################################################################
-# 1 hafta içinde en çok satın alma beklediğimiz 10 müşteri kimdir?
-################################################################
-
-bgf.conditional_expected_number_of_purchases_up_to_time(1,
+# 1, 4 ve 12 haftalık beklenen satın almalar tek çağrıda, (müşteri x ufuk) dizisi olarak;
+# sütunlar bgf.predict(1 / 4 / 12, ...) ile aynı
+cltv_df[["expected_purc_1_week",
+         "expected_purc_1_month",
+         "expected_purc_3_month"]] = expected_purchases(bgf,
                                                         cltv_df['frequency'],
                                                         cltv_df['recency'],
-                                                        cltv_df['T']).sort_values(ascending=False).head(10)
+                                                        cltv_df['T'],
+                                                        [1, 4, 12])
 
-bgf.predict(1,
-            cltv_df['frequency'],
-            cltv_df['recency'],
-            cltv_df['T']).sort_values(ascending=False).head(10)
+# ayrı predict çağrılarına göre fark ve hız:
+# from bgnbd_predict import benchmark_predictions
+# benchmark_predictions(bgf, cltv_df)
+
+################################################################
+# 1 hafta içinde en çok satın alma beklediğimiz 10 müşteri kimdir?
+################################################################
 
-cltv_df["expected_purc_1_week"] = bgf.predict(1,
-                                              cltv_df['frequency'],
-                                              cltv_df['recency'],
-                                              cltv_df['T'])
+cltv_df["expected_purc_1_week"].sort_values(ascending=False).head(10)
 
 ################################################################
 # 1 ay içinde en çok satın alma beklediğimiz 10 müşteri kimdir?
 ################################################################
 
-bgf.predict(4,
-            cltv_df['frequency'],
-            cltv_df['recency'],
-            cltv_df['T']).sort_values(ascending=False).head(10)
-
-cltv_df["expected_purc_1_month"] = bgf.predict(4,
-                                               cltv_df['frequency'],
-                                               cltv_df['recency'],
-                                               cltv_df['T'])
+cltv_df["expected_purc_1_month"].sort_values(ascending=False).head(10)
 
-bgf.predict(4,
-            cltv_df['frequency'],
-            cltv_df['recency'],
-            cltv_df['T']).sum()
+cltv_df["expected_purc_1_month"].sum()
 
 ################################################################
 # 3 Ayda Tüm Şirketin Beklenen Satış Sayısı Nedir?
 ################################################################
 
-bgf.predict(4 * 3,
-            cltv_df['frequency'],
-            cltv_df['recency'],
-            cltv_df['T']).sum()
+cltv_df["expected_purc_3_month"].sum()
 
-cltv_df["expected_purc_3_month"] = bgf.predict(4 * 3,
-                                               cltv_df['frequency'],
-                                               cltv_df['recency'],
-                                               cltv_df['T'])
 ################################################################
 # Tahmin Sonuçlarının Değerlendirilmesi
 ################################################################
@@ -194,6 +188,8 @@ cltv_df["expected_purc_3_month"] = bgf.predict(4 * 3,
 plot_period_transactions(bgf)
 plt.show()
 
+# lifetimes'taki modellerle aynı parametreler, tahminler ve clv: test_cltv_models.py
+
 ##############################################################
 # 3. GAMMA-GAMMA Modelinin Kurulması
 ##############################################################
@@ -263,18 +259,8 @@ def create_cltv_p(dataframe, month=3):
     dataframe["TotalPrice"] = dataframe["Quantity"] * dataframe["Price"]
     today_date = dt.datetime(2011, 12, 11)
 
-    cltv_df = dataframe.groupby('Customer ID').agg(
-        {'InvoiceDate': [lambda InvoiceDate: (InvoiceDate.max() - InvoiceDate.min()).days,
-                         lambda InvoiceDate: (today_date - InvoiceDate.min()).days],
-         'Invoice': lambda Invoice: Invoice.nunique(),
-         'TotalPrice': lambda TotalPrice: TotalPrice.sum()})
-
-    cltv_df.columns = cltv_df.columns.droplevel(0)
-    cltv_df.columns = ['recency', 'T', 'frequency', 'monetary']
-    cltv_df["monetary"] = cltv_df["monetary"] / cltv_df["frequency"]
-    cltv_df = cltv_df[(cltv_df['frequency'] > 1)]
-    cltv_df["recency"] = cltv_df["recency"] / 7
-    cltv_df["T"] = cltv_df["T"] / 7
+    # lambda'lı groupby/agg yerine vektörize lifetime tablosu (lifetime_table.py)
+    cltv_df = create_lifetime_table(dataframe, today_date)
 
     # 2. BG-NBD Modelinin Kurulması
     bgf = BetaGeoFitter(penalizer_coef=0.001)
@@ -282,20 +268,14 @@ def create_cltv_p(dataframe, month=3):
             cltv_df['recency'],
             cltv_df['T'])
 
-    cltv_df["expected_purc_1_week"] = bgf.predict(1,
-                                                  cltv_df['frequency'],
-                                                  cltv_df['recency'],
-                                                  cltv_df['T'])
-
-    cltv_df["expected_purc_1_month"] = bgf.predict(4,
-                                                   cltv_df['frequency'],
-                                                   cltv_df['recency'],
-                                                   cltv_df['T'])
-
-    cltv_df["expected_purc_3_month"] = bgf.predict(12,
-                                                   cltv_df['frequency'],
-                                                   cltv_df['recency'],
-                                                   cltv_df['T'])
+    # 1, 4 ve 12 haftalık tahminler ortak terimler bir kere hesaplanarak tek çağrıda (bgnbd_predict.py)
+    cltv_df[["expected_purc_1_week",
+             "expected_purc_1_month",
+             "expected_purc_3_month"]] = expected_purchases(bgf,
+                                                            cltv_df['frequency'],
+                                                            cltv_df['recency'],
+                                                            cltv_df['T'],
+                                                            [1, 4, 12])
 
     # 3. GAMMA-GAMMA Modelinin Kurulması
     ggf = GammaGammaFitter(penalizer_coef=0.01)
@@ -304,17 +284,15 @@ def create_cltv_p(dataframe, month=3):
                                                                                  cltv_df['monetary'])
 
     # 4. BG-NBD ve GG modeli ile CLTV'nin hesaplanması.
-    cltv = ggf.customer_lifetime_value(bgf,
-                                       cltv_df['frequency'],
-                                       cltv_df['recency'],
-                                       cltv_df['T'],
-                                       cltv_df['monetary'],
-                                       time=month,  # 3 aylık
-                                       freq="W",  # T'nin frekans bilgisi.
-                                       discount_rate=0.01)
-
-    cltv = cltv.reset_index()
-    cltv_final = cltv_df.merge(cltv, on="Customer ID", how="left")
+    cltv_df["clv"] = customer_lifetime_value(bgf,
+                                             cltv_df['frequency'],
+                                             cltv_df['recency'],
+                                             cltv_df['T'],
+                                             cltv_df["expected_average_profit"],
+                                             time=month,  # 3 aylık
+                                             freq="W",  # T'nin frekans bilgisi.
+                                             discount_rate=0.01)
+    cltv_final = cltv_df.reset_index()
     cltv_final["segment"] = pd.qcut(cltv_final["clv"], 4, labels=["D", "C", "B", "A"])
 
     return cltv_final
@@ -338,3 +316,15 @@ cltv_final2.to_csv("cltv_prediction.csv")
 
 
 
+
+# Belleğe sığmayan veri için (csv chunk'ları, parquet row group'ları ya da DataFrame üreten bir generator):
+# from transactions_io import excel_to_parquet, iter_transaction_chunks, transaction_thresholds, aggregate_transactions
+# parquet_path = excel_to_parquet("datasets/online_retail_II.xlsx")
+# thresholds = transaction_thresholds(iter_transaction_chunks(parquet_path))
+# cltv_df = aggregate_transactions(iter_transaction_chunks(parquet_path), thresholds).lifetime_table(today_date)
+
+# Her gün sadece yeni faturalar ekleniyorsa tüm geçmişi baştan toplamak yerine (cltv_refresh.py):
+# from cltv_refresh import CLTVRefresher
+# refresher = CLTVRefresher.from_transactions(df_, today_date=dt.datetime(2011, 12, 11), refit_every=7)
+# refresher.update(todays_invoices)  # sadece faturası olan müşteriler değişir; modeller 7 günde bir warm start ile kurulur
+# refresher.predictions
@@ -0,0 +1,208 @@
+##############################################################
+# Günlük Artımlı CLTV Güncellemesi
+##############################################################
+
+# create_cltv_p her çalıştığında tüm geçmişi baştan toplayıp BG-NBD ve Gamma-Gamma
+# modellerini sıfırdan kuruyor; today_date de sabit. Üretimde her gün sadece o günün
+# faturaları ekleniyor. Burada:
+# - müşteri bazında yeterli istatistikler (ilk/son tarih, tekil fatura, gelir) diske
+#   yazılan bir store'da tutulur (transactions_io.CustomerAggregates),
+# - günün faturaları (delta) sadece geçtiği müşterilerin recency/frequency/monetary
+#   değerlerini değiştirir; diğer müşteriler için sadece T kayar,
+# - tahminler her güncellemede mevcut model parametreleriyle herkes için yeniden hesaplanır,
+# - modeller refit_every günde bir, önceki parametrelerden başlatılarak (warm start) yeniden kurulur.
+# Aykırı değer sınırları ilk kurulumdaki veriden hesaplanıp sabit tutulur; delta'lar aynı
+# sınırlarla baskılanır.
+
+# 1. CLTVRefresher
+# 2. Kullanım
+
+import os
+
+import numpy as np
+import pandas as pd
+
+from bgnbd_predict import customer_lifetime_value, expected_purchases
+from cltv_models import BetaGeoFitter, ConvergenceError, GammaGammaFitter
+from transactions_io import (CustomerAggregates, aggregate_transactions, clean_transactions, transaction_thresholds,
+                             typed_transactions)
+
+
+##############################################################
+# 1. CLTVRefresher
+##############################################################
+
+class CLTVRefresher:
+    """
+    Müşteri istatistikleri, model parametreleri ve son tahminler.
+
+    Parameters
+    ----------
+    aggregates: CustomerAggregates
+        müşteri bazında yeterli istatistikler
+    thresholds: dict
+        transaction_thresholds çıktısı; delta'lar bu sınırlarla baskılanır
+    refit_every: int
+        modellerin kaç günde bir yeniden kurulacağı
+    month: int
+        CLTV'nin kaç aylık hesaplanacağı (create_cltv_p'deki month)
+
+    """
+
+    def __init__(self, aggregates, thresholds, refit_every=7, month=3, bgf_penalizer=0.001, ggf_penalizer=0.01):
+        self.aggregates = aggregates
+        self.thresholds = thresholds
+        self.refit_every = refit_every
+        self.month = month
+        self.bgf_penalizer = bgf_penalizer
+        self.ggf_penalizer = ggf_penalizer
+        self.bgf_params = None
+        self.ggf_params = None
+        self.fitted_at = None
+        self.today_date = None
+        self.predictions = None
+
+    @classmethod
+    def from_transactions(cls, dataframe, today_date=None, **kwargs):
+        # ilk kurulum: tüm geçmiş bir kere toplanır ve modeller kurulur
+        dataframe = typed_transactions(dataframe)
+        thresholds = transaction_thresholds([dataframe])
+        refresher = cls(aggregate_transactions([dataframe], thresholds), thresholds, **kwargs)
+        refresher.refresh(today_date)
+        return refresher
+
+    def update(self, delta, today_date=None):
+        """
+        Günün faturalarını ekler ve tahminleri yeniler.
+
+        Parameters
+        ----------
+        delta: pd.DataFrame
+            ham (ön işlenmemiş) yeni işlemler; daha önce eklenmiş faturalar atlanır
+        today_date: datetime, optional
+            verilmezse son fatura gününün ertesi günü
+
+        Returns
+        -------
+        pd.Index
+            istatistikleri değişen müşteriler
+
+        """
+        # Invoice ham veride int/str karışık gelebilir; tekrar kontrolü için önce tipler düzeltilir,
+        # daha önce eklenmiş faturalar (tekrar gönderilen delta) atlanır
+        delta = clean_transactions(typed_transactions(delta), self.thresholds)
+        delta = self.aggregates.drop_seen_invoices(delta)
+        changed = self.aggregates.update(delta)
+        self.refresh(today_date)
+        return changed
+
+    def refresh(self, today_date=None, refit=None):
+        # refit=None: son kurulumdan bu yana refit_every gün geçtiyse modeller yeniden kurulur
+        if today_date is None:
+            today_date = self.aggregates.latest_date().normalize() + pd.Timedelta(days=1)
+        self.today_date = pd.Timestamp(today_date)
+        cltv_df = self.lifetime_table()
+        if refit is None:
+            refit = (self.bgf_params is None
+                     or (self.today_date - self.fitted_at).days >= self.refit_every)
+        if refit:
+            self.fit(cltv_df)
+        self.predictions = self.predict(cltv_df)
+        return self.predictions
+
+    def lifetime_table(self):
+        return self.aggregates.lifetime_table(self.today_date)
+
+    def fit(self, cltv_df):
+        bgf = BetaGeoFitter(penalizer_coef=self.bgf_penalizer)
+        ggf = GammaGammaFitter(penalizer_coef=self.ggf_penalizer)
+        bgf_initial = ggf_initial = None
+        if self.bgf_params is not None:
+            # modeller log-parametreler üzerinde optimize edilir; alpha T'nin 1 / max(T) ile ölçeklenmiş hali üzerinden
+            r, alpha, a, b = self.bgf_params
+            bgf_initial = np.log([r, alpha / cltv_df["T"].max(), a, b])
+            ggf_initial = np.log(self.ggf_params)
+        try:
+            bgf.fit(cltv_df["frequency"], cltv_df["recency"], cltv_df["T"], initial_params=bgf_initial)
+        except ConvergenceError:
+            if bgf_initial is None:
+                raise
+            bgf.fit(cltv_df["frequency"], cltv_df["recency"], cltv_df["T"])
+        try:
+            ggf.fit(cltv_df["frequency"], cltv_df["monetary"], initial_params=ggf_initial)
+        except ConvergenceError:
+            if ggf_initial is None:
+                raise
+            ggf.fit(cltv_df["frequency"], cltv_df["monetary"])
+        self.bgf_params = bgf.params_[["r", "alpha", "a", "b"]].to_numpy()
+        self.ggf_params = ggf.params_[["p", "q", "v"]].to_numpy()
+        self.fitted_at = self.today_date
+        return self
+
+    def fitters(self):
+        # kaydedilmiş parametrelerle tahmin yapabilen modeller (fit çağrılmadan)
+        bgf = BetaGeoFitter(penalizer_coef=self.bgf_penalizer)
+        bgf.params_ = pd.Series(self.bgf_params, index=["r", "alpha", "a", "b"])
+        ggf = GammaGammaFitter(penalizer_coef=self.ggf_penalizer)
+        ggf.params_ = pd.Series(self.ggf_params, index=["p", "q", "v"])
+        return bgf, ggf
+
+    def predict(self, cltv_df=None):
+        """
+        create_cltv_p'nin döndürdüğü cltv_final tablosu (model yeniden kurulmadan).
+
+        """
+        if cltv_df is None:
+            cltv_df = self.lifetime_table()
+        cltv_df = cltv_df.copy()
+        bgf, ggf = self.fitters()
+        cltv_df[["expected_purc_1_week", "expected_purc_1_month", "expected_purc_3_month"]] = \
+            expected_purchases(bgf, cltv_df["frequency"], cltv_df["recency"], cltv_df["T"], [1, 4, 12])
+        cltv_df["expected_average_profit"] = ggf.conditional_expected_average_profit(cltv_df["frequency"],
+                                                                                     cltv_df["monetary"])
+        cltv_df["clv"] = customer_lifetime_value(bgf, cltv_df["frequency"], cltv_df["recency"], cltv_df["T"],
+                                                 cltv_df["expected_average_profit"], time=self.month, freq="W",
+                                                 discount_rate=0.01)
+        cltv_final = cltv_df.reset_index()
+        cltv_final["segment"] = pd.qcut(cltv_final["clv"], 4, labels=["D", "C", "B", "A"])
+        return cltv_final
+
+    def save(self, path):
+        # istatistikler, sınırlar ve parametreler tek dosyada; yazma atomiktir
+        tmp_path = path + ".tmp.npz"
+        np.savez(tmp_path, **self.aggregates.to_dict(),
+                 quantity_limits=self.thresholds["Quantity"], price_limits=self.thresholds["Price"],
+                 refit_every=self.refit_every, month=self.month,
+                 penalizers=[self.bgf_penalizer, self.ggf_penalizer],
+                 bgf_params=self.bgf_params, ggf_params=self.ggf_params,
+                 fitted_at=str(self.fitted_at), today_date=str(self.today_date))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as f:
+            arrays = dict(f)
+        refresher = cls(CustomerAggregates.from_dict(arrays),
+                        {"Quantity": tuple(arrays["quantity_limits"]), "Price": tuple(arrays["price_limits"])},
+                        refit_every=int(arrays["refit_every"]), month=int(arrays["month"]),
+                        bgf_penalizer=float(arrays["penalizers"][0]), ggf_penalizer=float(arrays["penalizers"][1]))
+        refresher.bgf_params = arrays["bgf_params"]
+        refresher.ggf_params = arrays["ggf_params"]
+        refresher.fitted_at = pd.Timestamp(str(arrays["fitted_at"]))
+        refresher.today_date = pd.Timestamp(str(arrays["today_date"]))
+        return refresher
+
+
+##############################################################
+# 2. Kullanım
+##############################################################
+
+# İlk kurulum (tüm geçmiş):
+# refresher = CLTVRefresher.from_transactions(df_, today_date=dt.datetime(2011, 12, 11), refit_every=7)
+# refresher.save("datasets/cltv_store.npz")
+#
+# Her gün:
+# refresher = CLTVRefresher.load("datasets/cltv_store.npz")
+# changed = refresher.update(todays_invoices)   # ham faturalar; today_date = son fatura gününün ertesi
+# refresher.predictions.sort_values("clv", ascending=False).head(10)
+# refresher.save("datasets/cltv_store.npz")
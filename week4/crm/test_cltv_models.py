@@ -0,0 +1,104 @@
+##############################################################
+# cltv_models ile lifetimes Karşılaştırma Testleri
+##############################################################
+
+# python -m pytest week4/crm/test_cltv_models.py
+# lifetimes kurulu değilse testler atlanır.
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import cltv_models
+
+lifetimes = pytest.importorskip("lifetimes")
+
+RTOL = 1e-5
+
+
+def sample_lifetime_table(size=2000, seed=42):
+    # BG-NBD sürecinden haftalık lifetime tablosu; monetary satın alma başına Gamma
+    rng = np.random.default_rng(seed)
+    T = rng.integers(10, 105, size).astype(np.float64)
+    lam = rng.gamma(0.8, 1 / 4.0, size)
+    p = rng.beta(0.9, 3.0, size)
+    frequency = np.zeros(size, dtype=np.int64)
+    recency = np.zeros(size)
+    for i in range(size):
+        t = 0.0
+        while True:
+            t += rng.exponential(1 / lam[i])
+            if t > T[i]:
+                break
+            frequency[i] += 1
+            recency[i] = t
+            if rng.random() < p[i]:
+                break
+    recency = np.floor(recency)
+    frequency[recency == 0] = 0
+    monetary = np.where(frequency > 0, rng.gamma(6.0, 15.0 / rng.gamma(4.0, 1.0, size)), 0.0)
+    cltv_df = pd.DataFrame({"frequency": frequency, "recency": recency, "T": T, "monetary": monetary},
+                           index=pd.Index(np.arange(size) + 12346.0, name="Customer ID"))
+    return cltv_df[cltv_df["frequency"] > 1]
+
+
+@pytest.fixture(scope="module")
+def cltv_df():
+    return sample_lifetime_table()
+
+
+@pytest.fixture(scope="module", params=[False, True], ids=["unweighted", "weighted"])
+def fitted(request, cltv_df):
+    # aynı tabloda bu modüldeki ve lifetimes'taki modeller (weighted: rastgele ağırlıklar)
+    weights = np.random.default_rng(0).integers(1, 4, len(cltv_df)) if request.param else None
+    columns = cltv_df["frequency"], cltv_df["recency"], cltv_df["T"]
+    models = {}
+    for name, module in (("native", cltv_models), ("lifetimes", lifetimes)):
+        bgf = module.BetaGeoFitter(penalizer_coef=0.001)
+        ggf = module.GammaGammaFitter(penalizer_coef=0.01)
+        if weights is None:
+            bgf.fit(*columns)
+            ggf.fit(cltv_df["frequency"], cltv_df["monetary"])
+        else:
+            bgf.fit(*columns, weights=weights)
+            ggf.fit(cltv_df["frequency"], cltv_df["monetary"], weights=weights)
+        models[name] = bgf, ggf
+    return models
+
+
+def test_params_match(fitted):
+    (bgf, ggf), (expected_bgf, expected_ggf) = fitted["native"], fitted["lifetimes"]
+    np.testing.assert_allclose(bgf.params_[["r", "alpha", "a", "b"]], expected_bgf.params_[["r", "alpha", "a", "b"]],
+                               rtol=RTOL)
+    np.testing.assert_allclose(ggf.params_[["p", "q", "v"]], expected_ggf.params_[["p", "q", "v"]], rtol=RTOL)
+
+
+@pytest.mark.parametrize("t", [1, 4, 12, "array"])
+def test_predict_matches(fitted, cltv_df, t):
+    # predict'in beklenen değeri lifetimes'takiyle aynı parametrelerle karşılaştırılır (fit farkı karışmasın)
+    bgf = fitted["native"][0]
+    expected_bgf = lifetimes.BetaGeoFitter()
+    expected_bgf.params_ = bgf.params_.copy()
+    if t == "array":
+        t = np.random.default_rng(1).choice([1, 2.5, 4, 12], len(cltv_df))
+    columns = cltv_df["frequency"], cltv_df["recency"], cltv_df["T"]
+    result = bgf.predict(t, *columns)
+    assert isinstance(result, pd.Series) and result.index.equals(cltv_df.index)
+    np.testing.assert_allclose(result, expected_bgf.conditional_expected_number_of_purchases_up_to_time(t, *columns),
+                               rtol=1e-10)
+    # fit edilmiş iki modelin tahminleri de parametre toleransı içinde aynı
+    np.testing.assert_allclose(result, fitted["lifetimes"][0].conditional_expected_number_of_purchases_up_to_time(
+        t, *columns), rtol=RTOL)
+
+
+def test_probability_alive_matches(fitted, cltv_df):
+    columns = cltv_df["frequency"], cltv_df["recency"], cltv_df["T"]
+    np.testing.assert_allclose(fitted["native"][0].conditional_probability_alive(*columns),
+                               fitted["lifetimes"][0].conditional_probability_alive(*columns), rtol=RTOL)
+
+
+def test_customer_lifetime_value_matches(fitted, cltv_df):
+    columns = cltv_df["frequency"], cltv_df["recency"], cltv_df["T"], cltv_df["monetary"]
+    results = [ggf.customer_lifetime_value(bgf, *columns, time=3, freq="W", discount_rate=0.01)
+               for bgf, ggf in (fitted["native"], fitted["lifetimes"])]
+    np.testing.assert_allclose(results[0], results[1], rtol=RTOL)
@@ -0,0 +1,65 @@
+##############################################################
+# Lifetime Tablosu Testleri
+##############################################################
+
+# python -m pytest week4/crm/test_lifetime_table.py
+
+import datetime as dt
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from lifetime_table import create_lifetime_table, lifetime_aggregates
+
+
+def lifetime_aggregates_lambda(dataframe, today_date):
+    # create_cltv_p'deki orijinal hesap (referans)
+    cltv_df = dataframe.groupby('Customer ID').agg(
+        {'InvoiceDate': [lambda InvoiceDate: (InvoiceDate.max() - InvoiceDate.min()).days,
+                         lambda InvoiceDate: (today_date - InvoiceDate.min()).days],
+         'Invoice': lambda Invoice: Invoice.nunique(),
+         'TotalPrice': lambda TotalPrice: TotalPrice.sum()})
+    cltv_df.columns = cltv_df.columns.droplevel(0)
+    cltv_df.columns = ['recency', 'T', 'frequency', 'monetary']
+    return cltv_df
+
+
+def sample_transactions(n_rows=5000, n_customers=300, seed=42):
+    # aynı faturada birden fazla satır, gün içi saatler ve tek faturalı müşteriler
+    rng = np.random.default_rng(seed)
+    invoices = rng.integers(0, n_rows // 3, n_rows)
+    invoice_customer = rng.integers(0, n_customers, n_rows // 3).astype(np.float64) + 12346
+    invoice_date = (pd.Timestamp("2009-12-01") + pd.to_timedelta(rng.integers(0, 740 * 24 * 60, n_rows // 3),
+                                                                 unit="min"))
+    return pd.DataFrame({"Invoice": [str(489434 + invoice) for invoice in invoices],
+                         "Customer ID": invoice_customer[invoices],
+                         "InvoiceDate": invoice_date[invoices],
+                         "TotalPrice": np.round(rng.exponential(20, n_rows), 2)})
+
+
+@pytest.fixture
+def transactions():
+    return sample_transactions()
+
+
+def test_lifetime_aggregates_match_lambda_groupby(transactions):
+    today_date = dt.datetime(2011, 12, 11)
+    expected = lifetime_aggregates_lambda(transactions, today_date)
+    result = lifetime_aggregates(transactions, today_date)
+    assert result.index.equals(expected.index)
+    for col in ("recency", "T", "frequency"):
+        np.testing.assert_array_equal(result[col].to_numpy(), expected[col].to_numpy())
+    # monetary toplama sırasından dolayı son basamaklarda farklı olabilir
+    np.testing.assert_allclose(result["monetary"], expected["monetary"], rtol=1e-9, atol=0)
+
+
+def test_create_lifetime_table_matches_create_cltv_p_steps(transactions):
+    today_date = dt.datetime(2011, 12, 11)
+    expected = lifetime_aggregates_lambda(transactions, today_date)
+    expected["monetary"] = expected["monetary"] / expected["frequency"]
+    expected = expected[(expected["frequency"] > 1)]
+    expected["recency"] = expected["recency"] / 7
+    expected["T"] = expected["T"] / 7
+    result = create_lifetime_table(transactions, today_date)
+    pd.testing.assert_frame_equal(result, expected, check_dtype=False, rtol=1e-9)
@@ -0,0 +1,345 @@
+##############################################################
+# İşlem Verisinin Okunması ve Parça Parça Toplanması
+##############################################################
+
+# cltv_prediction.py her çalıştığında online_retail_II.xlsx'i pd.read_excel ile okuyor
+# (dakikalar sürer ve tüm sayfa belleğe alınır). Burada:
+# - Excel sayfası bir kere tipli kolonlarla Parquet'e çevrilir ve dosyanın boyut/mtime'ına
+#   göre anahtarlanmış cache'ten okunur,
+# - parquet (row group'lar), chunk'lı CSV ya da DataFrame üreten herhangi bir generator
+#   parça parça okunabilir,
+# - her parça müşteri bazında birikimli toplamlara (ilk/son tarih, tekil fatura, gelir)
+#   eklenir; lifetime tablosu belleğe sığmayan veriden de oluşturulabilir.
+# Tekil fatura sayımı için görülen (müşteri, fatura) çiftleri sıralı 64-bit anahtarlar olarak
+# tutulur; bellek satır sayısıyla değil fatura sayısıyla (çift başına 8 byte) büyür.
+
+# 1. Excel -> Parquet Cache
+# 2. Parça Parça Okuma ve Ön İşleme
+# 3. Müşteri Bazında Birikimli Toplamlar
+
+import os
+
+import numpy as np
+import pandas as pd
+
+from lifetime_table import NS_PER_DAY, finalize_lifetime_table
+
+DTYPES = {"Invoice": str, "StockCode": str, "Description": str, "Country": "category"}
+
+
+##############################################################
+# 1. Excel -> Parquet Cache
+##############################################################
+
+def typed_transactions(dataframe):
+    # Invoice ve StockCode Excel'de int/str karışık gelir; hepsi str yapılır
+    # (str.contains("C", na=False) filtresi aynı sonucu verir)
+    dataframe = dataframe.astype({col: dtype for col, dtype in DTYPES.items() if col in dataframe})
+    if "InvoiceDate" in dataframe:
+        dataframe["InvoiceDate"] = pd.to_datetime(dataframe["InvoiceDate"])
+    if "Customer ID" in dataframe:
+        dataframe["Customer ID"] = dataframe["Customer ID"].astype(np.float64)
+    return dataframe
+
+
+def cache_path(path, sheet_name, cache_dir=None):
+    if cache_dir is None:
+        cache_dir = os.path.join(os.path.dirname(os.path.abspath(path)), ".cache")
+    stat = os.stat(path)
+    name = os.path.splitext(os.path.basename(path))[0]
+    sheet = str(sheet_name).replace(" ", "_")
+    return os.path.join(cache_dir, f"{name}-{sheet}-{stat.st_size}-{stat.st_mtime_ns}.parquet")
+
+
+def excel_to_parquet(path, sheet_name="Year 2010-2011", cache_dir=None):
+    """
+    Excel sayfasını tipli kolonlarla Parquet'e çevirir (cache'te varsa tekrar okumaz).
+
+    Returns
+    -------
+    str
+        parquet dosyasının yolu
+
+    """
+    parquet_path = cache_path(path, sheet_name, cache_dir)
+    if not os.path.exists(parquet_path):
+        os.makedirs(os.path.dirname(parquet_path), exist_ok=True)
+        dataframe = typed_transactions(pd.read_excel(path, sheet_name=sheet_name))
+        dataframe.to_parquet(parquet_path + ".tmp", index=False)
+        os.replace(parquet_path + ".tmp", parquet_path)
+    return parquet_path
+
+
+def read_transactions(path, sheet_name="Year 2010-2011", columns=None, cache_dir=None):
+    # pd.read_excel(path, sheet_name=...) yerine; ilk çağrıdan sonra sadece parquet okunur
+    if path.endswith((".xlsx", ".xls")):
+        path = excel_to_parquet(path, sheet_name=sheet_name, cache_dir=cache_dir)
+    if path.endswith(".parquet"):
+        return pd.read_parquet(path, columns=columns)
+    return typed_transactions(pd.read_csv(path, usecols=columns, dtype=DTYPES))
+
+
+##############################################################
+# 2. Parça Parça Okuma ve Ön İşleme
+##############################################################
+
+def iter_transaction_chunks(path, chunksize=100_000, columns=None):
+    # parquet: row group/batch'ler, csv: read_csv chunk'ları
+    if path.endswith(".parquet"):
+        import pyarrow.parquet as pq
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunksize, columns=columns):
+            yield batch.to_pandas()
+    else:
+        for chunk in pd.read_csv(path, usecols=columns, dtype=DTYPES, chunksize=chunksize):
+            yield typed_transactions(chunk)
+
+
+def counted_quantile(values, counts, q):
+    # np.quantile(np.repeat(values, counts), q) (linear); values tekil ve sıralı olmalı
+    cumulative = np.cumsum(counts)
+    position = (cumulative[-1] - 1) * np.asarray(q, dtype=np.float64)
+    lower = np.floor(position).astype(np.int64)
+    upper = np.minimum(lower + 1, cumulative[-1] - 1)
+    lower_value = values[np.searchsorted(cumulative, lower, side="right")]
+    upper_value = values[np.searchsorted(cumulative, upper, side="right")]
+    return lower_value + (position - lower) * (upper_value - lower_value)
+
+
+def merge_value_counts(values, counts, new_values):
+    # birikimli (değer, adet) tablosuna yeni değerleri ekler
+    new_values, new_counts = np.unique(new_values, return_counts=True)
+    merged, inverse = np.unique(np.concatenate([values, new_values]), return_inverse=True)
+    return merged, np.bincount(inverse, weights=np.concatenate([counts, new_counts])).astype(np.int64)
+
+
+def outlier_limits(values, counts=None):
+    # cltv_prediction.outlier_thresholds ile aynı formül; counts verilirse values tekil değerlerdir
+    if counts is None:
+        quartile1, quartile3 = np.quantile(values, [0.01, 0.99])
+    else:
+        quartile1, quartile3 = counted_quantile(values, counts, [0.01, 0.99])
+    interquantile_range = quartile3 - quartile1
+    return quartile1 - 1.5 * interquantile_range, quartile3 + 1.5 * interquantile_range
+
+
+def is_valid_transaction(dataframe):
+    # create_cltv_p'deki filtreler: eksik değer, iptal faturası, sıfır/negatif adet ve fiyat
+    return (dataframe.notna().all(axis=1) & ~dataframe["Invoice"].str.contains("C", na=False)
+            & (dataframe["Quantity"] > 0) & (dataframe["Price"] > 0))
+
+
+def transaction_thresholds(chunks):
+    """
+    replace_with_thresholds'ın kullandığı Quantity ve Price sınırları.
+
+    Quantile'lar tüm veri üzerinden (kesin) hesaplanır. Satırlar tutulmaz; her kolon için
+    tekil değer -> adet tablosu birikir. Bellek satır sayısıyla değil tekil Quantity/Price
+    değeri sayısıyla büyür (adetler tam sayı, fiyatlar kuruş hassasiyetinde olduğu için
+    online_retail_II'de birkaç bin). Sürekli değerli (neredeyse hepsi tekil) bir kolonda
+    bellek yine satır sayısıyla büyür.
+    Eksik değer kontrolü parçadaki kolonlar üzerinden yapılır; create_cltv_p ile aynı
+    sınırlar için parçalar tüm kolonları içermeli.
+
+    """
+    empty = np.empty(0, dtype=np.float64), np.empty(0, dtype=np.int64)
+    counts = {"Quantity": empty, "Price": empty}
+    for chunk in chunks:
+        chunk = chunk[is_valid_transaction(chunk)]
+        for col in counts:
+            counts[col] = merge_value_counts(*counts[col], chunk[col].to_numpy(dtype=np.float64))
+    return {col: outlier_limits(*value_counts) for col, value_counts in counts.items()}
+
+
+def clean_transactions(chunk, thresholds=None):
+    # create_cltv_p'deki ön işleme; thresholds verilmezse aykırı değerler baskılanmaz
+    chunk = chunk[is_valid_transaction(chunk)]
+    if thresholds is not None:
+        chunk = chunk.assign(**{col: chunk[col].clip(*limits) for col, limits in thresholds.items()})
+    return chunk.assign(TotalPrice=chunk["Quantity"] * chunk["Price"])
+
+
+##############################################################
+# 3. Müşteri Bazında Birikimli Toplamlar
+##############################################################
+
+def invoice_keys(customers, invoices):
+    """
+    (müşteri, fatura) çiftlerinin 64-bit anahtarları.
+
+    Fatura numarası str'ye çevrilip hash'lenir (Excel'den int/str karışık gelebilir);
+    anahtarlar pd.util.hash_array ile üretildiği için process'ler ve kayıt/yükleme arasında
+    aynıdır. Farklı iki çiftin aynı anahtara düşme olasılığı 10^8 çiftte ~3e-4'tür.
+
+    """
+    customer_hash = pd.util.hash_array(np.asarray(customers, dtype=np.float64))
+    invoice_hash = pd.util.hash_array(pd.Series(invoices).astype(str).to_numpy(dtype=object))
+    return customer_hash * np.uint64(0x9E3779B97F4A7C15) ^ invoice_hash
+
+
+class CustomerAggregates:
+    """
+    Parçalar geldikçe güncellenen müşteri bazında toplamlar.
+
+    Müşteriler ilk görüldükleri sırada tutulur; bir parça sadece içindeki müşterilerin
+    satırlarını değiştirir (günlük delta'lar için tüm tablo yeniden gruplanmaz).
+    Görülen (müşteri, fatura) çiftleri 64-bit anahtarların (invoice_keys) sıralı dizisi olarak
+    tutulur; üyelik np.searchsorted ile bakılır (Python set'i ve tuple'lar yok).
+
+    Attributes
+    ----------
+    customers: pd.Index
+        'Customer ID'
+    first, last: np.ndarray
+        ilk/son fatura tarihi (ns)
+    frequency: np.ndarray
+        tekil fatura sayısı
+    monetary: np.ndarray
+        toplam gelir
+    seen_pairs: np.ndarray
+        görülen (müşteri, fatura) çiftlerinin sıralı invoice_keys anahtarları
+
+    """
+
+    def __init__(self):
+        self.customers = pd.Index([], dtype=np.float64, name="Customer ID")
+        self.first = np.empty(0, dtype=np.int64)
+        self.last = np.empty(0, dtype=np.int64)
+        self.frequency = np.empty(0, dtype=np.int64)
+        self.monetary = np.empty(0, dtype=np.float64)
+        self.seen_pairs = np.empty(0, dtype=np.uint64)
+        self.rows = 0
+
+    def __len__(self):
+        return len(self.customers)
+
+    @property
+    def state(self):
+        return pd.DataFrame({"first": self.first, "last": self.last, "frequency": self.frequency,
+                             "monetary": self.monetary}, index=self.customers)
+
+    def _customer_rows(self, customers):
+        # müşterilerin satır numaraları; yeni müşteriler boş toplamlarla (first/last min/max ile dolar) eklenir
+        customers = np.asarray(customers, dtype=np.float64)
+        unique = pd.unique(customers)
+        added = unique[self.customers.get_indexer(unique) < 0]
+        if len(added):
+            self.customers = self.customers.append(pd.Index(added, name="Customer ID"))
+            self.first = np.concatenate([self.first, np.full(len(added), np.iinfo(np.int64).max)])
+            self.last = np.concatenate([self.last, np.full(len(added), np.iinfo(np.int64).min)])
+            self.frequency = np.concatenate([self.frequency, np.zeros(len(added), dtype=np.int64)])
+            self.monetary = np.concatenate([self.monetary, np.zeros(len(added), dtype=np.float64)])
+        return self.customers.get_indexer(customers)
+
+    def _seen(self, keys):
+        if len(self.seen_pairs) == 0:
+            return np.zeros(len(keys), dtype=bool)
+        positions = np.minimum(np.searchsorted(self.seen_pairs, keys), len(self.seen_pairs) - 1)
+        return self.seen_pairs[positions] == keys
+
+    def update(self, chunk):
+        """
+        Parçayı toplamlara ekler.
+
+        Parameters
+        ----------
+        chunk: pd.DataFrame
+            clean_transactions çıktısı (TotalPrice dahil)
+
+        Returns
+        -------
+        pd.Index
+            parçada geçen (toplamı değişen) müşteriler
+
+        """
+        rows = self._customer_rows(chunk["Customer ID"])
+        # daha önceki parçalarda görülmemiş (müşteri, fatura) çiftleri
+        keys, first_rows = np.unique(invoice_keys(chunk["Customer ID"], chunk["Invoice"]), return_index=True)
+        new = ~self._seen(keys)
+        self.seen_pairs = np.insert(self.seen_pairs, np.searchsorted(self.seen_pairs, keys[new]), keys[new])
+        self.frequency += np.bincount(rows[first_rows[new]], minlength=len(self.frequency))
+
+        dates = chunk["InvoiceDate"].to_numpy(dtype="datetime64[ns]").view(np.int64)
+        np.minimum.at(self.first, rows, dates)
+        np.maximum.at(self.last, rows, dates)
+        np.add.at(self.monetary, rows, chunk["TotalPrice"].to_numpy(dtype=np.float64))
+        self.rows += len(chunk)
+        return self.customers[np.unique(rows)]
+
+    def drop_seen_invoices(self, chunk):
+        # önceki güncellemelerde eklenmiş (müşteri, fatura) çiftlerinin satırları atılır;
+        # aynı delta ikinci kez gelirse geliri tekrar eklenmez
+        return chunk[~self._seen(invoice_keys(chunk["Customer ID"], chunk["Invoice"]))]
+
+    def latest_date(self):
+        return pd.Timestamp(self.last.max())
+
+    def lifetime_aggregates(self, today_date):
+        # lifetime_table.lifetime_aggregates ile aynı kolonlar (index artan)
+        today = np.datetime64(pd.Timestamp(today_date), "ns").astype(np.int64)
+        order = np.argsort(self.customers.to_numpy(), kind="stable")
+        return pd.DataFrame({"recency": (self.last[order] - self.first[order]) // NS_PER_DAY,
+                             "T": (today - self.first[order]) // NS_PER_DAY,
+                             "frequency": self.frequency[order],
+                             "monetary": self.monetary[order]},
+                            index=self.customers[order])
+
+    def lifetime_table(self, today_date, min_frequency=1):
+        return finalize_lifetime_table(self.lifetime_aggregates(today_date), min_frequency)
+
+    def to_dict(self):
+        # np.savez ile yazılabilecek diziler (object dizisi yok; np.load pickle gerektirmez)
+        return {"customers": self.customers.to_numpy(), "first": self.first, "last": self.last,
+                "frequency": self.frequency, "monetary": self.monetary,
+                "seen_pairs": self.seen_pairs,
+                "rows": self.rows}
+
+    @classmethod
+    def from_dict(cls, arrays):
+        aggregates = cls()
+        aggregates.customers = pd.Index(np.asarray(arrays["customers"], dtype=np.float64), name="Customer ID")
+        aggregates.first = np.asarray(arrays["first"], dtype=np.int64).copy()
+        aggregates.last = np.asarray(arrays["last"], dtype=np.int64).copy()
+        aggregates.frequency = np.asarray(arrays["frequency"], dtype=np.int64).copy()
+        aggregates.monetary = np.asarray(arrays["monetary"], dtype=np.float64).copy()
+        aggregates.seen_pairs = np.asarray(arrays["seen_pairs"], dtype=np.uint64).copy()
+        aggregates.rows = int(arrays["rows"])
+        return aggregates
+
+
+def aggregate_transactions(chunks, thresholds=None):
+    """
+    Parçaları (generator da olabilir) ön işleyip müşteri bazında toplar.
+
+    Örnek:
+    parquet_path = excel_to_parquet("datasets/online_retail_II.xlsx")
+    thresholds = transaction_thresholds(iter_transaction_chunks(parquet_path, columns=[...]))
+    aggregates = aggregate_transactions(iter_transaction_chunks(parquet_path), thresholds)
+    cltv_df = aggregates.lifetime_table(today_date)
+
+    """
+    aggregates = CustomerAggregates()
+    for chunk in chunks:
+        aggregates.update(clean_transactions(chunk, thresholds))
+    return aggregates
+
+
+def check_streaming_lifetime_table(dataframe, today_date, chunksize=50_000):
+    """
+    Ham işlem tablosunu parçalara bölüp akışlı sonucu tek seferde hesaplananla karşılaştırır.
+
+    Returns
+    -------
+    bool
+        recency, T ve frequency birebir, monetary toplama sırasından dolayı 1e-9 toleransıyla eşitse True
+
+    """
+    from lifetime_table import create_lifetime_table
+
+    thresholds = transaction_thresholds([dataframe])
+    expected = create_lifetime_table(clean_transactions(dataframe, thresholds), today_date)
+    chunks = (dataframe.iloc[start:start + chunksize] for start in range(0, len(dataframe), chunksize))
+    result = aggregate_transactions(chunks, thresholds).lifetime_table(today_date)
+    return bool(result.index.equals(expected.index)
+                and all(np.array_equal(result[col].to_numpy(), expected[col].to_numpy())
+                        for col in ("recency", "T", "frequency"))
+                and np.allclose(result["monetary"], expected["monetary"], rtol=1e-9, atol=0))
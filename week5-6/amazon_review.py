@@ -1,7 +1,7 @@
 import pandas as pd
-import math
-import scipy.stats as st
-import datetime as dt
+
+# Skor fonksiyonları review_scores.py'de; kolonlar için vektörize sürümleri kullanılır
+from review_scores import score_up_down_diff_array, score_average_rating_array, wilson_lower_bound_array
 
 pd.set_option("display.max_columns", None)
 pd.set_option("display.expand_frame_repr", None)
@@ -27,51 +27,12 @@ df["helpful_no"] = df["total_vote"] - df["helpful_yes"]
 
 True + True & False + (True + False & True + False) ** 5
 
-def score_up_down_diff(up, down):
-    return up - down
-
-def score_average_rating(up, down):
-    if up + down == 0:
-        return 0
-    return up / (up+down)
-
-def wilson_lower_bound(up, down, confidence=0.95):
-    """
-    Wilson Lower Bound Score hesapla
-
-    - Bernoulli parametresi p için hesaplanacak güven aralığının alt sınırı WLB skoru olarak kabul edilir.
-    - Hesaplanacak skor ürün sıralaması için kullanılır.
-    - Not:
-    Eğer skorlar 1-5 arasıdaysa 1-3 negatif, 4-5 pozitif olarak işaretlenir ve bernoulli'ye uygun hale getirilebilir.
-    Bu beraberinde bazı problemleri de getirir. Bu sebeple bayesian average rating yapmak gerekir.
-
-    Parameters
-    ----------
-    up: int
-        up count
-    down: int
-        down count
-    confidence: float
-        confidence
-
-    Returns
-    -------
-    wilson score: float
-
-    """
-    n = up + down
-    if n == 0:
-        return 0
-    z = st.norm.ppf(1 - (1 - confidence) / 2)
-    phat = 1.0 * up / n
-    return (phat + z * z / (2 * n) - z * math.sqrt((phat * (1 - phat) + z * z / (4 * n)) / n)) / (1 + z * z / n)
-
 df = df[["overall", "reviewTime", "day_diff", "helpful_yes", "helpful_no","total_vote"]]
 df.head()
 
-df["score_pos_neg_diff"] = df.apply(lambda x: score_up_down_diff(x["helpful_yes"], x["helpful_no"]), axis=1)
-df["score_average_rating"] = df.apply(lambda x: score_average_rating(x["helpful_yes"], x["helpful_no"]), axis=1)
-df["wilson_lower_bound"] = df.apply(lambda x: wilson_lower_bound(x["helpful_yes"], x["helpful_no"]), axis=1)
+df["score_pos_neg_diff"] = score_up_down_diff_array(df["helpful_yes"], df["helpful_no"])
+df["score_average_rating"] = score_average_rating_array(df["helpful_yes"], df["helpful_no"])
+df["wilson_lower_bound"] = wilson_lower_bound_array(df["helpful_yes"], df["helpful_no"])
 
 df.head()
 
@@ -80,4 +41,21 @@ df.sort_values("wilson_lower_bound", ascending=False).head(20)
 df.drop(["asin", "helpful", "summary", "unixReviewTime", "days_cat", "days"], axis=1, inplace=True)
 df.head()
 
-df.to_csv("amazon_sentiment.csv", index=False)
\ No newline at end of file
+df.to_csv("amazon_sentiment.csv", index=False)
+
+# Büyük dosyalar için aynı kolonlar ve skorlar parça parça hesaplanıp yazılır (bellek sabit kalır):
+# python review_pipeline.py measurement_problems/amazon_review.csv amazon_sentiment.csv --chunksize 100000 --n-jobs 4
+
+# Her ürün (asin) için en faydalı 20 yorum; ürün başına tam sıralama yapılmaz
+# (asin'ler dosyadan önce okunan ham df'te yer alır)
+# from review_ranking import rank_reviews
+# top_reviews = rank_reviews(raw_df, by="wilson_lower_bound", n=20)
+# top_reviews.rows_of("B007WTAJTO")
+# top_reviews.to_frame(raw_df)
+
+# Sürekli gelen helpful oyları için artımlı skor indeksi (sadece değişen yorumlar yeniden skorlanır)
+# from review_index import ReviewScoreIndex
+# score_index = ReviewScoreIndex.from_dataframe(raw_df, id_column="reviewerID")
+# score_index.apply_votes(["A3SBTW3WS4IQSN"], up_delta=1)
+# score_index.top("B007WTAJTO", n=20)
+# score_index.snapshot("review_index.npz")
@@ -0,0 +1,103 @@
+###################################################
+# Rating İstatistikleri İçin Küçük Hesap Çekirdeği
+###################################################
+
+# wilson_lower_bound ve bayesian_average_rating her çağrıda st.norm.ppf ile z değerini
+# yeniden hesaplıyordu; ayrıca sadece bunun için import edilen scipy.stats script'lerin
+# açılışını ~1 sn uzatıyordu. Burada:
+# - yaygın güven düzeyleri için z değerleri tabloda hazır (scipy ile aynı değerler),
+# - diğer düzeyler bir kere hesaplanıp memoize edilir; scipy sadece bu durumda ve
+#   kuruluysa import edilir, yoksa standart kütüphanedeki statistics.NormalDist kullanılır,
+# - bayesian_average_rating'in tekil ve vektörize sürümleri.
+
+# 1. Z Tablosu ve Quantile'lar
+# 2. Bayesian Average Rating
+
+import math
+from functools import lru_cache
+from statistics import NormalDist
+
+import numpy as np
+
+# iki taraflı güven düzeyi -> z = norm.ppf(1 - (1 - confidence) / 2)
+Z_TABLE = {0.80: 1.2815515655446004,
+           0.90: 1.6448536269514722,
+           0.95: 1.959963984540054,
+           0.975: 2.241402727604947,
+           0.99: 2.5758293035489004,
+           0.995: 2.807033768343811,
+           0.999: 3.2905267314919255}
+
+
+###################################################
+# 1. Z Tablosu ve Quantile'lar
+###################################################
+
+@lru_cache(maxsize=None)
+def norm_ppf(q):
+    # standart normal dağılımın q quantile'ı; scipy sadece burada, ilk ihtiyaçta import edilir
+    try:
+        import scipy.stats as st
+    except ImportError:
+        return NormalDist().inv_cdf(q)
+    return float(st.norm.ppf(q))
+
+
+def z_score(confidence=0.95):
+    # iki taraflı güven aralığı için normal dağılım kritik değeri
+    z = Z_TABLE.get(round(confidence, 6))
+    if z is None:
+        z = norm_ppf(1 - (1 - confidence) / 2)
+    return z
+
+
+###################################################
+# 2. Bayesian Average Rating
+###################################################
+
+def bayesian_average_rating(n, confidence=0.95):
+    """
+    Puan dağılımları üzerinden olasılıksal ortalama (Sorting Products / IMDB notebook'ları).
+
+    Parameters
+    ----------
+    n: list
+        1'den K'ya her puanın kaç kez verildiği
+    confidence: float
+        confidence
+
+    Returns
+    -------
+    score: float
+
+    """
+    if sum(n) == 0:
+        return 0
+    K = len(n)
+    z = z_score(confidence)
+    N = sum(n)
+    first_part = 0.0
+    second_part = 0.0
+    for k, n_k in enumerate(n):
+        first_part += (k + 1) * (n_k + 1) / (N + K)
+        second_part += (k + 1) * (k + 1) * (n_k + 1) / (N + K)
+    return first_part - z * math.sqrt((second_part - first_part * first_part) / (N + K + 1))
+
+
+def bayesian_average_rating_array(counts, confidence=0.95):
+    """
+    bayesian_average_rating'in satır başına bir ürün olan (n_products, K) matris için sürümü.
+
+    df.apply(lambda x: bayesian_average_rating(x[[...]]), axis=1) yerine
+    bayesian_average_rating_array(df[[...]]) kullanılabilir. Hiç puanı olmayan ürünler 0 olur.
+
+    """
+    counts = np.asarray(counts, dtype=np.float64)
+    K = counts.shape[1]
+    N = counts.sum(axis=1)
+    stars = np.arange(1, K + 1)
+    probs = (counts + 1) / (N + K)[:, None]
+    first_part = probs @ stars
+    second_part = probs @ stars ** 2
+    score = first_part - z_score(confidence) * np.sqrt((second_part - first_part ** 2) / (N + K + 1))
+    return np.where(N > 0, score, 0.0)
@@ -0,0 +1,185 @@
+###################################################
+# Oy Değişimleriyle Güncellenen Review Skor İndeksi
+###################################################
+
+# Helpful oyları sürekli geliyor; her seferinde tüm wilson_lower_bound'ları yeniden
+# hesaplayıp tabloyu yeniden sıralamak gerekiyordu. Burada bellekte review id'ye göre
+# up/down sayıları ve cache'lenmiş skor tutulur:
+# - bir oy değişimi (delta) batch'i sadece dokunulan satırların skorunu yeniden hesaplar,
+# - her ürün için bir max-heap sıralamayı güncel tutar; eski heap kayıtları satır
+#   versiyonu ile ayırt edilir ve okunurken atılır (lazy deletion),
+# - indeks diske snapshot olarak yazılıp geri okunabilir.
+# Eşit skorlarda review_ranking ile aynı şekilde orijinal satır sırası korunur.
+
+# 1. ReviewScoreIndex
+
+import heapq
+import os
+
+import numpy as np
+import pandas as pd
+
+from review_ranking import SCORES
+from review_scores import wilson_lower_bound_array
+
+
+###################################################
+# 1. ReviewScoreIndex
+###################################################
+
+def _fixed_width(values):
+    values = np.asarray(values)
+    return values.astype(str) if values.dtype == object else values
+
+
+class ReviewScoreIndex:
+    """
+    Review id -> (ürün, up, down, skor) indeksi ve ürün bazında güncel sıralama.
+
+    Parameters
+    ----------
+    review_ids: array-like
+        tekil review id'leri
+    asins: array-like
+        review'ların ürünleri
+    up, down: array-like
+        başlangıç oy sayıları
+    by: str
+        review_ranking.SCORES'taki skorlardan biri
+    confidence: float
+        wilson_lower_bound güven düzeyi
+
+    """
+
+    def __init__(self, review_ids, asins, up, down, by="wilson_lower_bound", confidence=0.95):
+        if by not in SCORES:
+            raise ValueError(f"by {tuple(SCORES)} değerlerinden biri olmalı: {by}")
+        self.by = by
+        self.confidence = confidence
+        self.review_ids = pd.Index(review_ids)
+        if not self.review_ids.is_unique:
+            raise ValueError("review_ids tekil olmalı")
+        self.asin_codes, self.asins = pd.factorize(np.asarray(asins))
+        self.up = np.asarray(up, dtype=np.int64).copy()
+        self.down = np.asarray(down, dtype=np.int64).copy()
+        self.scores = self._score(self.up, self.down)
+        self.versions = np.zeros(len(self.up), dtype=np.int64)
+        self.asin_index = {asin: code for code, asin in enumerate(self.asins)}
+        self.asin_sizes = np.bincount(self.asin_codes, minlength=len(self.asins))
+        # sort-once: ürün i'nin satırları asin_rows[asin_starts[i]:asin_starts[i + 1]]
+        self.asin_rows = np.argsort(self.asin_codes, kind="stable")
+        self.asin_starts = np.concatenate([[0], np.cumsum(self.asin_sizes)])
+        # ürün kodu -> [(-skor, satır, versiyon)]; ilk top() sorgusunda kurulur
+        self._heaps = {}
+
+    @classmethod
+    def from_dataframe(cls, dataframe, id_column=None, asin="asin", up="helpful_yes", down="helpful_no", **kwargs):
+        review_ids = dataframe.index if id_column is None else dataframe[id_column]
+        return cls(review_ids, dataframe[asin], dataframe[up], dataframe[down], **kwargs)
+
+    def __len__(self):
+        return len(self.up)
+
+    def _score(self, up, down):
+        if self.by == "wilson_lower_bound":
+            return wilson_lower_bound_array(up, down, self.confidence)
+        return np.asarray(SCORES[self.by](up, down), dtype=np.float64)
+
+    def _rows(self, review_ids):
+        rows = self.review_ids.get_indexer(np.asarray(review_ids))
+        if (rows < 0).any():
+            raise KeyError(f"indekste olmayan review id'leri: {np.asarray(review_ids)[rows < 0][:5].tolist()}")
+        return rows
+
+    def score_of(self, review_id):
+        row = self._rows([review_id])[0]
+        return self.up[row], self.down[row], self.scores[row]
+
+    def apply_votes(self, review_ids, up_delta=0, down_delta=0):
+        """
+        Oy değişimlerini uygular; sadece dokunulan satırların skoru yeniden hesaplanır.
+
+        Aynı review birden fazla kez geçebilir, değişimler toplanır.
+
+        Returns
+        -------
+        int
+            skoru yeniden hesaplanan review sayısı
+
+        """
+        rows = self._rows(review_ids)
+        up_delta = np.broadcast_to(np.asarray(up_delta, dtype=np.int64), rows.shape)
+        down_delta = np.broadcast_to(np.asarray(down_delta, dtype=np.int64), rows.shape)
+        np.add.at(self.up, rows, up_delta)
+        np.add.at(self.down, rows, down_delta)
+        if (self.up[rows] < 0).any() or (self.down[rows] < 0).any():
+            # batch bütün olarak geri alınır
+            np.subtract.at(self.up, rows, up_delta)
+            np.subtract.at(self.down, rows, down_delta)
+            raise ValueError("oy sayısı negatif olamaz")
+        touched = np.unique(rows)
+        self.scores[touched] = self._score(self.up[touched], self.down[touched])
+        self.versions[touched] += 1
+        # heap'i kurulmuş ürünlere yeni kayıt eklenir; eski kayıt versiyonu tutmadığı için atlanır
+        for row in touched.tolist():
+            code = self.asin_codes[row]
+            heap = self._heaps.get(code)
+            if heap is not None:
+                heapq.heappush(heap, (-self.scores[row], row, self.versions[row]))
+                self._drop_if_stale(code, heap)
+        return len(touched)
+
+    def _heap(self, code):
+        heap = self._heaps.get(code)
+        if heap is None:
+            rows = self.asin_rows[self.asin_starts[code]:self.asin_starts[code + 1]]
+            heap = list(zip((-self.scores[rows]).tolist(), rows.tolist(), self.versions[rows].tolist()))
+            heapq.heapify(heap)
+            self._heaps[code] = heap
+        return heap
+
+    def _drop_if_stale(self, code, heap):
+        # eski kayıtlar geçerlilerin iki katını aşarsa heap atılır, sonraki top() sorgusunda yeniden kurulur
+        if len(heap) > 2 * self.asin_sizes[code] + 64:
+            del self._heaps[code]
+
+    def top(self, asin, n=20):
+        """
+        Ürünün en yüksek skorlu n review'u.
+
+        Returns
+        -------
+        review_ids, scores: np.ndarray, np.ndarray
+
+        """
+        code = self.asin_index[asin]
+        heap = self._heap(code)
+        best = []
+        while heap and len(best) < n:
+            entry = heapq.heappop(heap)
+            if entry[2] == self.versions[entry[1]]:
+                best.append(entry)
+        for entry in best:
+            heapq.heappush(heap, entry)
+        self._drop_if_stale(code, heap)
+        rows = np.array([row for _, row, _ in best], dtype=np.int64)
+        return self.review_ids[rows].to_numpy(), self.scores[rows]
+
+    def to_frame(self):
+        return pd.DataFrame({"review_id": self.review_ids, "asin": self.asins[self.asin_codes],
+                             "up": self.up, "down": self.down, self.by: self.scores})
+
+    def snapshot(self, path):
+        # skorlar ve heap'ler yüklenirken yeniden hesaplanır; yazma atomiktir
+        tmp_path = path + ".tmp.npz"
+        # object dizileri sabit genişlikli str olarak yazılır; load pickle gerektirmez
+        np.savez(tmp_path, review_ids=_fixed_width(self.review_ids.to_numpy()),
+                 asins=_fixed_width(self.asins[self.asin_codes]),
+                 up=self.up, down=self.down, by=self.by, confidence=self.confidence)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as f:
+            return cls(f["review_ids"], f["asins"], f["up"], f["down"], by=str(f["by"]),
+                       confidence=float(f["confidence"]))
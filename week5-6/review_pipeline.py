@@ -0,0 +1,184 @@
+###################################################
+# Parça Parça (Streaming) Review Skorlama
+###################################################
+
+# amazon_review.py tüm amazon_review.csv'yi belleğe alıp kolonları ekliyor, skorları
+# hesaplıyor ve amazon_sentiment.csv'yi yazıyor. Burada dosya parça parça (chunk) okunur:
+# her parça için days, helpful_no ve vektörize skorlar hesaplanıp çıktıya eklenerek yazılır.
+# Bellek kullanımı dosya boyutuna değil chunksize'a bağlıdır.
+# days için gereken en güncel tarih önce sadece reviewTime kolonu okunarak bulunur
+# (ya da current_date olarak verilir). Parçalar istenirse process'lere dağıtılır;
+# aynı anda işlenen parça sayısı sınırlıdır ve çıktı sırası korunur.
+
+# 1. Okuma
+# 2. Parça Skorlama
+# 3. Pipeline
+# 4. Komut Satırı (CLI)
+
+# Kullanım:
+# python review_pipeline.py measurement_problems/amazon_review.csv amazon_sentiment.csv --chunksize 100000 --n-jobs 4
+
+import argparse
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from review_scores import score_average_rating_array, score_up_down_diff_array, wilson_lower_bound_array
+
+INPUT_COLUMNS = ["overall", "reviewTime", "day_diff", "helpful_yes", "total_vote"]
+OUTPUT_COLUMNS = ["overall", "reviewTime", "day_diff", "days", "helpful_yes", "helpful_no", "total_vote",
+                  "score_pos_neg_diff", "score_average_rating", "wilson_lower_bound"]
+
+
+###################################################
+# 1. Okuma
+###################################################
+
+def read_review_chunks(path, chunksize=100_000):
+    return pd.read_csv(path, usecols=INPUT_COLUMNS, chunksize=chunksize)
+
+
+def latest_review_date(path, chunksize=1_000_000):
+    # sadece reviewTime kolonu üzerinden geçilir
+    latest = None
+    for chunk in pd.read_csv(path, usecols=["reviewTime"], chunksize=chunksize):
+        chunk_max = pd.to_datetime(chunk["reviewTime"]).max()
+        if latest is None or chunk_max > latest:
+            latest = chunk_max
+    return latest
+
+
+###################################################
+# 2. Parça Skorlama
+###################################################
+
+def score_chunk(chunk, current_date, confidence=0.95):
+    """
+    amazon_review.py'deki kolon ve skor hesaplarını tek bir parça için yapar.
+
+    Parameters
+    ----------
+    chunk: pd.DataFrame
+        INPUT_COLUMNS kolonlarını içeren yorumlar
+    current_date: pd.Timestamp
+        days = (current_date - reviewTime) için referans tarih (tüm dosyanın en güncel tarihi)
+    confidence: float
+        wilson_lower_bound güven düzeyi
+
+    Returns
+    -------
+    pd.DataFrame
+        OUTPUT_COLUMNS
+
+    """
+    review_time = pd.to_datetime(chunk["reviewTime"])
+    helpful_no = chunk["total_vote"] - chunk["helpful_yes"]
+    scored = chunk.assign(reviewTime=review_time,
+                          days=(current_date - review_time).dt.days,
+                          helpful_no=helpful_no,
+                          score_pos_neg_diff=score_up_down_diff_array(chunk["helpful_yes"], helpful_no),
+                          score_average_rating=score_average_rating_array(chunk["helpful_yes"], helpful_no),
+                          wilson_lower_bound=wilson_lower_bound_array(chunk["helpful_yes"], helpful_no, confidence))
+    return scored[OUTPUT_COLUMNS]
+
+
+###################################################
+# 3. Pipeline
+###################################################
+
+def iter_scored_chunks(chunks, current_date, confidence=0.95, n_jobs=1, max_pending=None):
+    """
+    Parçaları sırayla skorlar; n_jobs > 1 ise process pool kullanılır.
+
+    Executor.map tüm girdiyi baştan tükettiği için burada en fazla max_pending
+    (varsayılan 2 * n_jobs) parça aynı anda bellekte tutulur.
+
+    """
+    if n_jobs == 1:
+        for chunk in chunks:
+            yield score_chunk(chunk, current_date, confidence)
+        return
+    max_pending = 2 * n_jobs if max_pending is None else max_pending
+    with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(executor.submit(score_chunk, chunk, current_date, confidence))
+            if len(pending) >= max_pending:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def run_review_pipeline(source, output_path, current_date=None, chunksize=100_000, confidence=0.95, n_jobs=1):
+    """
+    Yorumları parça parça skorlayıp output_path'e ekleyerek yazar.
+
+    Parameters
+    ----------
+    source: str or iterable
+        csv yolu ya da DataFrame parçaları üreten bir generator
+    output_path: str
+        yazılacak csv
+    current_date: pd.Timestamp, optional
+        verilmezse csv'nin en güncel reviewTime'ı; source generator ise zorunlu
+    chunksize: int
+        csv'den bir seferde okunacak satır sayısı
+    n_jobs: int
+        process sayısı
+
+    Returns
+    -------
+    int
+        yazılan satır sayısı
+
+    """
+    if isinstance(source, str):
+        if current_date is None:
+            current_date = latest_review_date(source)
+        chunks = read_review_chunks(source, chunksize=chunksize)
+    elif current_date is None:
+        raise ValueError("source bir generator ise current_date verilmeli")
+    else:
+        chunks = source
+    current_date = pd.Timestamp(current_date)
+
+    if os.path.exists(output_path):
+        os.remove(output_path)
+    rows = 0
+    header_written = False
+    for scored in iter_scored_chunks(chunks, current_date, confidence=confidence, n_jobs=n_jobs):
+        # boş parçalar (ya da filtreden sonra boşalanlar) atlanır; header bir kere yazılır
+        if len(scored) == 0:
+            continue
+        scored.to_csv(output_path, mode="a", header=not header_written, index=False)
+        header_written = True
+        rows += len(scored)
+    if not header_written:
+        pd.DataFrame(columns=OUTPUT_COLUMNS).to_csv(output_path, index=False)
+    return rows
+
+
+###################################################
+# 4. Komut Satırı (CLI)
+###################################################
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="amazon_review.csv'yi parça parça skorlar")
+    parser.add_argument("input_path")
+    parser.add_argument("output_path")
+    parser.add_argument("--chunksize", type=int, default=100_000)
+    parser.add_argument("--confidence", type=float, default=0.95)
+    parser.add_argument("--current-date", help="days için referans tarih (varsayılan: en güncel yorum)")
+    parser.add_argument("--n-jobs", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    rows = run_review_pipeline(args.input_path, args.output_path, current_date=args.current_date,
+                               chunksize=args.chunksize, confidence=args.confidence, n_jobs=args.n_jobs)
+    print(f"{rows} yorum -> {args.output_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
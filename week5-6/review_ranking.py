@@ -0,0 +1,182 @@
+###################################################
+# Ürün Bazında Top-N Review Sıralaması
+###################################################
+
+# amazon_review.py yorumları global bir df.sort_values("wilson_lower_bound").head(20) ile
+# sıralıyor. Her asin için en faydalı N yorumu bulmak için ürün başına tam sıralama
+# yerine:
+# - satırlar bir kere asin koduna göre gruplanır (sort-once, segment offset'leri),
+# - N'den büyük segmentlerde np.partition (argpartition ile aynı seçim) ile sadece ilk N aday seçilir
+#   (benzer boyuttaki segmentler tek bir matriste birlikte),
+# - sadece seçilen N aday sıralanır.
+# Sonuç CSR benzeri kompakt bir indekstir: ürün i'nin yorumları
+# rows[indptr[i]:indptr[i + 1]] (skora göre azalan sırada).
+
+# 1. ProductTopN Yapısı
+# 2. Grup İçi Top-N
+# 3. Skora Göre Sıralama
+
+import numpy as np
+import pandas as pd
+
+from review_scores import score_average_rating_array, score_up_down_diff_array, wilson_lower_bound_array
+
+# sorting_reviews.py'deki skorlar; kolon yoksa up/down'dan hesaplanır
+SCORES = {"score_pos_neg_diff": score_up_down_diff_array,
+          "score_average_rating": score_average_rating_array,
+          "wilson_lower_bound": wilson_lower_bound_array}
+
+
+###################################################
+# 1. ProductTopN Yapısı
+###################################################
+
+class ProductTopN:
+    """
+    Ürün başına en yüksek skorlu yorumların kompakt indeksi.
+
+    Parameters
+    ----------
+    groups: np.ndarray
+        ürün kodu -> asin
+    indptr: np.ndarray
+        (n_groups + 1,) segment offset'leri
+    rows: np.ndarray
+        orijinal DataFrame'deki satır pozisyonları (ürün içinde skora göre azalan)
+    scores: np.ndarray
+        rows ile aynı sırada skorlar
+
+    """
+
+    def __init__(self, groups, indptr, rows, scores):
+        self.groups = np.asarray(groups)
+        self.indptr = indptr
+        self.rows = rows
+        self.scores = scores
+        self.group_index = {group: i for i, group in enumerate(self.groups)}
+
+    def __len__(self):
+        return len(self.groups)
+
+    def rows_of(self, group):
+        # (satır pozisyonları, skorlar)
+        i = self.group_index[group]
+        return self.rows[self.indptr[i]:self.indptr[i + 1]], self.scores[self.indptr[i]:self.indptr[i + 1]]
+
+    def to_frame(self, dataframe=None, group_name="asin"):
+        # uzun format: ürün, sıra, satır, skor (+ istenirse orijinal kolonlar)
+        counts = np.diff(self.indptr)
+        ranks = np.arange(len(self.rows)) - np.repeat(self.indptr[:-1], counts) + 1
+        frame = pd.DataFrame({group_name: np.repeat(self.groups, counts), "rank": ranks,
+                              "row": self.rows, "score": self.scores})
+        if dataframe is not None:
+            frame = pd.concat([frame, dataframe.iloc[self.rows].drop(columns=group_name, errors="ignore")
+                              .reset_index(drop=True)], axis=1)
+        return frame
+
+
+###################################################
+# 2. Grup İçi Top-N
+###################################################
+
+def top_n_per_group(groups, scores, n=20):
+    """
+    Her grup için en yüksek n skoru seçer.
+
+    Eşit skorlarda orijinal satır sırası korunur; NaN skorlar en sona düşer.
+    Grubu NaN olan satırlar atılır; n <= 0 ise tüm gruplar boş döner.
+
+    Parameters
+    ----------
+    groups: array-like
+        satır başına grup (asin)
+    scores: array-like
+        satır başına skor
+    n: int
+        grup başına tutulacak satır sayısı
+
+    Returns
+    -------
+    ProductTopN
+
+    """
+    codes, uniques = pd.factorize(np.asarray(groups), sort=True)
+    scores = np.asarray(scores, dtype=np.float64)
+    scores = np.where(np.isnan(scores), -np.inf, scores)
+    if n <= 0:
+        return ProductTopN(uniques, np.zeros(len(uniques) + 1, dtype=np.int64),
+                           np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64))
+
+    # sort-once: satırlar grup koduna göre (grup içinde orijinal sırayla) dizilir;
+    # grubu NaN olan satırlar (factorize kodu -1) groupby'daki gibi atılır
+    grouped = np.flatnonzero(codes >= 0)
+    order = grouped[np.argsort(codes[grouped], kind="stable")]
+    sizes = np.bincount(codes[grouped], minlength=len(uniques))
+    starts = np.concatenate([[0], np.cumsum(sizes)])
+    kept = np.minimum(sizes, n)
+
+    selected = np.empty(kept.sum(), dtype=np.int64)
+    indptr = np.concatenate([[0], np.cumsum(kept)])
+    small = sizes <= n
+    # n'den küçük segmentler olduğu gibi alınır
+    small_rows = np.repeat(small, sizes)
+    selected[np.repeat(small, kept)] = order[small_rows]
+    # büyük segmentler boyutlarına göre 2'nin kuvveti aralıklarında gruplanıp (padding <= 2x)
+    # matris olarak işlenir; tam sıralama yok: np.partition ile her satırın n. en büyük skoru (eşik)
+    # bulunur, eşikten büyükler ve eşite eşit olanlardan orijinal sıradaki ilkleri alınır
+    big = np.flatnonzero(~small)
+    buckets = np.floor(np.log2(sizes[big])).astype(int) if len(big) else big
+    for bucket in np.unique(buckets):
+        segments = big[buckets == bucket]
+        width = sizes[segments].max()
+        offsets = np.arange(width)
+        valid = offsets < sizes[segments][:, None]
+        rows = order[np.where(valid, starts[segments][:, None] + offsets, 0)]
+        segment_scores = np.where(valid, scores[rows], -np.inf)
+        kth = -np.partition(-segment_scores, n - 1, axis=1)[:, n - 1]
+        above = valid & (segment_scores > kth[:, None])
+        ties = valid & (segment_scores == kth[:, None])
+        ties &= np.cumsum(ties, axis=1) <= (n - above.sum(axis=1))[:, None]
+        selected[indptr[segments][:, None] + np.arange(n)] = rows[above | ties].reshape(len(segments), n)
+
+    # sadece seçilen satırlar sıralanır: grup, skor (azalan), orijinal sıra
+    segment_codes = np.repeat(np.arange(len(uniques)), kept)
+    final = np.lexsort((selected, -scores[selected], segment_codes))
+    rows = selected[final]
+    return ProductTopN(uniques, indptr, rows, scores[rows])
+
+
+###################################################
+# 3. Skora Göre Sıralama
+###################################################
+
+def rank_reviews(dataframe, by="wilson_lower_bound", n=20, group="asin", up="helpful_yes", down="helpful_no",
+                 confidence=0.95):
+    """
+    Her ürün için en faydalı n yorumu verilen skora göre sıralar.
+
+    Parameters
+    ----------
+    dataframe: pd.DataFrame
+        group kolonu ve skor kolonu ya da up/down kolonlarını içeren yorumlar
+    by: str
+        SCORES'taki skorlardan biri
+    n: int
+        ürün başına yorum sayısı
+    up, down: str
+        skor kolonu yoksa skorun hesaplanacağı kolonlar
+
+    Returns
+    -------
+    ProductTopN
+
+    """
+    if by not in SCORES:
+        raise ValueError(f"by {tuple(SCORES)} değerlerinden biri olmalı: {by}")
+    if by in dataframe:
+        scores = dataframe[by].to_numpy()
+    elif by == "wilson_lower_bound":
+        scores = wilson_lower_bound_array(dataframe[up], dataframe[down], confidence)
+    else:
+        scores = SCORES[by](dataframe[up], dataframe[down])
+    return top_n_per_group(dataframe[group].to_numpy(), scores, n=n)
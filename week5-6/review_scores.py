@@ -0,0 +1,102 @@
+###################################################
+# Vektörize Review Skorları
+###################################################
+
+# sorting_reviews ve amazon_review'daki skorlar df.apply(lambda x: ..., axis=1) ile
+# satır satır hesaplanıyordu; wilson_lower_bound her satırda st.norm.ppf'i yeniden çağırıyordu.
+# Burada üç skor da up/down dizilerinin tamamı üzerinde NumPy ile hesaplanır:
+# - n == 0 olan satırlar maske ile 0 olur (bölme uyarısı yok),
+# - z her güven düzeyi için bir kere hesaplanır (rating_stats; scipy import edilmez).
+# Tekil (scalar) fonksiyonlar aynı isim ve davranışla ince sarmalayıcı olarak kalır.
+
+# 1. Dizi Fonksiyonları
+# 2. Scalar API
+
+import numpy as np
+
+from rating_stats import z_score
+
+
+###################################################
+# 1. Dizi Fonksiyonları
+###################################################
+
+def score_up_down_diff_array(up, down):
+    return np.asarray(up) - np.asarray(down)
+
+
+def score_average_rating_array(up, down):
+    up = np.asarray(up, dtype=np.float64)
+    n = up + np.asarray(down, dtype=np.float64)
+    return np.divide(up, n, out=np.zeros_like(n), where=n > 0)
+
+
+def wilson_lower_bound_array(up, down, confidence=0.95):
+    """
+    Wilson Lower Bound Score'u tüm yorumlar için tek seferde hesaplar.
+
+    Parameters
+    ----------
+    up: array-like
+        up count
+    down: array-like
+        down count
+    confidence: float
+        confidence
+
+    Returns
+    -------
+    wilson score: np.ndarray
+        up/down ile aynı boyutta; hiç oy almamış yorumlar için 0
+
+    """
+    up = np.asarray(up, dtype=np.float64)
+    n = up + np.asarray(down, dtype=np.float64)
+    z = z_score(confidence)
+    score = np.zeros_like(n)
+    voted = n > 0
+    up, n = up[voted], n[voted]
+    phat = up / n
+    score[voted] = (phat + z * z / (2 * n) - z * np.sqrt((phat * (1 - phat) + z * z / (4 * n)) / n)) / (1 + z * z / n)
+    return score
+
+
+###################################################
+# 2. Scalar API
+###################################################
+
+def score_up_down_diff(up, down):
+    return up - down
+
+
+def score_average_rating(up, down):
+    if up + down == 0:
+        return 0
+    return float(score_average_rating_array(up, down))
+
+
+def wilson_lower_bound(up, down, confidence=0.95):
+    """
+    Wilson Lower Bound Score hesapla
+
+    - Bernoulli parametresi p için hesaplanacak güven aralığının alt sınırı WLB skoru olarak kabul edilir.
+    - Hesaplanacak skor ürün sıralaması için kullanılır.
+    - Tek yorum için wilson_lower_bound_array'in sarmalayıcısıdır.
+
+    Parameters
+    ----------
+    up: int
+        up count
+    down: int
+        down count
+    confidence: float
+        confidence
+
+    Returns
+    -------
+    wilson score: float
+
+    """
+    if up + down == 0:
+        return 0
+    return float(wilson_lower_bound_array([up], [down], confidence)[0])
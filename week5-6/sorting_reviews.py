@@ -4,7 +4,8 @@
 
 import pandas as pd
 import math
-import scipy.stats as st
+# z değerleri hazır tablodan / memoize edilerek gelir; scipy.stats import edilmez
+from rating_stats import z_score
 
 pd.set_option('display.max_columns', None)
 pd.set_option('display.expand_frame_repr', False)
@@ -83,7 +84,7 @@ def wilson_lower_bound(up, down, confidence=0.95):
     n = up + down
     if n == 0:
         return 0
-    z = st.norm.ppf(1 - (1 - confidence) / 2)
+    z = z_score(confidence)
     phat = 1.0 * up / n
     return (phat + z * z / (2 * n) - z * math.sqrt((phat * (1 - phat) + z * z / (4 * n)) / n)) / (1 + z * z / n)
 
@@ -105,15 +106,18 @@ comments = pd.DataFrame({"up": up, "down": down})
 
 
 
+# Skorlar df.apply ile satır satır değil, up/down kolonlarının tamamı üzerinde hesaplanır
+# (review_scores.py); z güven düzeyi başına bir kere bulunur, n == 0 satırları 0 olur.
+from review_scores import score_up_down_diff_array, score_average_rating_array, wilson_lower_bound_array
+
 # score_pos_neg_diff
-comments["score_pos_neg_diff"] = comments.apply(lambda x: score_up_down_diff(x["up"],
-                                                                             x["down"]), axis=1)
+comments["score_pos_neg_diff"] = score_up_down_diff_array(comments["up"], comments["down"])
 
 # score_average_rating
-comments["score_average_rating"] = comments.apply(lambda x: score_average_rating(x["up"], x["down"]), axis=1)
+comments["score_average_rating"] = score_average_rating_array(comments["up"], comments["down"])
 
 # wilson_lower_bound
-comments["wilson_lower_bound"] = comments.apply(lambda x: wilson_lower_bound(x["up"], x["down"]), axis=1)
+comments["wilson_lower_bound"] = wilson_lower_bound_array(comments["up"], comments["down"])
 
 
 
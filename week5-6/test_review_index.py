@@ -0,0 +1,80 @@
+###################################################
+# ReviewScoreIndex Testleri
+###################################################
+
+# python -m pytest week5-6/test_review_index.py
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from review_index import ReviewScoreIndex
+from review_ranking import rank_reviews
+
+
+def sample_reviews(n_reviews=2000, n_products=40, seed=42):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({"review_id": [f"r{i}" for i in range(n_reviews)],
+                         "asin": rng.choice([f"B{i:04d}" for i in range(n_products)], n_reviews),
+                         "helpful_yes": rng.integers(0, 30, n_reviews),
+                         "helpful_no": rng.integers(0, 10, n_reviews)})
+
+
+def assert_top_matches(index, dataframe, by, n):
+    # rank_reviews ile güncel oy sayılarından baştan hesaplanan sıralama aynı olmalı
+    expected = rank_reviews(dataframe, by=by, n=n)
+    for asin in expected.groups:
+        rows, scores = expected.rows_of(asin)
+        review_ids, index_scores = index.top(asin, n=n)
+        assert review_ids.tolist() == dataframe["review_id"].to_numpy()[rows].tolist()
+        np.testing.assert_allclose(index_scores, scores)
+
+
+@pytest.mark.parametrize("by", ["wilson_lower_bound", "score_pos_neg_diff", "score_average_rating"])
+def test_top_matches_rank_reviews_after_vote_batches(by):
+    df = sample_reviews()
+    index = ReviewScoreIndex.from_dataframe(df, id_column="review_id", by=by)
+    rng = np.random.default_rng(0)
+    assert_top_matches(index, df, by, n=5)
+    for _ in range(50):
+        rows = rng.integers(0, len(df), 100)
+        up_delta = rng.integers(0, 5, len(rows))
+        down_delta = rng.integers(0, 3, len(rows))
+        index.apply_votes(df["review_id"].to_numpy()[rows], up_delta, down_delta)
+        np.add.at(df["helpful_yes"].to_numpy(), rows, up_delta)
+        np.add.at(df["helpful_no"].to_numpy(), rows, down_delta)
+        assert_top_matches(index, df, by, n=5)
+
+
+def test_negative_votes_roll_back_batch():
+    df = sample_reviews(n_reviews=50, n_products=3)
+    index = ReviewScoreIndex.from_dataframe(df, id_column="review_id")
+    before = index.to_frame()
+    with pytest.raises(ValueError):
+        index.apply_votes(["r0", "r1"], up_delta=[1, -1000])
+    pd.testing.assert_frame_equal(index.to_frame(), before)
+
+
+def test_heaps_stay_bounded_under_votes():
+    df = sample_reviews(n_reviews=100, n_products=2)
+    index = ReviewScoreIndex.from_dataframe(df, id_column="review_id")
+    asin = df["asin"].iloc[0]
+    code = index.asin_index[asin]
+    index.top(asin)
+    review_id = df.loc[df["asin"] == asin, "review_id"].iloc[0]
+    for _ in range(1000):
+        index.apply_votes([review_id], up_delta=1)
+        assert len(index._heaps.get(code, [])) <= 2 * index.asin_sizes[code] + 64
+    df.loc[df["review_id"] == review_id, "helpful_yes"] += 1000
+    assert_top_matches(index, df, "wilson_lower_bound", n=5)
+
+
+def test_snapshot_round_trip(tmp_path):
+    df = sample_reviews(n_reviews=300, n_products=5)
+    index = ReviewScoreIndex.from_dataframe(df, id_column="review_id", by="score_average_rating")
+    index.apply_votes(["r3", "r7"], up_delta=[2, 0], down_delta=[0, 4])
+    path = str(tmp_path / "review_index.npz")
+    index.snapshot(path)
+    loaded = ReviewScoreIndex.load(path)
+    pd.testing.assert_frame_equal(loaded.to_frame(), index.to_frame())
+    assert loaded.by == index.by
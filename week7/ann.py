@@ -0,0 +1,243 @@
+#############################################
+# Yaklaşık En Yakın Komşu (ANN) Backend'i
+#############################################
+
+# item_based_recommender ve user_based_recommender'daki tam korelasyon araması
+# sorgu başına tüm kullanıcı/filmleri tarar. Burada ortalamaya göre merkezlenmiş
+# ve L2 normalize rating vektörleri indekslenir; cosine benzerliği merkezlenmiş
+# vektörlerde Pearson'a karşılık gelir.
+# Backend'ler aynı arayüzü kullanır (fit / query / query_rows), böylece tam
+# (ExactBackend) ve yaklaşık (LSHBackend) arama birbirinin yerine takılabilir.
+# LSH: random projection (SimHash). Her tabloda n_bits hiperdüzlemin işaretleri bir
+# bucket anahtarı oluşturur; adaylar tüm tablolardaki bucket'ların birleşimidir ve
+# adaylar tam skorla yeniden sıralanır. n_tables arttıkça recall artar, n_bits
+# arttıkça bucket'lar küçülür ve sorgu hızlanır; multi-probe (n_probes) ile komşu
+# bucket'lara da bakılarak daha az tabloyla aynı recall elde edilir.
+
+# 1. Vektörlerin Hazırlanması
+# 2. Exact Backend
+# 3. LSH Backend
+# 4. Recall@k Değerlendirmesi
+# 5. Komut Satırı (CLI)
+
+# Kullanım:
+# python ann.py --kind user --tables 16 --bits 10 --probes 4 --k 20 --queries 200
+
+import argparse
+import time
+
+import numpy as np
+import scipy.sparse as sp
+
+from content_topk import topk_from_dense
+from rating_matrix import center_rows, load_user_movie_matrix
+
+
+#############################################
+# 1. Vektörlerin Hazırlanması
+#############################################
+
+def user_vectors(user_movie_matrix):
+    # satır: kullanıcı, kullanıcı ortalamasına göre merkezlenmiş
+    return center_rows(user_movie_matrix.csr)
+
+
+def item_vectors(user_movie_matrix):
+    # satır: film, film ortalamasına göre merkezlenmiş (corrwith'in yaklaşığı)
+    return center_rows(user_movie_matrix.csc.T)
+
+
+#############################################
+# 2. Exact Backend
+#############################################
+
+class ExactBackend:
+    # tüm vektörlerle tek sparse çarpım + top-k
+
+    def fit(self, vectors):
+        self.vectors = sp.csr_matrix(vectors, dtype=np.float32)
+        self.vectors_T = self.vectors.T.tocsr()
+        return self
+
+    def query(self, queries, k=10, exclude=None):
+        scores = (sp.csr_matrix(queries, dtype=np.float32) @ self.vectors_T).toarray()
+        if exclude is not None:
+            scores[np.arange(len(exclude)), exclude] = -np.inf
+        return topk_from_dense(scores, k)
+
+    def query_rows(self, rows, k=10):
+        rows = np.asarray(rows)
+        return self.query(self.vectors[rows], k=k, exclude=rows)
+
+
+#############################################
+# 3. LSH Backend
+#############################################
+
+class LSHBackend:
+    """
+    Random projection LSH (SimHash) ile cosine benzerliği için aday araması.
+
+    Parameters
+    ----------
+    n_tables: int
+        hash tablosu sayısı; arttıkça recall ve sorgu maliyeti artar
+    n_bits: int
+        tablo başına hiperdüzlem sayısı (<= 63); arttıkça bucket'lar küçülür
+    n_probes: int
+        tablo başına ek olarak bakılacak komşu bucket sayısı (multi-probe)
+    random_state: int
+        hiperdüzlemler için seed
+
+    """
+
+    def __init__(self, n_tables=16, n_bits=10, n_probes=4, random_state=42):
+        if not 0 < n_bits <= 63:
+            raise ValueError("n_bits 1 ile 63 arasında olmalı")
+        self.n_tables = n_tables
+        self.n_bits = n_bits
+        self.n_probes = min(n_probes, n_bits)
+        self.random_state = random_state
+
+    def _projections(self, vectors):
+        # (n, n_tables, n_bits) hiperdüzlem projeksiyonları
+        proj = np.asarray(vectors @ self.planes)
+        return proj.reshape(proj.shape[0], self.n_tables, self.n_bits)
+
+    def _codes(self, projections):
+        # (n, n_tables) uint64 bucket anahtarları
+        weights = np.uint64(1) << np.arange(self.n_bits, dtype=np.uint64)
+        return ((projections > 0).astype(np.uint64) * weights).sum(axis=2, dtype=np.uint64)
+
+    def fit(self, vectors):
+        self.vectors = sp.csr_matrix(vectors, dtype=np.float32)
+        rng = np.random.default_rng(self.random_state)
+        self.planes = rng.standard_normal((self.vectors.shape[1], self.n_tables * self.n_bits)).astype(np.float32)
+        codes = self._codes(self._projections(self.vectors))
+        # her tablo için: anahtara göre sıralı satırlar; bir bucket sıralı dizide bir aralıktır
+        self.order = np.argsort(codes, axis=0, kind="stable")
+        self.sorted_codes = np.take_along_axis(codes, self.order, axis=0)
+        return self
+
+    def probe_keys(self, projections):
+        """
+        (n_tables, 1 + n_probes) aranacak anahtarlar.
+
+        Multi-probe: sorgunun hiperdüzleme en yakın olduğu (işareti en belirsiz)
+        n_probes bit tek tek çevrilerek komşu bucket'lara da bakılır; aynı recall
+        için daha az tablo gerekir.
+
+        """
+        codes = self._codes(projections[None])[0]
+        keys = [codes[:, None]]
+        if self.n_probes:
+            closest = np.argsort(np.abs(projections), axis=1)[:, :self.n_probes]
+            keys.append(codes[:, None] ^ (np.uint64(1) << closest.astype(np.uint64)))
+        return np.hstack(keys)
+
+    def candidates(self, keys):
+        found = []
+        for table in range(self.n_tables):
+            sorted_keys = self.sorted_codes[:, table]
+            starts = np.searchsorted(sorted_keys, keys[table], side="left")
+            ends = np.searchsorted(sorted_keys, keys[table], side="right")
+            found.extend(self.order[start:end, table] for start, end in zip(starts, ends))
+        return np.unique(np.concatenate(found))
+
+    def query(self, queries, k=10, exclude=None):
+        queries = sp.csr_matrix(queries, dtype=np.float32)
+        projections = self._projections(queries)
+        indices = np.full((queries.shape[0], k), -1, dtype=np.int32)
+        scores = np.full((queries.shape[0], k), -np.inf, dtype=np.float32)
+        for i in range(queries.shape[0]):
+            candidates = self.candidates(self.probe_keys(projections[i]))
+            if exclude is not None:
+                candidates = candidates[candidates != exclude[i]]
+            if len(candidates) == 0:
+                continue
+            # adaylar tam cosine skoru ile yeniden sıralanır
+            candidate_scores = (self.vectors[candidates] @ queries[i].T).toarray().ravel()
+            top, top_scores = topk_from_dense(candidate_scores[None, :], k)
+            indices[i, :top.shape[1]] = candidates[top[0]]
+            scores[i, :top.shape[1]] = top_scores[0]
+        return indices, scores
+
+    def query_rows(self, rows, k=10):
+        rows = np.asarray(rows)
+        return self.query(self.vectors[rows], k=k, exclude=rows)
+
+
+BACKENDS = {"exact": ExactBackend, "lsh": LSHBackend}
+
+
+def make_backend(name="lsh", **params):
+    return BACKENDS[name](**params)
+
+
+#############################################
+# 4. Recall@k Değerlendirmesi
+#############################################
+
+def recall_at_k(approx_indices, exact_indices):
+    # yaklaşık sonuçların tam sonuçlarla kesişim oranı (sorgu ortalaması)
+    hits = [len(np.intersect1d(a[a >= 0], e[e >= 0])) / max((e >= 0).sum(), 1)
+            for a, e in zip(approx_indices, exact_indices)]
+    return float(np.mean(hits))
+
+
+def evaluate_backend(backend, vectors, k=10, n_queries=200, random_state=42):
+    """
+    backend'i tam arama ile karşılaştırır.
+
+    Returns
+    -------
+    dict
+        recall@k, sorgu başına ortalama süreler (ms) ve build süresi (sn)
+
+    """
+    start = time.perf_counter()
+    backend.fit(vectors)
+    build_sec = time.perf_counter() - start
+    exact = ExactBackend().fit(vectors)
+
+    rng = np.random.default_rng(random_state)
+    rows = rng.choice(vectors.shape[0], size=min(n_queries, vectors.shape[0]), replace=False)
+
+    start = time.perf_counter()
+    exact_indices = np.vstack([exact.query_rows([row], k=k)[0] for row in rows])
+    exact_ms = (time.perf_counter() - start) / len(rows) * 1000
+
+    start = time.perf_counter()
+    approx_indices = np.vstack([backend.query_rows([row], k=k)[0] for row in rows])
+    approx_ms = (time.perf_counter() - start) / len(rows) * 1000
+
+    return {f"recall@{k}": recall_at_k(approx_indices, exact_indices),
+            "exact_ms_per_query": exact_ms,
+            "ann_ms_per_query": approx_ms,
+            "build_sec": build_sec}
+
+
+#############################################
+# 5. Komut Satırı (CLI)
+#############################################
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="ANN backend recall@k / gecikme raporu")
+    parser.add_argument("--kind", choices=("user", "item"), default="user")
+    parser.add_argument("--tables", type=int, default=16)
+    parser.add_argument("--bits", type=int, default=10)
+    parser.add_argument("--probes", type=int, default=4)
+    parser.add_argument("--k", type=int, default=20)
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args(argv)
+
+    user_movie_matrix = load_user_movie_matrix()
+    vectors = user_vectors(user_movie_matrix) if args.kind == "user" else item_vectors(user_movie_matrix)
+    backend = LSHBackend(n_tables=args.tables, n_bits=args.bits, n_probes=args.probes)
+    for key, value in evaluate_backend(backend, vectors, k=args.k, n_queries=args.queries).items():
+        print(f"{key}: {value:.4f}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
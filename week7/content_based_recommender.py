@@ -21,6 +21,7 @@ pd.set_option('display.width', 500)
 pd.set_option('display.expand_frame_repr', False)
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.metrics.pairwise import cosine_similarity
+from content_topk import TopKSimilarity, topk_cosine_sim, topk_for_row
 # https://www.kaggle.com/rounakbanik/the-movies-dataset
 df = pd.read_csv("movies_metadata.csv", low_memory=False)  # DtypeWarning kapamak icin
 df.head()
@@ -90,6 +91,9 @@ def content_based_recommender(title, cosine_sim, dataframe):
     indices = indices[~indices.index.duplicated(keep='last')]
     # title'ın index'ini yakalama
     movie_index = indices[title]
+    # top-k modunda komşular zaten sıralı ve filmin kendisi hariç tutuluyor
+    if isinstance(cosine_sim, TopKSimilarity):
+        return dataframe['title'].iloc[cosine_sim.indices[movie_index][:10]]
     # title'a gore benzerlik skorlarını hesapalama
     similarity_scores = pd.DataFrame(cosine_sim[movie_index], columns=["score"])
     # kendisi haric ilk 10 filmi getirme
@@ -105,16 +109,64 @@ content_based_recommender("The Godfather", cosine_sim, df)
 content_based_recommender('The Dark Knight Rises', cosine_sim, df)
 
 
-def calculate_cosine_sim(dataframe):
+def calculate_cosine_sim(dataframe, top_k=None, block_size=512):
     tfidf = TfidfVectorizer(stop_words='english')
     dataframe['overview'] = dataframe['overview'].fillna('')
     tfidf_matrix = tfidf.fit_transform(dataframe['overview'])
+    # top_k verilirse N x N matris yerine (N, top_k) komşu tablosu bloklar halinde hesaplanır
+    if top_k is not None:
+        return topk_cosine_sim(tfidf_matrix, k=top_k, block_size=block_size)
     cosine_sim = cosine_similarity(tfidf_matrix, tfidf_matrix)
     return cosine_sim
 
 
 cosine_sim = calculate_cosine_sim(df)
 content_based_recommender('The Dark Knight Rises', cosine_sim, df)
+
+# Tüm korpusta N x N matris belleğe sığmaz (~45k film için ~16 GB).
+# top_k modunda bellek N * k ile büyür.
+topk_sim = calculate_cosine_sim(df, top_k=10)
+topk_sim.indices.shape
+content_based_recommender('The Dark Knight Rises', topk_sim, df)
+
+# Tek bir film için anlık (on demand) hesaplama
+movie_index = indices["The Dark Knight Rises"]
+df['title'].iloc[topk_for_row(tfidf_matrix, movie_index, k=10).indices]
 # 1 [90, 12, 23, 45, 67]
 # 2 [90, 12, 23, 45, 67]
 # 3
+
+#################################
+# 5. Kalıcı İndeks ile Çalışma
+#################################
+
+# TF-IDF ve top-k tabloları bir kere oluşturulup diske yazılır:
+# python content_index.py build movies_metadata.csv movies_index --k 10
+# python content_index.py verify movies_index
+# Servis tarafında index memory-map ile açılır, TF-IDF yeniden fit edilmez.
+from content_index import load_content_index
+
+movies_index = load_content_index("movies_index")
+content_based_recommender('The Dark Knight Rises', movies_index.topk, df)
+
+# title -> index sözlüğü bir kere kurulur; sorgu başına sadece sözlük araması yapılır
+from content_index import ContentRecommender
+
+recommender = ContentRecommender.from_index(movies_index)
+recommender.recommend('The Dark Knight Rises')
+recommender.recommend('dark knight rises')  # normalize isim ile eslesme
+recommender.recommend('Sherlok Holmes')  # yazim hatasinda yakin isim eslesmesi
+
+# Toplu (batch) öneri: her blok için tek sparse matris çarpımı ve vektörize top-k
+recommender.recommend_batch(['The Matrix', 'The Godfather', 'Sherlock Holmes'], n=10)
+# python content_index.py bench movies_index --queries 2000 --n-jobs 4
+
+# Kataloğa yeni film eklendiğinde TF-IDF yeniden fit edilmez; sadece yeni filmlerin
+# komşuları hesaplanır ve etkilenen eski filmlerin listeleri güncellenir.
+# python content_index.py add movies_index new_movies.csv --full-csv movies_metadata.csv
+
+# Tekrar eden sorgular için ortak sonuç cache'i (TTL + LRU, hit/miss sayaçları)
+from result_cache import CachedRecommender
+
+cached_recommend = CachedRecommender(recommender.recommend, "content")
+cached_recommend('The Matrix', n=10)
@@ -0,0 +1,578 @@
+#############################
+# Kalıcı (Persisted) Content-Based Benzerlik İndeksi
+#############################
+
+# Her process content_based_recommender'ı çağırmadan önce TF-IDF'i yeniden fit
+# edip benzerlikleri hesaplıyordu. Burada bu işi bir kere yapıp diske yazıyoruz:
+# vocabulary, idf, TF-IDF CSR matrisi ve top-k komşu tabloları.
+# Servis tarafı dosyaları np.load(mmap_mode="r") ile açar; açılış anlıktır ve
+# sayfalar (pages) process'ler arasında paylaşılır. Her build ayrı bir dizine yazılır,
+# geçerli build'i gösteren current dosyası en son atomik olarak değiştirilir.
+
+# 1. İndeksin Oluşturulması
+# 2. İndeksin Diske Yazılması ve Okunması
+# 3. İndeksin Doğrulanması
+# 4. Recommender Nesnesi
+# 5. Artımlı (Incremental) Güncelleme
+# 6. Komut Satırı (CLI)
+
+# Kullanım:
+# python content_index.py build movies_metadata.csv movies_index --k 10
+# python content_index.py verify movies_index
+# python content_index.py bench movies_index --queries 2000 --n-jobs 4
+# python content_index.py add movies_index new_movies.csv --full-csv movies_metadata.csv
+
+import argparse
+import difflib
+import json
+import os
+import re
+import shutil
+import tempfile
+import time
+import unicodedata
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from sklearn.feature_extraction.text import CountVectorizer, TfidfVectorizer
+from sklearn.preprocessing import normalize
+
+from content_topk import TopKSimilarity, topk_cosine_sim, topk_for_row, topk_for_rows, topk_from_dense
+from result_cache import new_model_version, notify_rebuilt
+
+FORMAT_NAME = "content-index"
+FORMAT_VERSION = 1
+# index dizininde geçerli build dizininin adını tutan dosya
+CURRENT_FILE = "current"
+
+# diskteki dosya adı -> ContentIndex üzerindeki dizi
+ARRAY_FILES = {"idf": "idf.npy",
+               "tfidf_data": "tfidf_data.npy",
+               "tfidf_indices": "tfidf_indices.npy",
+               "tfidf_indptr": "tfidf_indptr.npy",
+               "topk_indices": "topk_indices.npy",
+               "topk_scores": "topk_scores.npy"}
+
+
+class ContentIndex:
+    """
+    Fit edilmiş TF-IDF ve top-k komşu tablolarını bir arada tutar.
+
+    Parameters
+    ----------
+    vocabulary: list
+        sütun sırasına göre terimler
+    idf: np.ndarray
+        (V,) idf ağırlıkları
+    tfidf_matrix: scipy.sparse.csr_matrix
+        (N, V) L2 normalize TF-IDF matrisi
+    topk: TopKSimilarity
+        (N, k) komşu indeksleri ve skorları
+    titles: list
+        satır sırasına göre film isimleri
+    n_fitted: int
+        vocabulary ve idf fit edilirken korpusta olan film sayısı;
+        sonradan artımlı eklenen filmler len(index) - n_fitted kadardır
+
+    """
+
+    def __init__(self, vocabulary, idf, tfidf_matrix, topk, titles, stop_words="english", n_fitted=None):
+        self.vocabulary = vocabulary
+        self.idf = idf
+        self.tfidf_matrix = tfidf_matrix
+        self.topk = topk
+        self.titles = titles
+        self.stop_words = stop_words
+        self.n_fitted = tfidf_matrix.shape[0] if n_fitted is None else n_fitted
+        self.model_version = new_model_version()
+
+    @property
+    def k(self):
+        return self.topk.indices.shape[1]
+
+    def __len__(self):
+        return self.tfidf_matrix.shape[0]
+
+    def counter(self):
+        return CountVectorizer(stop_words=self.stop_words,
+                               vocabulary={term: i for i, term in enumerate(self.vocabulary)})
+
+    def transform(self, overviews):
+        # yeni metinleri mevcut vocabulary ve idf ile vektöre çevirme (yeniden fit etmeden)
+        counts = self.counter().transform(pd.Series(overviews).fillna(''))
+        tfidf = counts.astype(np.float64) @ sp.diags(np.asarray(self.idf, dtype=np.float64))
+        return normalize(tfidf, norm="l2").astype(np.float32).tocsr()
+
+
+#################################
+# 1. İndeksin Oluşturulması
+#################################
+
+def build_content_index(dataframe, k=10, block_size=512, stop_words="english"):
+    tfidf = TfidfVectorizer(stop_words=stop_words, dtype=np.float32)
+    overviews = dataframe['overview'].fillna('')
+    tfidf_matrix = tfidf.fit_transform(overviews).tocsr()
+    tfidf_matrix.sort_indices()
+    topk = topk_cosine_sim(tfidf_matrix, k=k, block_size=block_size)
+    notify_rebuilt("content")
+    return ContentIndex(vocabulary=tfidf.get_feature_names_out().tolist(),
+                        idf=tfidf.idf_.astype(np.float32),
+                        tfidf_matrix=tfidf_matrix,
+                        topk=topk,
+                        titles=dataframe['title'].fillna('').astype(str).tolist(),
+                        stop_words=stop_words)
+
+
+#################################
+# 2. İndeksin Diske Yazılması ve Okunması
+#################################
+
+def save_content_index(index, path, keep=2):
+    """
+    İndeksi path altında yeni bir build dizinine yazar.
+
+    Her build ayrı bir dizine (path/build-...) yazılır; tüm dosyalar yazıldıktan sonra
+    path/current dosyası (build dizininin adı) geçici dosya + os.replace ile atomik olarak
+    değiştirilir. Açılışta önce current okunur, böylece bir worker ya tamamen eski ya da
+    tamamen yeni build'i görür; eski build'i memory-map ile açmış worker'lar etkilenmez.
+
+    Parameters
+    ----------
+    keep: int
+        tutulacak build sayısı (current dahil); current'ı yeni okumuş worker'lar için
+        bir önceki build hemen silinmez
+
+    """
+    os.makedirs(path, exist_ok=True)
+    build_path = tempfile.mkdtemp(prefix=time.strftime("build-%Y%m%d%H%M%S-"), dir=path)
+    arrays = {"idf": np.asarray(index.idf, dtype=np.float32),
+              "tfidf_data": np.asarray(index.tfidf_matrix.data, dtype=np.float32),
+              "tfidf_indices": np.asarray(index.tfidf_matrix.indices, dtype=np.int32),
+              # indptr scipy'nin kullandığı dtype ile yazılır, böylece açılışta kopyalanmaz
+              "tfidf_indptr": np.asarray(index.tfidf_matrix.indptr),
+              "topk_indices": np.asarray(index.topk.indices, dtype=np.int32),
+              "topk_scores": np.asarray(index.topk.scores, dtype=np.float32)}
+    for name, file_name in ARRAY_FILES.items():
+        np.save(os.path.join(build_path, file_name), arrays[name])
+    for file_name, values in (("vocabulary.json", index.vocabulary), ("titles.json", list(index.titles))):
+        with open(os.path.join(build_path, file_name), "w", encoding="utf-8") as f:
+            json.dump(values, f, ensure_ascii=False)
+    meta = {"format": FORMAT_NAME,
+            "version": FORMAT_VERSION,
+            "n_docs": len(index),
+            "n_terms": len(index.vocabulary),
+            "n_fitted": index.n_fitted,
+            "k": index.k,
+            "stop_words": index.stop_words,
+            "files": ARRAY_FILES}
+    with open(os.path.join(build_path, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2)
+
+    # son adım: current build'i gösteren dosyanın atomik olarak değiştirilmesi
+    pointer_path = os.path.join(path, CURRENT_FILE)
+    with open(pointer_path + ".tmp", "w", encoding="utf-8") as f:
+        f.write(os.path.basename(build_path))
+    os.replace(pointer_path + ".tmp", pointer_path)
+
+    builds = sorted((name for name in os.listdir(path) if name.startswith("build-")),
+                    key=lambda name: os.path.getmtime(os.path.join(path, name)))
+    for name in builds[:-keep]:
+        if name != os.path.basename(build_path):
+            shutil.rmtree(os.path.join(path, name), ignore_errors=True)
+
+
+def current_build(path):
+    # path/current'ın gösterdiği build dizini; eski (tek dizinli) index'ler için path'in kendisi
+    pointer_path = os.path.join(path, CURRENT_FILE)
+    if not os.path.exists(pointer_path):
+        return path
+    with open(pointer_path, encoding="utf-8") as f:
+        return os.path.join(path, f.read().strip())
+
+
+def read_meta(path):
+    meta_path = os.path.join(path, "meta.json")
+    if not os.path.exists(meta_path):
+        raise FileNotFoundError(f"{path} bir content index dizini değil (meta.json yok)")
+    with open(meta_path, encoding="utf-8") as f:
+        meta = json.load(f)
+    if meta.get("format") != FORMAT_NAME:
+        raise ValueError(f"Beklenmeyen index formatı: {meta.get('format')}")
+    if meta.get("version") != FORMAT_VERSION:
+        raise ValueError(f"Desteklenmeyen index versiyonu: {meta.get('version')} "
+                         f"(beklenen {FORMAT_VERSION}); index'i yeniden build edin")
+    return meta
+
+
+def load_content_index(path, mmap=True):
+    """
+    Diskteki indeksi açar.
+
+    mmap=True iken diziler np.memmap olarak açılır; veri okunana kadar
+    belleğe alınmaz ve aynı dosyayı açan worker'lar sayfaları paylaşır.
+
+    """
+    path = current_build(path)
+    meta = read_meta(path)
+    mmap_mode = "r" if mmap else None
+    arrays = {name: np.load(os.path.join(path, file_name), mmap_mode=mmap_mode)
+              for name, file_name in meta["files"].items()}
+    with open(os.path.join(path, "vocabulary.json"), encoding="utf-8") as f:
+        vocabulary = json.load(f)
+    with open(os.path.join(path, "titles.json"), encoding="utf-8") as f:
+        titles = json.load(f)
+    tfidf_matrix = sp.csr_matrix((arrays["tfidf_data"], arrays["tfidf_indices"], arrays["tfidf_indptr"]),
+                                 shape=(meta["n_docs"], meta["n_terms"]), copy=False)
+    topk = TopKSimilarity(arrays["topk_indices"], arrays["topk_scores"])
+    notify_rebuilt("content")
+    return ContentIndex(vocabulary=vocabulary,
+                        idf=arrays["idf"],
+                        tfidf_matrix=tfidf_matrix,
+                        topk=topk,
+                        titles=titles,
+                        stop_words=meta["stop_words"],
+                        n_fitted=meta.get("n_fitted"))
+
+
+#################################
+# 3. İndeksin Doğrulanması
+#################################
+
+def verify_content_index(index, sample=100, random_state=42, atol=1e-4):
+    # yapısal kontroller + rastgele satırlarda top-k tablosunu yeniden hesaplayıp karşılaştırma
+    n, n_terms = index.tfidf_matrix.shape
+    problems = []
+    if len(index.vocabulary) != n_terms or len(index.idf) != n_terms:
+        problems.append("vocabulary/idf boyutu TF-IDF sütun sayısı ile uyuşmuyor")
+    if len(index.titles) != n or index.topk.indices.shape[0] != n:
+        problems.append("titles/top-k satır sayısı TF-IDF satır sayısı ile uyuşmuyor")
+    if np.any(np.diff(index.tfidf_matrix.indptr) < 0):
+        problems.append("CSR indptr monoton artan değil")
+    if index.topk.indices.size and (index.topk.indices.min() < 0 or index.topk.indices.max() >= n):
+        problems.append("top-k tablosunda geçersiz satır numarası var")
+    if problems:
+        return problems
+
+    rng = np.random.default_rng(random_state)
+    rows = rng.choice(n, size=min(sample, n), replace=False)
+    for row in rows:
+        expected = topk_for_row(index.tfidf_matrix, row, k=index.k)
+        # skor eşitliklerinde (tie) sıra değişebilir, bu yüzden skorları karşılaştırıyoruz
+        if not np.allclose(expected.scores, index.topk.scores[row], atol=atol):
+            problems.append(f"{row}. satırın top-k skorları yeniden hesaplananla uyuşmuyor")
+    return problems
+
+
+#################################
+# 4. Recommender Nesnesi
+#################################
+
+# baştaki veya ("..., The" yazımındaki gibi) sondaki artikel
+ARTICLES = re.compile(r"^(the|a|an) | (the|a|an)$")
+
+
+def normalize_title(title):
+    # "The Dark Knight Rises", "dark knight rises" ve "Dark Knight Rises, The" aynı anahtara düşer
+    title = unicodedata.normalize("NFKD", str(title))
+    title = "".join(ch for ch in title if not unicodedata.combining(ch)).casefold()
+    title = re.sub(r"[^\w\s]", " ", title)
+    title = " ".join(title.split())
+    return ARTICLES.sub("", title)
+
+
+class ContentRecommender:
+    """
+    Title -> satır indeksi sözlüğünü bir kere kurar, sorgu başına sadece
+    sözlük araması ve top-k tablosundan okuma yapar.
+
+    top-k tablosu yoksa (veya n > k ise) skor satırı TF-IDF matrisinden
+    anlık hesaplanır ve tam sıralama yerine np.argpartition kullanılır.
+
+    Parameters
+    ----------
+    titles: list
+        satır sırasına göre film isimleri
+    topk: TopKSimilarity, optional
+        önceden hesaplanmış komşu tablosu
+    tfidf_matrix: scipy.sparse.csr_matrix, optional
+        anlık hesaplama için L2 normalize TF-IDF matrisi
+    fuzzy_cutoff: float
+        normalize isim de bulunamazsa difflib ile yakın isim eşleşmesi eşiği
+
+    """
+
+    def __init__(self, titles, topk=None, tfidf_matrix=None, fuzzy_cutoff=0.85):
+        if topk is None and tfidf_matrix is None:
+            raise ValueError("topk veya tfidf_matrix'ten en az biri verilmeli")
+        self.titles = np.asarray(titles, dtype=object)
+        self.topk = topk
+        self.tfidf_matrix = tfidf_matrix
+        self.fuzzy_cutoff = fuzzy_cutoff
+        # content_based_recommender ile aynı davranış: tekrar eden isimlerde son satır geçerli
+        self.title_index = {title: i for i, title in enumerate(self.titles)}
+        self.normalized_index = {normalize_title(title): i for i, title in enumerate(self.titles)}
+        self._normalized_keys = list(self.normalized_index)
+        self.model_version = new_model_version()
+
+    @classmethod
+    def from_index(cls, index, **kwargs):
+        return cls(index.titles, topk=index.topk, tfidf_matrix=index.tfidf_matrix, **kwargs)
+
+    def lookup(self, title, fuzzy=True):
+        movie_index = self.title_index.get(title)
+        if movie_index is not None:
+            return movie_index
+        key = normalize_title(title)
+        movie_index = self.normalized_index.get(key)
+        if movie_index is not None:
+            return movie_index
+        if fuzzy:
+            matches = difflib.get_close_matches(key, self._normalized_keys, n=1, cutoff=self.fuzzy_cutoff)
+            if matches:
+                return self.normalized_index[matches[0]]
+        raise KeyError(title)
+
+    def recommend_indices(self, title, n=10, fuzzy=True):
+        movie_index = title if isinstance(title, (int, np.integer)) else self.lookup(title, fuzzy=fuzzy)
+        if self.topk is not None and n <= self.topk.indices.shape[1]:
+            return np.asarray(self.topk.indices[movie_index, :n])
+        if self.tfidf_matrix is None:
+            raise ValueError(f"n={n} top-k tablosundaki k'dan büyük ve anlık hesaplama için tfidf_matrix yok")
+        scores = (self.tfidf_matrix[movie_index] @ self.tfidf_matrix.T).toarray().ravel()
+        # kendisi dahil ilk n+1 film, sadece bu n+1 aday sıralanır
+        top = np.argpartition(-scores, min(n, len(scores) - 1))[:n + 1]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return top[top != movie_index][:n]
+
+    def recommend(self, title, n=10, fuzzy=True):
+        return self.titles[self.recommend_indices(title, n=n, fuzzy=fuzzy)]
+
+    def recommend_batch_indices(self, titles, n=10, block_size=512, n_jobs=1, fuzzy=True):
+        """
+        Birden fazla film için önerileri tek seferde hesaplar.
+
+        Parameters
+        ----------
+        titles: list
+            film isimleri veya satır numaraları
+        n: int
+            film başına öneri sayısı
+        block_size: int
+            tek sparse matris çarpımına giren satır sayısı
+        n_jobs: int
+            anlık hesaplamada blokların dağıtılacağı process sayısı
+
+        Returns
+        -------
+        np.ndarray
+            (len(titles), n) öneri satır numaraları
+
+        """
+        rows = np.array([title if isinstance(title, (int, np.integer)) else self.lookup(title, fuzzy=fuzzy)
+                         for title in titles], dtype=np.int64)
+        if self.topk is not None and n <= self.topk.indices.shape[1]:
+            return np.asarray(self.topk.indices[rows, :n])
+        if self.tfidf_matrix is None:
+            raise ValueError(f"n={n} top-k tablosundaki k'dan büyük ve anlık hesaplama için tfidf_matrix yok")
+        return topk_for_rows(self.tfidf_matrix, rows, k=n, block_size=block_size, n_jobs=n_jobs).indices
+
+    def recommend_batch(self, titles, n=10, block_size=512, n_jobs=1, fuzzy=True):
+        return self.titles[self.recommend_batch_indices(titles, n=n, block_size=block_size,
+                                                        n_jobs=n_jobs, fuzzy=fuzzy)]
+
+
+def benchmark_batch(index, n_queries=2000, n=10, block_size=512, n_jobs=1, random_state=42):
+    # döngü ile tek tek anlık hesaplama vs. bloklu batch hesaplama (top-k tablosu kullanılmadan)
+    recommender = ContentRecommender(index.titles, tfidf_matrix=index.tfidf_matrix)
+    rng = np.random.default_rng(random_state)
+    rows = rng.choice(len(index), size=min(n_queries, len(index)), replace=False)
+
+    start = time.perf_counter()
+    looped = np.array([recommender.recommend_indices(int(row), n=n) for row in rows])
+    looped_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batched = recommender.recommend_batch_indices(rows, n=n, block_size=block_size, n_jobs=n_jobs)
+    batched_time = time.perf_counter() - start
+
+    return {"queries": len(rows),
+            "looped_sec": looped_time,
+            "batched_sec": batched_time,
+            "speedup": looped_time / batched_time,
+            # skor eşitliklerinde sıra farklı olabilir, bu yüzden kesişim oranına bakıyoruz
+            "overlap": np.mean([len(np.intersect1d(a, b)) / n for a, b in zip(looped, batched)])}
+
+
+#################################
+# 5. Artımlı (Incremental) Güncelleme
+#################################
+
+# Yeni filmler mevcut vocabulary ve idf ile vektöre çevrilir; sadece yeni satırların
+# komşuları hesaplanır ve yeni filmlerin girdiği eski satırların listeleri güncellenir.
+# idf zamanla kayacağı için (yeni kelimeler, yeni dağılım) RefitPolicy'ye göre
+# belirli aralıklarla tam refit yapılır.
+
+# max_added_ratio: son fit'ten beri eklenen film sayısı / fit edilen film sayısı
+# max_oov_ratio: yeni metinlerde vocabulary dışında kalan kelime oranı
+RefitPolicy = namedtuple("RefitPolicy", ["max_added_ratio", "max_oov_ratio"], defaults=[0.1, 0.3])
+
+
+def oov_ratio(index, overviews):
+    analyzer = index.counter().build_analyzer()
+    vocabulary = set(index.vocabulary)
+    n_tokens = n_oov = 0
+    for overview in pd.Series(overviews).fillna(''):
+        tokens = analyzer(overview)
+        n_tokens += len(tokens)
+        n_oov += sum(token not in vocabulary for token in tokens)
+    return n_oov / n_tokens if n_tokens else 0.0
+
+
+def needs_refit(index, overviews, policy=RefitPolicy()):
+    n_added = len(index) - index.n_fitted + len(overviews)
+    if n_added / max(index.n_fitted, 1) > policy.max_added_ratio:
+        return True
+    return oov_ratio(index, overviews) > policy.max_oov_ratio
+
+
+def add_to_content_index(index, dataframe, block_size=512):
+    """
+    Yeni filmleri refit etmeden index'e ekler.
+
+    Parameters
+    ----------
+    index: ContentIndex
+        mevcut index (memory-map ile açılmış olabilir, değiştirilmez)
+    dataframe: pd.DataFrame
+        'title' ve 'overview' kolonlarını içeren yeni filmler
+    block_size: int
+        eski satırların yeniden sıralanacağı blok boyutu
+
+    Returns
+    -------
+    ContentIndex
+        yeni filmleri içeren index
+
+    """
+    n_old, k = len(index), index.k
+    new_matrix = index.transform(dataframe['overview'])
+    tfidf_matrix = sp.vstack([index.tfidf_matrix, new_matrix], format="csr")
+    new_rows = np.arange(n_old, n_old + new_matrix.shape[0])
+
+    # 1. yeni satırların komşuları (eski + yeni filmler arasında)
+    new_topk = topk_for_rows(tfidf_matrix, new_rows, k=k, block_size=block_size)
+
+    # 2. ters yön: yeni filmlerden biri, eski bir filmin k. komşusundan daha benzerse o satır güncellenir
+    indices = np.array(index.topk.indices)
+    scores = np.array(index.topk.scores)
+    reverse = (index.tfidf_matrix @ new_matrix.T).tocsr()
+    row_max = np.full(n_old, -np.inf, dtype=np.float32)
+    has_score = np.diff(reverse.indptr) > 0
+    row_max[has_score] = reverse.max(axis=1).toarray().ravel()[has_score]
+    affected = np.flatnonzero(row_max > scores[:, -1])
+    for start in range(0, len(affected), block_size):
+        rows = affected[start:start + block_size]
+        candidate_scores = np.hstack([scores[rows], reverse[rows].toarray()])
+        candidate_indices = np.hstack([indices[rows], np.broadcast_to(new_rows, (len(rows), len(new_rows)))])
+        positions, scores[rows] = topk_from_dense(candidate_scores, k)
+        indices[rows] = np.take_along_axis(candidate_indices, positions, axis=1)
+
+    topk = TopKSimilarity(np.vstack([indices, new_topk.indices]), np.vstack([scores, new_topk.scores]))
+    notify_rebuilt("content")
+    return ContentIndex(vocabulary=index.vocabulary,
+                        idf=index.idf,
+                        tfidf_matrix=tfidf_matrix,
+                        topk=topk,
+                        titles=list(index.titles) + dataframe['title'].fillna('').astype(str).tolist(),
+                        stop_words=index.stop_words,
+                        n_fitted=index.n_fitted)
+
+
+def update_content_index(index, dataframe, full_dataframe=None, policy=RefitPolicy(), block_size=512):
+    """
+    RefitPolicy'ye göre ya artımlı ekleme ya da tam refit yapar.
+
+    Tam refit için tüm katalog (eski + yeni filmler) full_dataframe olarak verilmelidir;
+    verilmemişse politika tetiklense bile artımlı ekleme yapılır.
+
+    Returns
+    -------
+    (ContentIndex, bool)
+        güncel index ve tam refit yapılıp yapılmadığı
+
+    """
+    if full_dataframe is not None and needs_refit(index, dataframe['overview'], policy):
+        return build_content_index(full_dataframe, k=index.k, block_size=block_size,
+                                   stop_words=index.stop_words), True
+    return add_to_content_index(index, dataframe, block_size=block_size), False
+
+
+#################################
+# 6. Komut Satırı (CLI)
+#################################
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Content-based recommender için benzerlik indeksi")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    build = subparsers.add_parser("build", help="movies_metadata.csv'den index oluşturur")
+    build.add_argument("csv_path")
+    build.add_argument("index_path")
+    build.add_argument("--k", type=int, default=10)
+    build.add_argument("--block-size", type=int, default=512)
+
+    verify = subparsers.add_parser("verify", help="diskteki index'i doğrular")
+    verify.add_argument("index_path")
+    verify.add_argument("--sample", type=int, default=100)
+
+    bench = subparsers.add_parser("bench", help="döngü ile tek tek sorgu vs. batch sorgu karşılaştırması")
+    bench.add_argument("index_path")
+    bench.add_argument("--queries", type=int, default=2000)
+    bench.add_argument("--n", type=int, default=10)
+    bench.add_argument("--block-size", type=int, default=512)
+    bench.add_argument("--n-jobs", type=int, default=1)
+
+    add = subparsers.add_parser("add", help="yeni filmleri index'e ekler (gerekirse tam refit)")
+    add.add_argument("index_path")
+    add.add_argument("csv_path", help="eklenecek filmler ('title', 'overview')")
+    add.add_argument("--full-csv", help="tam refit gerekirse kullanılacak tüm katalog")
+    add.add_argument("--max-added-ratio", type=float, default=RefitPolicy().max_added_ratio)
+    add.add_argument("--max-oov-ratio", type=float, default=RefitPolicy().max_oov_ratio)
+
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        df = pd.read_csv(args.csv_path, low_memory=False)
+        index = build_content_index(df, k=args.k, block_size=args.block_size)
+        save_content_index(index, args.index_path)
+        print(f"{len(index)} film, {len(index.vocabulary)} terim, k={index.k} -> {args.index_path}")
+        return 0
+
+    index = load_content_index(args.index_path)
+    if args.command == "add":
+        new_df = pd.read_csv(args.csv_path, low_memory=False)
+        full_df = pd.read_csv(args.full_csv, low_memory=False) if args.full_csv else None
+        policy = RefitPolicy(args.max_added_ratio, args.max_oov_ratio)
+        index, refitted = update_content_index(index, new_df, full_dataframe=full_df, policy=policy)
+        save_content_index(index, args.index_path)
+        print(f"{'tam refit' if refitted else 'artımlı ekleme'}: {len(index)} film -> {args.index_path}")
+        return 0
+
+    if args.command == "bench":
+        result = benchmark_batch(index, n_queries=args.queries, n=args.n,
+                                 block_size=args.block_size, n_jobs=args.n_jobs)
+        for key, value in result.items():
+            print(f"{key}: {value:.4f}" if isinstance(value, float) else f"{key}: {value}")
+        return 0
+
+    problems = verify_content_index(index, sample=args.sample)
+    for problem in problems:
+        print(problem)
+    print("OK" if not problems else f"{len(problems)} problem bulundu")
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
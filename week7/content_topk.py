@@ -0,0 +1,188 @@
+#############################
+# Top-k Cosine Similarity (Bellek Dostu Benzerlik)
+#############################
+
+# calculate_cosine_sim tüm korpus için N x N yoğun (dense) bir matris üretir.
+# ~45k film için bu ~16 GB demek. Burada her film için sadece en benzer k
+# filmi tutuyoruz; bellek N*N yerine N*k ile büyür.
+
+# 1. Yardımcı Fonksiyonlar
+# 2. Bloklu Top-k Hesaplama
+# 3. Tek Satır İçin Top-k Hesaplama
+# 4. Toplu (Batch) Top-k Hesaplama
+
+import numpy as np
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from sklearn.preprocessing import normalize
+
+# indices: (N, k) int32 -> benzer filmlerin satır numaraları (kendisi hariç, skora göre azalan)
+# scores: (N, k) float32 -> bu filmlerin cosine similarity skorları
+TopKSimilarity = namedtuple("TopKSimilarity", ["indices", "scores"])
+
+
+#################################
+# 1. Yardımcı Fonksiyonlar
+#################################
+
+def is_l2_normalized(matrix, atol=1e-4, block_rows=65_536):
+    # satır normları blok blok kontrol edilir; geçici bellek bir blok kadardır.
+    # hiç terimi olmayan (norm 0) satırlar normalize da edilemeyeceği için kabul edilir
+    for start in range(0, matrix.shape[0], block_rows):
+        end = min(start + block_rows, matrix.shape[0])
+        counts = np.diff(matrix.indptr[start:end + 1])
+        data = np.asarray(matrix.data[matrix.indptr[start]:matrix.indptr[end]], dtype=np.float64)
+        norms = np.bincount(np.repeat(np.arange(end - start), counts), weights=data ** 2, minlength=end - start)
+        if not np.all((np.abs(norms - 1) <= atol) | (norms == 0)):
+            return False
+    return True
+
+
+def prepare_matrix(tfidf_matrix):
+    # satırları L2 normuna getirince X @ X.T doğrudan cosine similarity olur.
+    # TfidfVectorizer zaten normalize eder ama dışarıdan gelen matrisler için garanti altına alıyoruz.
+    # Diskteki index (float32, normalize) kopyalanmadan kullanılır; memory-map edilmiş sayfalar
+    # process'ler arasında paylaşılmaya devam eder.
+    matrix = tfidf_matrix.tocsr()
+    if matrix.dtype != np.float32:
+        return normalize(matrix.astype(np.float32), norm="l2", copy=False)
+    if is_l2_normalized(matrix):
+        return matrix
+    return normalize(matrix, norm="l2", copy=True)
+
+
+def topk_from_dense(scores, k):
+    """
+    (b, N) yoğun skor bloğundan satır bazında en büyük k skoru seçer.
+
+    Tam sıralama yerine önce np.argpartition ile k aday seçilir, sonra
+    sadece bu k aday sıralanır.
+
+    Parameters
+    ----------
+    scores: np.ndarray
+        (b, N) skor bloğu
+    k: int
+        satır başına tutulacak komşu sayısı
+
+    Returns
+    -------
+    indices, scores: np.ndarray, np.ndarray
+        (b, k) boyutlu, skora göre azalan sıralı
+
+    """
+    k = min(k, scores.shape[1])
+    if k == scores.shape[1]:
+        part = np.tile(np.arange(k), (scores.shape[0], 1))
+    else:
+        part = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    part_scores = np.take_along_axis(scores, part, axis=1)
+    order = np.argsort(-part_scores, axis=1, kind="stable")
+    return (np.take_along_axis(part, order, axis=1).astype(np.int32),
+            np.take_along_axis(part_scores, order, axis=1).astype(np.float32))
+
+
+#################################
+# 2. Bloklu Top-k Hesaplama
+#################################
+
+def topk_cosine_sim(tfidf_matrix, k=10, block_size=512, n_jobs=1):
+    """
+    Tüm filmler için top-k cosine similarity komşularını hesaplar.
+
+    Matris satır blokları halinde çarpılır (block_size x N), her bloktan top-k
+    alınır ve blok atılır. Tepe bellek kullanımı block_size * N * 4 byte'tır.
+
+    Parameters
+    ----------
+    tfidf_matrix: scipy.sparse matrix
+        (N, V) TF-IDF matrisi
+    k: int
+        film başına tutulacak komşu sayısı (film kendisi hariç)
+    block_size: int
+        tek seferde işlenecek satır sayısı
+    n_jobs: int
+        bloklar kaç process'e dağıtılacak
+
+    Returns
+    -------
+    TopKSimilarity
+        (N, k) indices ve scores
+
+    """
+    return topk_for_rows(tfidf_matrix, np.arange(tfidf_matrix.shape[0]), k=k,
+                         block_size=block_size, n_jobs=n_jobs)
+
+
+def _topk_block(X, X_T, rows, k):
+    block = (X[rows] @ X_T).toarray()
+    # filmin kendisini listeden çıkarma
+    block[np.arange(len(rows)), rows] = -np.inf
+    return topk_from_dense(block, k)
+
+
+#################################
+# 3. Tek Satır İçin Top-k Hesaplama
+#################################
+
+def topk_for_row(tfidf_matrix, movie_index, k=10):
+    # tüm matrisi hesaplamadan tek bir film için anlık (on demand) komşu hesaplama
+    X = prepare_matrix(tfidf_matrix)
+    row = (X[movie_index] @ X.T).toarray()
+    row[0, movie_index] = -np.inf
+    indices, scores = topk_from_dense(row, min(k, X.shape[0] - 1))
+    return TopKSimilarity(indices[0], scores[0])
+
+
+#################################
+# 4. Toplu (Batch) Top-k Hesaplama
+#################################
+
+# process pool worker'larında matris bir kere (initializer ile) kurulur
+_worker_matrix = None
+
+
+def _init_worker(X):
+    global _worker_matrix
+    _worker_matrix = (X, X.T.tocsc())
+
+
+def _worker_topk_block(rows, k):
+    X, X_T = _worker_matrix
+    return _topk_block(X, X_T, rows, k)
+
+
+def topk_for_rows(tfidf_matrix, rows, k=10, block_size=512, n_jobs=1):
+    """
+    Verilen satırlar için top-k komşuları hesaplar.
+
+    Her blok için tek bir sparse matris çarpımı ve vektörize bir top-k yapılır.
+    n_jobs > 1 ise bloklar bir ProcessPoolExecutor'a dağıtılır.
+
+    Returns
+    -------
+    TopKSimilarity
+        (len(rows), k) indices ve scores
+
+    """
+    X = prepare_matrix(tfidf_matrix)
+    rows = np.asarray(rows, dtype=np.int64)
+    k = min(k, X.shape[0] - 1)
+    indices = np.empty((len(rows), k), dtype=np.int32)
+    scores = np.empty((len(rows), k), dtype=np.float32)
+    starts = range(0, len(rows), block_size)
+
+    if n_jobs == 1:
+        X_T = X.T.tocsc()
+        for start in starts:
+            end = min(start + block_size, len(rows))
+            indices[start:end], scores[start:end] = _topk_block(X, X_T, rows[start:end], k)
+        return TopKSimilarity(indices, scores)
+
+    with ProcessPoolExecutor(max_workers=n_jobs, initializer=_init_worker, initargs=(X,)) as executor:
+        futures = {start: executor.submit(_worker_topk_block, rows[start:start + block_size], k)
+                   for start in starts}
+        for start, future in futures.items():
+            end = min(start + block_size, len(rows))
+            indices[start:end], scores[start:end] = future.result()
+    return TopKSimilarity(indices, scores)
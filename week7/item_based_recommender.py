@@ -68,20 +68,19 @@ check_film("Insomnia", user_movie_df)
 # Adım 4: Çalışma Scriptinin Hazırlanması
 ######################################
 
-def create_user_movie_df():
-    import pandas as pd
-    movie = pd.read_csv('datasets/movie_lens_dataset/movie.csv')
-    rating = pd.read_csv('datasets/movie_lens_dataset/rating.csv')
-    df = movie.merge(rating, how="left", on="movieId")
-    comment_counts = pd.DataFrame(df["title"].value_counts())
-    rare_movies = comment_counts[comment_counts["title"] <= 1000].index
-    common_movies = df[~df["title"].isin(rare_movies)]
-    user_movie_df = common_movies.pivot_table(index=["userId"], columns=["title"], values="rating")
-    return user_movie_df
-
+# csv'ler compact dtype'larla okunur ve cache'lenir (movielens_io.py)
+from movielens_io import create_user_movie_df
 
 user_movie_df = create_user_movie_df()
 
+# pivot_table yerine sparse matris: bellek kullanıcı x film yerine rating sayısı ile büyür
+from rating_matrix import load_user_movie_matrix
+
+user_movie_matrix = load_user_movie_matrix()
+user_movie_matrix.shape
+user_movie_matrix.memory_usage() / 1024 ** 2  # MB
+user_movie_matrix.check_film("Insomnia")
+
 
 def item_based_recommender(movie_name, user_movie_df):
     movie_name = user_movie_df[movie_name]
@@ -93,3 +92,18 @@ item_based_recommender("Matrix, The (1999)", user_movie_df)
 movie_name = pd.Series(user_movie_df.columns).sample(1).values[0]
 
 item_based_recommender(movie_name, user_movie_df)
+
+# Sorgu anında corrwith yerine offline hesaplanan komşu tablosundan okuma:
+# python item_neighbours.py item_neighbours.npz --k 50 --min-support 50
+from item_neighbours import load_item_neighbours, recommend_similar_items
+
+item_neighbours = load_item_neighbours("item_neighbours.npz")
+recommend_similar_items("Matrix, The (1999)", item_neighbours)
+
+# Aynı film tekrar sorgulandığında sonuç TTL + LRU cache'ten gelir; tablo yeniden
+# oluşturulunca (build_item_neighbours) cache otomatik temizlenir
+from result_cache import RESULT_CACHE, CachedRecommender
+
+cached_similar_items = CachedRecommender(recommend_similar_items, "item")
+cached_similar_items("Matrix, The (1999)", item_neighbours, n=10)
+RESULT_CACHE.metrics()
@@ -0,0 +1,222 @@
+###########################################
+# Item-Item Korelasyon Komşu Tablosu (Offline)
+###########################################
+
+# item_based_recommender her sorguda user_movie_df.corrwith(movie_name) ile tüm
+# filmlerle pairwise NaN Pearson korelasyonu hesaplıyor (sorgu başına saniyeler).
+# Burada tüm film çiftleri için korelasyonu bir kere, sparse matris çarpımlarıyla
+# elde edilen ortak oylama (co-rating) istatistiklerinden hesaplayıp her film için
+# en benzer k filmi saklıyoruz. Sorgu sadece tablodan okuma olur.
+
+# 1. Co-rating İstatistikleri ile Korelasyon
+# 2. Komşu Tablosunun Oluşturulması ve Saklanması
+# 3. Tablodan Öneri
+# 4. Komut Satırı (CLI)
+
+# Kullanım:
+# python item_neighbours.py item_neighbours.npz --k 50 --min-support 50
+
+import argparse
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from content_topk import topk_from_dense
+from movielens_io import MOVIE_PATH, RATING_PATH
+from rating_matrix import load_user_movie_matrix
+from result_cache import new_model_version, notify_rebuilt
+
+# titles: (n_items,) film isimleri
+# indices: (n_items, k) komşu film kodları, eksik komşular -1
+# scores: (n_items, k) korelasyonlar, eksik komşular NaN
+# support: (n_items, k) iki filmi birlikte oylayan kullanıcı sayısı
+# model_version: result_cache anahtarı için; build/load sırasında verilir
+ItemNeighbours = namedtuple("ItemNeighbours", ["titles", "indices", "scores", "support", "model_version"],
+                            defaults=[None])
+
+METHODS = ("pearson", "adjusted_cosine")
+
+
+###########################################
+# 1. Co-rating İstatistikleri ile Korelasyon
+###########################################
+
+# i ve j filmlerini birlikte oylayan kullanıcılar üzerinden (pairwise complete):
+# n    = B_i . B_j           (B: oy verdi mi 0/1)
+# Sx   = R_i . B_j,  Sy  = B_i . R_j
+# Sxx  = R_i^2 . B_j, Syy = B_i . R_j^2
+# Sxy  = R_i . R_j
+# pearson = (n Sxy - Sx Sy) / sqrt((n Sxx - Sx^2) (n Syy - Sy^2))
+# Bunlar film blokları için R^T B benzeri sparse çarpımlarla tek seferde bulunur.
+
+def co_rating_stats(rows_T, R, B, R2, block):
+    # rows_T: satırları karşılaştırılacak vektörler olan CSR'lar (burada R^T, B^T, R2^T);
+    # R, B, R2 ile yer değiştirerek user-user için de kullanılır (user_batch.py)
+    Rt, Bt, R2t = rows_T
+    n = (Bt[block] @ B).toarray()
+    sx = (Rt[block] @ B).toarray()
+    sy = (Bt[block] @ R).toarray()
+    sxx = (R2t[block] @ B).toarray()
+    syy = (Bt[block] @ R2).toarray()
+    sxy = (Rt[block] @ R).toarray()
+    return n, sx, sy, sxx, syy, sxy
+
+
+def pearson_from_stats(n, sx, sy, sxx, syy, sxy):
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cov = n * sxy - sx * sy
+        var = (n * sxx - sx ** 2) * (n * syy - sy ** 2)
+        corr = cov / np.sqrt(var)
+    # kayan nokta hatasıyla oluşan küçük negatif varyansları da geçersiz sayıyoruz
+    corr[~(var > 0)] = np.nan
+    return corr
+
+
+def _adjusted_cosine(n, sx, sy, sxx, syy, sxy):
+    # R kullanıcı ortalamasına göre merkezlenmiş olarak verilir
+    with np.errstate(divide="ignore", invalid="ignore"):
+        denom = np.sqrt(sxx * syy)
+        corr = sxy / denom
+    corr[~(denom > 0)] = np.nan
+    return corr
+
+
+def _rating_parts(user_movie_matrix, method):
+    R = user_movie_matrix.csr.astype(np.float64)
+    if method == "adjusted_cosine":
+        # her rating'den kullanıcının ortalama rating'i çıkarılır
+        user_means = np.asarray(R.sum(axis=1)).ravel() / np.maximum(np.diff(R.indptr), 1)
+        R.data -= np.repeat(user_means, np.diff(R.indptr))
+    B = R.copy()
+    B.data = np.ones_like(B.data)
+    R2 = R.multiply(R).tocsr()
+    rows_T = (R.T.tocsr(), B.T.tocsr(), R2.T.tocsr())
+    return rows_T, R, B, R2
+
+
+def item_correlations(user_movie_matrix, titles, method="pearson"):
+    """
+    Verilen filmlerin tüm filmlerle korelasyonunu ve ortak oylayan kullanıcı sayısını hesaplar.
+
+    corrwith ile aynı şekilde sadece iki filmi birlikte oylayan kullanıcılar kullanılır.
+
+    Returns
+    -------
+    corr, support: np.ndarray, np.ndarray
+        (len(titles), n_items)
+
+    """
+    rows_T, R, B, R2 = _rating_parts(user_movie_matrix, method)
+    block = np.array([user_movie_matrix.item_code(title) for title in titles])
+    stats = co_rating_stats(rows_T, R, B, R2, block)
+    score = pearson_from_stats if method == "pearson" else _adjusted_cosine
+    return score(*stats), stats[0]
+
+
+###########################################
+# 2. Komşu Tablosunun Oluşturulması ve Saklanması
+###########################################
+
+def build_item_neighbours(user_movie_matrix, k=50, min_support=50, method="pearson", block_size=256):
+    """
+    Tüm filmler için en yüksek korelasyonlu k filmi hesaplar.
+
+    Parameters
+    ----------
+    user_movie_matrix: RatingMatrix
+        sparse kullanıcı x film matrisi
+    k: int
+        film başına saklanacak komşu sayısı
+    min_support: int
+        iki filmi birlikte oylayan kullanıcı sayısı bundan azsa korelasyon dikkate alınmaz
+    method: str
+        "pearson" (corrwith ile aynı) veya "adjusted_cosine"
+    block_size: int
+        tek seferde işlenecek film sayısı
+
+    Returns
+    -------
+    ItemNeighbours
+
+    """
+    if method not in METHODS:
+        raise ValueError(f"method {METHODS} değerlerinden biri olmalı: {method}")
+    score = pearson_from_stats if method == "pearson" else _adjusted_cosine
+    rows_T, R, B, R2 = _rating_parts(user_movie_matrix, method)
+    n_items = user_movie_matrix.shape[1]
+    k = min(k, n_items - 1)
+    indices = np.empty((n_items, k), dtype=np.int32)
+    scores = np.empty((n_items, k), dtype=np.float32)
+    support = np.empty((n_items, k), dtype=np.int32)
+
+    for start in range(0, n_items, block_size):
+        block = np.arange(start, min(start + block_size, n_items))
+        stats = co_rating_stats(rows_T, R, B, R2, block)
+        corr = score(*stats)
+        corr[np.arange(len(block)), block] = np.nan  # filmin kendisi
+        corr[stats[0] < min_support] = np.nan
+        block_indices, block_scores = topk_from_dense(np.where(np.isnan(corr), -np.inf, corr), k)
+        block_support = np.take_along_axis(stats[0], block_indices, axis=1)
+        missing = ~np.isfinite(block_scores)
+        block_indices[missing], block_scores[missing], block_support[missing] = -1, np.nan, 0
+        indices[block], scores[block], support[block] = block_indices, block_scores, block_support
+
+    notify_rebuilt("item")
+    return ItemNeighbours(user_movie_matrix.titles, indices, scores, support, new_model_version())
+
+
+def save_item_neighbours(item_neighbours, path):
+    np.savez(path, titles=np.asarray(item_neighbours.titles, dtype=str),
+             indices=item_neighbours.indices, scores=item_neighbours.scores,
+             support=item_neighbours.support)
+
+
+def load_item_neighbours(path):
+    with np.load(path) as f:
+        item_neighbours = ItemNeighbours(f["titles"].astype(object), f["indices"], f["scores"], f["support"],
+                                         new_model_version())
+    notify_rebuilt("item")
+    return item_neighbours
+
+
+###########################################
+# 3. Tablodan Öneri
+###########################################
+
+def recommend_similar_items(movie_name, item_neighbours, n=10, title_index=None):
+    # item_based_recommender'ın tablo okuyan karşılığı; filmin kendisi listede yer almaz
+    if title_index is None:
+        title_index = {title: i for i, title in enumerate(item_neighbours.titles)}
+    code = title_index[movie_name]
+    indices = item_neighbours.indices[code, :n]
+    indices = indices[indices >= 0]
+    return pd.Series(item_neighbours.scores[code, :len(indices)],
+                     index=item_neighbours.titles[indices], name=movie_name)
+
+
+###########################################
+# 4. Komut Satırı (CLI)
+###########################################
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Item-based recommender için komşu tablosu")
+    parser.add_argument("output_path")
+    parser.add_argument("--movie-path", default=MOVIE_PATH)
+    parser.add_argument("--rating-path", default=RATING_PATH)
+    parser.add_argument("--k", type=int, default=50)
+    parser.add_argument("--min-support", type=int, default=50)
+    parser.add_argument("--method", choices=METHODS, default="pearson")
+    parser.add_argument("--block-size", type=int, default=256)
+    args = parser.parse_args(argv)
+
+    user_movie_matrix = load_user_movie_matrix(args.movie_path, args.rating_path)
+    item_neighbours = build_item_neighbours(user_movie_matrix, k=args.k, min_support=args.min_support,
+                                            method=args.method, block_size=args.block_size)
+    save_item_neighbours(item_neighbours, args.output_path)
+    print(f"{len(item_neighbours.titles)} film, k={item_neighbours.indices.shape[1]} -> {args.output_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,231 @@
+#############################################
+# Matrix Factorization (ALS) ile Öneri
+#############################################
+
+# user_based_recommender her sorguda hedef kullanıcı ile adaylar arasındaki
+# korelasyonları hesaplıyor. Burada rating matrisi bir kere R ~ mu + U V^T şeklinde
+# (kullanıcı ve film faktörleri) ayrıştırılır; bir kullanıcıyı skorlamak film
+# faktörleriyle tek bir matris-vektör çarpımı + argpartition ile top-k olur.
+# Eğitim: ALS-WR. Film faktörleri sabitken her kullanıcı için (V_u^T V_u + reg n_u I) x = V_u^T r_u
+# çözülür, sonra roller değişir. Kullanıcı blokları için Gram matrisleri BLAS ile hesaplanır,
+# sistemler np.linalg.solve ile toplu çözülür; bloklar thread'lere dağıtılır
+# (numpy/LAPACK bu sırada GIL'i bırakır).
+# user_based_recommender ile aynı çağrı imzası kullanıldığı için motorlar değiştirilebilir.
+
+# 1. Eğitim Matrisi
+# 2. ALS
+# 3. Modelin Saklanması
+# 4. Öneri
+# 5. Komut Satırı (CLI)
+
+# Kullanım:
+# python mf_recommender.py mf_model.npz --factors 32 --reg 0.05 --iters 10 --n-jobs 4
+
+import argparse
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+from content_topk import topk_from_dense
+from movielens_io import MOVIE_PATH, RATING_PATH
+from rating_store import get_rating_store
+from result_cache import new_model_version, notify_rebuilt
+from user_batch import all_ratings_matrix
+
+# user_ids: (n_users,) satır kodu -> userId
+# movie_ids: (n_items,) sütun kodu -> movieId
+# user_factors: (n_users, n_factors), item_factors: (n_items, n_factors)
+# global_mean: tahmin = global_mean + user_factors[u] @ item_factors[i]
+# model_version: result_cache anahtarı için; eğitim/load sırasında verilir, diske yazılmaz
+MFModel = namedtuple("MFModel", ["user_ids", "movie_ids", "user_factors", "item_factors", "global_mean",
+                                 "model_version"], defaults=[None])
+
+
+#############################################
+# 1. Eğitim Matrisi
+#############################################
+
+def training_matrix(rating_store):
+    # tüm kullanıcılar x movie.csv'deki tüm filmler; user_based_recommender da önerileri
+    # rating.csv'deki tüm filmlerden üretir
+    return all_ratings_matrix(rating_store, rating_store.user_ids).astype(np.float32)
+
+
+#############################################
+# 2. ALS
+#############################################
+
+def _solve_rows(R, other, rows, reg):
+    # R[rows] satırlarının faktörleri; other: diğer taraftaki sabit faktörler
+    sub = R[rows]
+    n_factors = other.shape[1]
+    counts = np.diff(sub.indptr)
+    gram = np.empty((len(rows), n_factors, n_factors), dtype=other.dtype)
+    for i in range(len(rows)):
+        # satırın oyladığı filmlerin faktörleri ile V_u^T V_u (BLAS)
+        V = other[sub.indices[sub.indptr[i]:sub.indptr[i + 1]]]
+        gram[i] = V.T @ V
+    gram += (reg * np.maximum(counts, 1))[:, None, None] * np.eye(n_factors, dtype=other.dtype)
+    rhs = sub @ other
+    return np.linalg.solve(gram, rhs[:, :, None])[:, :, 0]
+
+
+def _als_step(R, other, reg, block_nnz, n_jobs):
+    # satırlar yaklaşık block_nnz rating içeren bloklara bölünür; her blok bir thread görevi
+    bounds = np.searchsorted(R.indptr, np.arange(0, R.nnz, block_nnz), side="right") - 1
+    # baştaki rating'i olmayan satırlar da ilk bloğa girsin; bu satırların çözümü (regülarize) sıfırdır
+    bounds = np.unique(np.r_[0, bounds, R.shape[0]])
+    blocks = [np.arange(start, end) for start, end in zip(bounds[:-1], bounds[1:])]
+    factors = np.zeros((R.shape[0], other.shape[1]), dtype=other.dtype)
+    with ThreadPoolExecutor(max_workers=n_jobs) as executor:
+        for rows, solved in zip(blocks, executor.map(lambda rows: _solve_rows(R, other, rows, reg), blocks)):
+            factors[rows] = solved
+    return factors
+
+
+def rmse(R, user_factors, item_factors, global_mean):
+    rows = np.repeat(np.arange(R.shape[0]), np.diff(R.indptr))
+    pred = global_mean + np.einsum("ij,ij->i", user_factors[rows], item_factors[R.indices])
+    return float(np.sqrt(np.mean((R.data - pred) ** 2)))
+
+
+def fit_als(R, n_factors=32, reg=0.05, n_iters=10, block_nnz=100_000, n_jobs=4, random_state=42, verbose=False):
+    """
+    Sparse rating matrisini ALS-WR ile ayrıştırır.
+
+    Parameters
+    ----------
+    R: scipy.sparse.csr_matrix
+        (n_users, n_items) rating matrisi; sadece dolu hücreler gözlem sayılır
+    n_factors: int
+        gizli faktör sayısı
+    reg: float
+        regularization; her satırda rating sayısı ile ölçeklenir
+    n_iters: int
+        kullanıcı + film adımı tekrar sayısı
+    block_nnz: int
+        bir blokta (ve bir thread görevinde) çözülecek yaklaşık rating sayısı
+    n_jobs: int
+        thread sayısı
+
+    Returns
+    -------
+    user_factors, item_factors, global_mean
+
+    """
+    R = sp.csr_matrix(R, dtype=np.float32)
+    global_mean = float(R.data.mean())
+    # global ortalama çıkarılmış ratingler üzerinde ayrıştırma
+    centered = R.copy()
+    centered.data -= global_mean
+    centered_T = centered.T.tocsr()
+
+    rng = np.random.default_rng(random_state)
+    user_factors = np.zeros((R.shape[0], n_factors), dtype=np.float32)
+    item_factors = (rng.standard_normal((R.shape[1], n_factors)) * 0.1).astype(np.float32)
+    for iteration in range(n_iters):
+        user_factors = _als_step(centered, item_factors, reg, block_nnz, n_jobs)
+        item_factors = _als_step(centered_T, user_factors, reg, block_nnz, n_jobs)
+        if verbose:
+            print(f"iter {iteration + 1}: train rmse {rmse(R, user_factors, item_factors, global_mean):.4f}")
+    return user_factors, item_factors, global_mean
+
+
+def train_mf_model(rating_store=None, n_factors=32, reg=0.05, n_iters=10, n_jobs=4, verbose=False):
+    if rating_store is None:
+        rating_store = get_rating_store()
+    user_factors, item_factors, global_mean = fit_als(training_matrix(rating_store), n_factors=n_factors,
+                                                      reg=reg, n_iters=n_iters, n_jobs=n_jobs, verbose=verbose)
+    notify_rebuilt("mf")
+    return MFModel(rating_store.user_ids, rating_store.movie_table_ids, user_factors, item_factors, global_mean,
+                   new_model_version())
+
+
+#############################################
+# 3. Modelin Saklanması
+#############################################
+
+def save_mf_model(mf_model, path):
+    np.savez(path, **{name: value for name, value in mf_model._asdict().items() if name != "model_version"})
+
+
+def load_mf_model(path):
+    with np.load(path) as f:
+        mf_model = MFModel(f["user_ids"], f["movie_ids"], f["user_factors"], f["item_factors"],
+                           float(f["global_mean"]), new_model_version())
+    notify_rebuilt("mf")
+    return mf_model
+
+
+#############################################
+# 4. Öneri
+#############################################
+
+def predict_user(mf_model, random_user):
+    # kullanıcının tüm filmler için tahmini ratingleri (tek matris-vektör çarpımı)
+    code = np.searchsorted(mf_model.user_ids, random_user)
+    if code == len(mf_model.user_ids) or mf_model.user_ids[code] != random_user:
+        raise KeyError(random_user)
+    return mf_model.global_mean + mf_model.item_factors @ mf_model.user_factors[code]
+
+
+def user_based_recommender(random_user, mf_model, ratio=60, cor_th=0.65, score=3.5, rating_store=None, n=None):
+    """
+    user_neighbours.user_based_recommender ile aynı imza ve çıktı kolonları.
+
+    ratio ve cor_th komşu seçimi olmadığı için kullanılmaz, motorların birbirinin yerine
+    çağrılabilmesi için tutulur. weighted_rating burada modelin tahmini rating'idir.
+    Kullanıcının zaten oyladığı filmler önerilmez.
+
+    Parameters
+    ----------
+    n: int
+        verilirse en yüksek tahminli n film (argpartition ile); verilmezse score'u geçen tümü
+
+    """
+    if rating_store is None:
+        rating_store = get_rating_store()
+    predictions = predict_user(mf_model, random_user).astype(np.float32)
+    _, rated_movie_ids, _ = rating_store.ratings_of([random_user])
+    rated = np.minimum(np.searchsorted(mf_model.movie_ids, rated_movie_ids), len(mf_model.movie_ids) - 1)
+    predictions[rated[mf_model.movie_ids[rated] == rated_movie_ids]] = -np.inf
+    predictions[~(predictions > score)] = -np.inf
+
+    k = int(np.isfinite(predictions).sum()) if n is None else n
+    codes, scores = topk_from_dense(predictions[None, :], k)
+    codes, scores = codes[0][np.isfinite(scores[0])], scores[0][np.isfinite(scores[0])]
+    movie_ids = mf_model.movie_ids[codes]
+    return pd.DataFrame({"movieId": movie_ids,
+                         "weighted_rating": scores,
+                         "title": rating_store.titles_of(movie_ids)})
+
+
+#############################################
+# 5. Komut Satırı (CLI)
+#############################################
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="ALS matrix factorization modelinin eğitilmesi")
+    parser.add_argument("output_path")
+    parser.add_argument("--movie-path", default=MOVIE_PATH)
+    parser.add_argument("--rating-path", default=RATING_PATH)
+    parser.add_argument("--factors", type=int, default=32)
+    parser.add_argument("--reg", type=float, default=0.05)
+    parser.add_argument("--iters", type=int, default=10)
+    parser.add_argument("--n-jobs", type=int, default=4)
+    args = parser.parse_args(argv)
+
+    rating_store = get_rating_store(args.rating_path, args.movie_path)
+    mf_model = train_mf_model(rating_store, n_factors=args.factors, reg=args.reg, n_iters=args.iters,
+                              n_jobs=args.n_jobs, verbose=True)
+    save_mf_model(mf_model, args.output_path)
+    print(f"{len(mf_model.user_ids)} kullanıcı x {len(mf_model.movie_ids)} film, "
+          f"{args.factors} faktör -> {args.output_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
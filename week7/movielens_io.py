@@ -0,0 +1,175 @@
+######################################
+# MovieLens Verisinin Hızlı Okunması (Cache'li)
+######################################
+
+# rating.csv (20M satır) ve movie.csv her seferinde varsayılan dtype'larla
+# (int64 id, float64 rating, object title) okunuyordu. Burada:
+# - id'ler int32, rating'ler float32, title/genres categorical okunur,
+# - sonuç kaynak dosyanın hash'i ile anahtarlanmış .npy kolonları olarak cache'lenir.
+# Sonraki açılışlarda csv parse edilmez, sadece .npy dosyaları okunur.
+# Rating'ler diskte yarım yıldız sayısı olarak uint8 tutulur (3.5 -> 7).
+
+# 1. Cache Anahtarı (Dosya Hash'i)
+# 2. Kolonların Cache'e Yazılması ve Okunması
+# 3. movie.csv ve rating.csv Okuma
+# 4. User Movie Df'inin Oluşturulması
+
+import hashlib
+import json
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+MOVIE_PATH = 'datasets/movie_lens_dataset/movie.csv'
+RATING_PATH = 'datasets/movie_lens_dataset/rating.csv'
+CACHE_VERSION = 1
+
+
+######################################
+# 1. Cache Anahtarı (Dosya Hash'i)
+######################################
+
+def file_hash(path, chunk_size=1 << 20):
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def cache_key(path, cache_dir):
+    # hash hesabı da 20M satırda zaman alır; dosya boyutu ve mtime değişmediyse
+    # daha önce hesaplanan hash kullanılır
+    stat = os.stat(path)
+    index_path = os.path.join(cache_dir, "hashes.json")
+    hashes = {}
+    if os.path.exists(index_path):
+        with open(index_path, encoding="utf-8") as f:
+            hashes = json.load(f)
+    entry = hashes.get(os.path.abspath(path))
+    if entry and entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns:
+        return entry["hash"]
+    digest = file_hash(path)
+    hashes[os.path.abspath(path)] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "hash": digest}
+    with open(index_path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(hashes, f, indent=2)
+    os.replace(index_path + ".tmp", index_path)
+    return digest
+
+
+######################################
+# 2. Kolonların Cache'e Yazılması ve Okunması
+######################################
+
+def save_columns(dataframe, path):
+    # sayısal kolonlar .npy, categorical kolonlar kod (.npy) + kategori listesi (json)
+    tmp_path = path + ".tmp"
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    os.makedirs(tmp_path)
+    meta = {"version": CACHE_VERSION, "columns": {}}
+    for col in dataframe.columns:
+        values = dataframe[col]
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            np.save(os.path.join(tmp_path, f"{col}.npy"), values.cat.codes.to_numpy())
+            meta["columns"][col] = {"kind": "category", "categories": values.cat.categories.tolist()}
+        elif col == "rating":
+            np.save(os.path.join(tmp_path, f"{col}.npy"), np.round(values.to_numpy() * 2).astype(np.uint8))
+            meta["columns"][col] = {"kind": "half_stars"}
+        else:
+            np.save(os.path.join(tmp_path, f"{col}.npy"), values.to_numpy())
+            meta["columns"][col] = {"kind": "numeric"}
+    with open(os.path.join(tmp_path, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def load_columns(path):
+    with open(os.path.join(path, "meta.json"), encoding="utf-8") as f:
+        meta = json.load(f)
+    if meta.get("version") != CACHE_VERSION:
+        return None
+    columns = {}
+    for col, info in meta["columns"].items():
+        values = np.load(os.path.join(path, f"{col}.npy"))
+        if info["kind"] == "category":
+            values = pd.Categorical.from_codes(values, categories=info["categories"])
+        elif info["kind"] == "half_stars":
+            values = values.astype(np.float32) / 2
+        columns[col] = values
+    return pd.DataFrame(columns)
+
+
+def read_cached(path, reader, cache_dir=None, variant=""):
+    """
+    path'teki csv'yi reader ile okur ve sonucu cache_dir altında cache'ler.
+
+    cache_dir verilmezse csv'nin yanındaki .cache klasörü kullanılır.
+    Kaynak dosyanın içeriği değişirse hash değişir ve cache yeniden oluşturulur.
+    Aynı csv farklı kolonlarla okunuyorsa variant ile ayrı cache'lenir.
+
+    """
+    if cache_dir is None:
+        cache_dir = os.path.join(os.path.dirname(os.path.abspath(path)), ".cache")
+    os.makedirs(cache_dir, exist_ok=True)
+    name = os.path.splitext(os.path.basename(path))[0]
+    cached_path = os.path.join(cache_dir, f"{name}{variant}-{cache_key(path, cache_dir)}")
+    if os.path.exists(cached_path):
+        dataframe = load_columns(cached_path)
+        if dataframe is not None:
+            return dataframe
+        # eski cache versiyonu
+        shutil.rmtree(cached_path)
+    dataframe = reader(path)
+    save_columns(dataframe, cached_path)
+    return dataframe
+
+
+######################################
+# 3. movie.csv ve rating.csv Okuma
+######################################
+
+def _read_movie_csv(path):
+    return pd.read_csv(path, usecols=["movieId", "title", "genres"],
+                       dtype={"movieId": np.int32, "title": "category", "genres": "category"})
+
+
+def _read_rating_csv(path):
+    return pd.read_csv(path, usecols=["userId", "movieId", "rating"],
+                       dtype={"userId": np.int32, "movieId": np.int32, "rating": np.float32})
+
+
+def _read_rating_csv_with_timestamp(path):
+    # timestamp epoch saniyesi (int64) olarak tutulur; zamana göre train/test ayırımı için
+    rating = pd.read_csv(path, usecols=["userId", "movieId", "rating", "timestamp"],
+                         dtype={"userId": np.int32, "movieId": np.int32, "rating": np.float32})
+    timestamp = pd.to_datetime(rating["timestamp"])
+    return rating.assign(timestamp=(timestamp - pd.Timestamp(0)) // pd.Timedelta(seconds=1))
+
+
+def read_movies(path=MOVIE_PATH, cache_dir=None):
+    return read_cached(path, _read_movie_csv, cache_dir=cache_dir)
+
+
+def read_ratings(path=RATING_PATH, cache_dir=None, with_timestamp=False):
+    if with_timestamp:
+        return read_cached(path, _read_rating_csv_with_timestamp, cache_dir=cache_dir, variant="-ts")
+    return read_cached(path, _read_rating_csv, cache_dir=cache_dir)
+
+
+######################################
+# 4. User Movie Df'inin Oluşturulması
+######################################
+
+def create_user_movie_df(movie_path=MOVIE_PATH, rating_path=RATING_PATH, min_count=1000):
+    # item_based_recommender ve user_based_recommender'daki kopyaların ortak hali
+    movie = read_movies(movie_path)
+    rating = read_ratings(rating_path)
+    df = movie.merge(rating, how="left", on="movieId")
+    comment_counts = df["title"].value_counts()
+    rare_movies = comment_counts[comment_counts <= min_count].index
+    common_movies = df[~df["title"].isin(rare_movies)]
+    common_movies = common_movies.assign(title=common_movies["title"].astype(str))
+    user_movie_df = common_movies.pivot_table(index=["userId"], columns=["title"], values="rating")
+    return user_movie_df
@@ -0,0 +1,176 @@
+###########################################
+# Sparse User x Item Rating Matrisi
+###########################################
+
+# create_user_movie_df, pivot_table ile 138k kullanıcı x ~3k film boyutunda
+# NaN dolu yoğun (dense) bir float64 DataFrame üretiyor (birkaç GB).
+# Burada aynı veriyi scipy.sparse CSR/CSC olarak tutuyoruz; bellek kullanıcı x film
+# ile değil, rating sayısı ile büyür. Kullanıcılar ve filmler integer kodlanır,
+# orijinal userId ve title'lar lookup tablolarında tutulur.
+# item_based_recommender ve user_based_recommender aynı yapıyı kullanır.
+
+# 1. RatingMatrix Yapısı
+# 2. Rating Verisinden Matrisin Oluşturulması
+# 3. Merkezlenmiş Vektörler
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from sklearn.preprocessing import normalize
+
+from movielens_io import MOVIE_PATH, RATING_PATH
+from result_cache import new_model_version, notify_rebuilt
+
+
+###########################################
+# 1. RatingMatrix Yapısı
+###########################################
+
+class RatingMatrix:
+    """
+    Kullanıcı x film rating matrisi.
+
+    Parameters
+    ----------
+    csr: scipy.sparse.csr_matrix
+        (n_users, n_items) float32 rating matrisi; kullanıcı satırlarına hızlı erişim
+    user_ids: np.ndarray
+        satır kodu -> userId (artan sıralı)
+    titles: np.ndarray
+        sütun kodu -> film ismi (artan sıralı, pivot_table sütunları ile aynı sıra)
+
+    """
+
+    def __init__(self, csr, user_ids, titles):
+        self.csr = csr
+        # film sütunlarına hızlı erişim için aynı verinin CSC kopyası
+        self.csc = csr.tocsc()
+        self.user_ids = np.asarray(user_ids)
+        self.titles = np.asarray(titles, dtype=object)
+        self.title_index = {title: i for i, title in enumerate(self.titles)}
+        self.model_version = new_model_version()
+
+    @property
+    def shape(self):
+        return self.csr.shape
+
+    @property
+    def nnz(self):
+        return self.csr.nnz
+
+    def user_code(self, user_id):
+        code = np.searchsorted(self.user_ids, user_id)
+        if code == len(self.user_ids) or self.user_ids[code] != user_id:
+            raise KeyError(user_id)
+        return int(code)
+
+    def item_code(self, title):
+        return self.title_index[title]
+
+    def user_ratings(self, user_id):
+        # (film kodları, ratingler)
+        row = self.user_code(user_id)
+        start, end = self.csr.indptr[row], self.csr.indptr[row + 1]
+        return self.csr.indices[start:end], self.csr.data[start:end]
+
+    def item_ratings(self, title):
+        # (kullanıcı kodları, ratingler)
+        col = self.item_code(title)
+        start, end = self.csc.indptr[col], self.csc.indptr[col + 1]
+        return self.csc.indices[start:end], self.csc.data[start:end]
+
+    def check_film(self, keyword):
+        return [title for title in self.titles if keyword in title]
+
+    def to_dataframe(self, user_ids=None):
+        # küçük alt kümeler için pivot_table çıktısı ile aynı görünümde yoğun DataFrame
+        rows = np.arange(self.shape[0]) if user_ids is None else [self.user_code(u) for u in user_ids]
+        sub = self.csr[rows]
+        dense = np.full(sub.shape, np.nan, dtype=np.float32)
+        dense[sub.nonzero()] = sub.data
+        return pd.DataFrame(dense, index=pd.Index(self.user_ids[rows], name="userId"),
+                            columns=pd.Index(self.titles, name="title"))
+
+    def memory_usage(self):
+        return sum(a.nbytes for m in (self.csr, self.csc) for a in (m.data, m.indices, m.indptr))
+
+
+###########################################
+# 2. Rating Verisinden Matrisin Oluşturulması
+###########################################
+
+def create_user_movie_matrix(movie, rating, min_count=1000):
+    """
+    create_user_movie_df'in sparse karşılığı.
+
+    Aynı filtre uygulanır: movie ile left merge sonrasında title sayısı min_count'tan
+    büyük olan filmler tutulur. Aynı isimli birden fazla movieId varsa pivot_table'da
+    olduğu gibi kullanıcının bu filmlere verdiği ratinglerin ortalaması alınır.
+
+    Parameters
+    ----------
+    movie: pd.DataFrame
+        'movieId', 'title'
+    rating: pd.DataFrame
+        'userId', 'movieId', 'rating'
+    min_count: int
+        bu sayıdan az ya da eşit yorumu olan filmler çıkarılır
+
+    Returns
+    -------
+    RatingMatrix
+
+    """
+    title_codes, titles = pd.factorize(movie["title"])
+    movie_pos = pd.Index(movie["movieId"]).get_indexer(rating["movieId"])
+    known = movie_pos >= 0
+    rating_title = title_codes[movie_pos[known]]
+
+    # left merge'de hiç rating'i olmayan filmler de bir satır (NaN) olarak sayılıyordu
+    movie_has_rating = np.bincount(movie_pos[known], minlength=len(movie)) > 0
+    counts = np.bincount(rating_title, minlength=len(titles))
+    counts += np.bincount(title_codes[~movie_has_rating], minlength=len(titles))
+
+    # tutulan filmler isim sırasına göre yeniden kodlanır (pivot_table sütun sırası)
+    keep = np.flatnonzero(counts > min_count)
+    keep = keep[np.argsort(np.asarray(titles)[keep], kind="stable")]
+    item_map = np.full(len(titles), -1, dtype=np.int64)
+    item_map[keep] = np.arange(len(keep))
+    items = item_map[rating_title]
+    mask = items >= 0
+
+    user_ids, users = np.unique(rating["userId"].to_numpy()[known][mask], return_inverse=True)
+    items = items[mask]
+    values = rating["rating"].to_numpy(dtype=np.float32)[known][mask]
+    shape = (len(user_ids), len(keep))
+
+    # tekrar eden (kullanıcı, film) çiftleri toplanır ve sayıya bölünür (ortalama)
+    sums = sp.csr_matrix((values, (users, items)), shape=shape, dtype=np.float32)
+    counts = sp.csr_matrix((np.ones(len(values), dtype=np.float32), (users, items)), shape=shape)
+    sums.sum_duplicates()
+    counts.sum_duplicates()
+    if counts.data.max(initial=1) > 1:
+        sums.data /= counts.data
+    notify_rebuilt("item")
+    notify_rebuilt("user")
+    return RatingMatrix(sums, user_ids, np.asarray(titles)[keep])
+
+
+def load_user_movie_matrix(movie_path=MOVIE_PATH, rating_path=RATING_PATH, min_count=1000):
+    # csv'ler process içinde bir kere okunur; matris paylaşılan store'dan üretilir
+    from rating_store import get_rating_store
+    return get_rating_store(rating_path, movie_path).user_movie_matrix(min_count=min_count)
+
+
+###########################################
+# 3. Merkezlenmiş Vektörler
+###########################################
+
+def center_rows(R):
+    # her satırdan satırın (sadece dolu hücreler) ortalaması çıkarılır ve satır L2 normalize edilir:
+    # iki satırın çarpımı merkezlenmiş cosine, yani Pearson'ın tüm sütunlar üzerinden yaklaşığıdır
+    R = R.astype(np.float32).tocsr()
+    counts = np.diff(R.indptr)
+    means = np.asarray(R.sum(axis=1)).ravel() / np.maximum(counts, 1)
+    R.data -= np.repeat(means, counts).astype(np.float32)
+    return normalize(R, norm="l2", copy=False)
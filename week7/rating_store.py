@@ -0,0 +1,115 @@
+#############################################
+# Rating Verisine Erişim Katmanı (Kullanıcıya Göre İndeksli)
+#############################################
+
+# user_based_recommender her çağrıda rating.csv (20M satır) ve movie.csv'yi
+# yeniden okuyor, sadece en benzer kullanıcıların ratinglerini almak için.
+# Burada ratingler bir kere okunup userId'ye göre sıralı kolonlar halinde tutulur.
+# CSR offset'leri (indptr) sayesinde "şu kullanıcıların tüm ratingleri" bir slice olur.
+# get_rating_store aynı dosyalar için process içinde tek bir store döndürür;
+# böylece çağrılar ve recommender modülleri aynı veriyi paylaşır.
+
+# 1. RatingStore Yapısı
+# 2. Paylaşılan Store
+
+import os
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from movielens_io import MOVIE_PATH, RATING_PATH, read_movies, read_ratings
+from rating_matrix import create_user_movie_matrix
+
+
+#############################################
+# 1. RatingStore Yapısı
+#############################################
+
+class RatingStore:
+    """
+    userId'ye göre sıralı kolonlar: user i'nin ratingleri
+    movie_ids[indptr[i]:indptr[i + 1]] ve ratings[indptr[i]:indptr[i + 1]].
+
+    Parameters
+    ----------
+    rating: pd.DataFrame
+        'userId', 'movieId', 'rating'
+    movie: pd.DataFrame
+        'movieId', 'title'
+
+    """
+
+    def __init__(self, rating, movie):
+        order = np.argsort(rating["userId"].to_numpy(), kind="stable")
+        user_col = rating["userId"].to_numpy()[order]
+        self.movie_ids = rating["movieId"].to_numpy()[order]
+        self.ratings = rating["rating"].to_numpy(dtype=np.float32)[order]
+        self.user_ids, starts = np.unique(user_col, return_index=True)
+        self.indptr = np.append(starts, len(user_col))
+
+        movie = movie.sort_values("movieId")
+        self.movie_table_ids = movie["movieId"].to_numpy()
+        self.movie_titles = movie["title"].to_numpy(dtype=object)
+        self.movie = movie[["movieId", "title"]].reset_index(drop=True)
+        self._matrices = {}
+
+    def __len__(self):
+        return len(self.ratings)
+
+    def user_slices(self, user_ids):
+        user_ids = np.asarray(user_ids)
+        codes = np.searchsorted(self.user_ids, user_ids)
+        codes = np.minimum(codes, len(self.user_ids) - 1)
+        found = self.user_ids[codes] == user_ids
+        return codes[found], found
+
+    def ratings_of(self, user_ids):
+        """
+        Verilen kullanıcıların tüm ratinglerini döndürür.
+
+        Returns
+        -------
+        positions, movie_ids, ratings: np.ndarray
+            positions: her rating'in user_ids içindeki sırası
+            (olmayan kullanıcılar atlanır)
+
+        """
+        codes, found = self.user_slices(user_ids)
+        starts, ends = self.indptr[codes], self.indptr[codes + 1]
+        lengths = ends - starts
+        # slice'ları tek seferde birleştirme: her rating'in global pozisyonu
+        offsets = np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+        idx = offsets + np.arange(lengths.sum())
+        positions = np.repeat(np.flatnonzero(found), lengths)
+        return positions, self.movie_ids[idx], self.ratings[idx]
+
+    def titles_of(self, movie_ids):
+        codes = np.searchsorted(self.movie_table_ids, movie_ids)
+        codes = np.minimum(codes, len(self.movie_table_ids) - 1)
+        return np.where(self.movie_table_ids[codes] == movie_ids, self.movie_titles[codes], None)
+
+    def user_movie_matrix(self, min_count=1000):
+        # aynı store'dan üretilen sparse matris de paylaşılır
+        if min_count not in self._matrices:
+            rating = pd.DataFrame({"userId": np.repeat(self.user_ids, np.diff(self.indptr)),
+                                   "movieId": self.movie_ids,
+                                   "rating": self.ratings})
+            self._matrices[min_count] = create_user_movie_matrix(self.movie, rating, min_count=min_count)
+        return self._matrices[min_count]
+
+
+#############################################
+# 2. Paylaşılan Store
+#############################################
+
+@lru_cache(maxsize=None)
+def _cached_rating_store(rating_path, movie_path):
+    # csv'ler compact dtype'larla okunur ve dosya hash'ine göre cache'lenir
+    return RatingStore(read_ratings(rating_path), read_movies(movie_path))
+
+
+def get_rating_store(rating_path=RATING_PATH, movie_path=MOVIE_PATH):
+    # lru_cache çağrı şekline göre anahtarlar; get_rating_store() ile
+    # get_rating_store(RATING_PATH, MOVIE_PATH) aynı store'u döndürsün diye yollar çözülür
+    return _cached_rating_store(os.path.abspath(rating_path), os.path.abspath(movie_path))
@@ -0,0 +1,378 @@
+#############################################
+# Recommender'ların Offline Değerlendirilmesi ve Benchmark
+#############################################
+
+# week7 motorları (content, item, user, mf ve popülerlik baseline'ı) aynı train/test
+# ayrımı üzerinde çalıştırılır ve kalite ile hız birlikte raporlanır:
+# - kalite: precision@k, recall@k, NDCG@k (test'te relevant_rating ve üstü oylanan filmler ilgili sayılır),
+# - hız: build süresi, sorgu başına p50/p99 gecikme, process'in peak RSS'i.
+# Split'ler (zamana göre / leave-one-out), kullanıcı örneklemi ve sentetik veri seed ile
+# tekrarlanabilir. Gerçek veri seti yoksa sentetik MovieLens benzeri veri üretilir.
+
+# 1. Sentetik Veri
+# 2. Train / Test Ayrımı
+# 3. Metrikler
+# 4. Motor Adaptörleri
+# 5. Değerlendirme
+# 6. Komut Satırı (CLI)
+
+# Kullanım:
+# python recommender_eval.py --synthetic --engines popular item user mf content --split loo --k 10
+# python recommender_eval.py --split time --users 500 --metadata-path datasets/movies_metadata.csv --output eval.csv
+
+import argparse
+import multiprocessing
+import resource
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from content_index import ContentRecommender, build_content_index
+from item_neighbours import build_item_neighbours, recommend_similar_items
+from mf_recommender import train_mf_model
+from mf_recommender import user_based_recommender as mf_user_based_recommender
+from movielens_io import MOVIE_PATH, RATING_PATH, read_movies, read_ratings
+from rating_store import RatingStore
+from user_neighbours import user_based_recommender
+
+GENRES = ("Action", "Comedy", "Drama", "Horror", "Romance", "Sci-Fi", "Thriller", "Animation")
+
+
+#############################################
+# 1. Sentetik Veri
+#############################################
+
+def make_synthetic_movielens(n_users=2000, n_items=500, mean_ratings=60, n_factors=len(GENRES), seed=42):
+    """
+    MovieLens şemasında sentetik veri üretir.
+
+    Kullanıcı ve film gizli faktörlerinden ratingler, film popülerliğinden (Zipf) hangi
+    filmlerin oylandığı, filmin baskın faktöründen türü ve tür kelimelerinden overview'i
+    türetilir; böylece content, item, user ve mf motorlarının hepsi bir sinyal bulur.
+
+    Returns
+    -------
+    movie, rating: pd.DataFrame, pd.DataFrame
+        movie: 'movieId', 'title', 'genres', 'overview'
+        rating: 'userId', 'movieId', 'rating', 'timestamp'
+
+    """
+    rng = np.random.default_rng(seed)
+    user_factors = rng.standard_normal((n_users, n_factors))
+    item_factors = rng.standard_normal((n_items, n_factors)) * 0.6
+    item_bias = rng.normal(0, 0.4, n_items)
+    popularity = 1 / np.arange(1, n_items + 1) ** 0.8
+    popularity = rng.permutation(popularity / popularity.sum())
+
+    counts = np.clip(rng.lognormal(np.log(mean_ratings), 0.6, n_users).astype(int), 5, n_items)
+    users = np.repeat(np.arange(n_users), counts)
+    items = np.concatenate([rng.choice(n_items, size=count, replace=False, p=popularity) for count in counts])
+    raw = 3.4 + item_bias[items] + np.einsum("ij,ij->i", user_factors[users], item_factors[items]) / 2
+    raw += rng.normal(0, 0.5, len(raw))
+    ratings = np.clip(np.round(raw * 2) / 2, 0.5, 5.0).astype(np.float32)
+    timestamps = 946684800 + np.sort(rng.integers(0, 15 * 365 * 86400, len(raw)))
+    timestamps = timestamps[rng.permutation(len(raw))]
+
+    genre = np.argmax(item_factors[:, :len(GENRES)], axis=1)
+    vocabulary = {name: [f"{name.lower()}{i}" for i in range(30)] for name in GENRES}
+    common = [f"word{i}" for i in range(200)]
+    overviews = [" ".join(rng.choice(vocabulary[GENRES[g]], 12).tolist() + rng.choice(common, 8).tolist())
+                 for g in genre]
+    movie = pd.DataFrame({"movieId": np.arange(1, n_items + 1, dtype=np.int32),
+                          "title": [f"Movie {i} ({1950 + i % 70})" for i in range(1, n_items + 1)],
+                          "genres": [GENRES[g] for g in genre],
+                          "overview": overviews})
+    rating = pd.DataFrame({"userId": (users + 1).astype(np.int32),
+                           "movieId": (items + 1).astype(np.int32),
+                           "rating": ratings,
+                           "timestamp": timestamps})
+    return movie, rating
+
+
+#############################################
+# 2. Train / Test Ayrımı
+#############################################
+
+def time_split(rating, test_ratio=0.2):
+    # timestamp'in (1 - test_ratio) quantile'ından sonraki tüm ratingler test
+    cutoff = np.quantile(rating["timestamp"], 1 - test_ratio)
+    test = rating["timestamp"] > cutoff
+    return rating[~test].reset_index(drop=True), rating[test].reset_index(drop=True)
+
+
+def leave_one_out_split(rating, seed=42):
+    # her kullanıcının son (timestamp yoksa rastgele) rating'i test; tek rating'i olan kullanıcılar train'de kalır
+    rng = np.random.default_rng(seed)
+    order_key = rating["timestamp"].to_numpy() if "timestamp" in rating else rng.random(len(rating))
+    order = np.lexsort((rng.random(len(rating)), order_key, rating["userId"].to_numpy()))
+    users = rating["userId"].to_numpy()[order]
+    last = np.append(users[1:] != users[:-1], True)
+    first = np.insert(users[1:] != users[:-1], 0, True)
+    test = np.zeros(len(rating), dtype=bool)
+    test[order[last & ~first]] = True
+    return rating[~test].reset_index(drop=True), rating[test].reset_index(drop=True)
+
+
+SPLITS = {"time": time_split, "loo": leave_one_out_split}
+
+
+#############################################
+# 3. Metrikler
+#############################################
+
+def precision_at_k(recommended, relevant, k=10):
+    return len(set(recommended[:k]) & relevant) / k
+
+
+def recall_at_k(recommended, relevant, k=10):
+    return len(set(recommended[:k]) & relevant) / len(relevant) if relevant else 0.0
+
+
+def ndcg_at_k(recommended, relevant, k=10):
+    # ikili ilgililik: ilgili film için 1 / log2(sıra + 1)
+    gains = [1 / np.log2(rank + 2) for rank, movie_id in enumerate(recommended[:k]) if movie_id in relevant]
+    ideal = sum(1 / np.log2(rank + 2) for rank in range(min(len(relevant), k)))
+    return sum(gains) / ideal if ideal else 0.0
+
+
+#############################################
+# 4. Motor Adaptörleri
+#############################################
+
+# Her motor: fit(train, movie) ve recommend(user_id, n) -> movieId listesi.
+# Kullanıcının train'de oyladığı filmler değerlendirmede ayrıca çıkarıldığı için
+# motorlardan n'den fazla aday istenir.
+
+def seed_movies(train):
+    # item ve content motorları için: kullanıcının en yüksek puan verdiği en güncel film
+    keys = ["rating", "timestamp"] if "timestamp" in train else ["rating"]
+    return train.sort_values(keys, kind="stable").groupby("userId")["movieId"].last()
+
+
+class PopularEngine:
+    name = "popular"
+
+    def fit(self, train, movie, **params):
+        counts = train.groupby("movieId")["rating"].agg(["count", "mean"])
+        self.ranked = counts[counts["mean"] >= 3.5].sort_values("count", ascending=False).index.to_numpy()
+        return self
+
+    def recommend(self, user_id, n=10):
+        return self.ranked[:n]
+
+
+class ItemEngine:
+    name = "item"
+
+    def fit(self, train, movie, min_count=1000, k=50, min_support=50, **params):
+        self.seeds = seed_movies(train)
+        self.item_neighbours = build_item_neighbours(RatingStore(train, movie).user_movie_matrix(min_count=min_count),
+                                                     k=k, min_support=min_support)
+        self.title_index = {title: i for i, title in enumerate(self.item_neighbours.titles)}
+        self.movie_of_title = dict(zip(movie["title"].astype(str), movie["movieId"]))
+        self.title_of_movie = dict(zip(movie["movieId"], movie["title"].astype(str)))
+        return self
+
+    def recommend(self, user_id, n=10):
+        title = self.title_of_movie.get(self.seeds[user_id])
+        if title not in self.title_index:
+            return np.array([], dtype=np.int64)
+        similar = recommend_similar_items(title, self.item_neighbours, n=n, title_index=self.title_index)
+        return np.array([self.movie_of_title[title] for title in similar.index])
+
+
+class ContentEngine:
+    name = "content"
+
+    def fit(self, train, movie, k=50, **params):
+        # movie'de 'overview' olmalı (sentetik veri veya movies_metadata ile eşleştirilmiş movie)
+        self.seeds = seed_movies(train)
+        catalog = movie.dropna(subset=["overview"]).reset_index(drop=True)
+        self.recommender = ContentRecommender.from_index(build_content_index(catalog, k=k))
+        self.row_of_movie = pd.Series(np.arange(len(catalog)), index=catalog["movieId"])
+        self.movie_ids = catalog["movieId"].to_numpy()
+        return self
+
+    def recommend(self, user_id, n=10):
+        movie_id = self.seeds[user_id]
+        if movie_id not in self.row_of_movie.index:
+            return np.array([], dtype=np.int64)
+        row = int(self.row_of_movie[movie_id])
+        return self.movie_ids[self.recommender.recommend_indices(row, n=n)]
+
+
+class UserEngine:
+    name = "user"
+
+    def fit(self, train, movie, min_count=1000, ratio=60, cor_th=0.65, score=3.5, **params):
+        self.store = RatingStore(train, movie)
+        self.matrix = self.store.user_movie_matrix(min_count=min_count)
+        self.params = {"ratio": ratio, "cor_th": cor_th, "score": score}
+        return self
+
+    def recommend(self, user_id, n=10):
+        recommendations = user_based_recommender(user_id, self.matrix, rating_store=self.store, **self.params)
+        return recommendations["movieId"].to_numpy()[:n]
+
+
+class MFEngine:
+    name = "mf"
+
+    def fit(self, train, movie, n_factors=32, n_iters=10, n_jobs=4, **params):
+        self.store = RatingStore(train, movie)
+        self.model = train_mf_model(self.store, n_factors=n_factors, n_iters=n_iters, n_jobs=n_jobs)
+        return self
+
+    def recommend(self, user_id, n=10):
+        recommendations = mf_user_based_recommender(user_id, self.model, score=-np.inf,
+                                                    rating_store=self.store, n=n)
+        return recommendations["movieId"].to_numpy()
+
+
+ENGINES = {engine.name: engine for engine in (PopularEngine, ContentEngine, ItemEngine, UserEngine, MFEngine)}
+
+
+#############################################
+# 5. Değerlendirme
+#############################################
+
+def peak_rss_mb():
+    # Linux'ta ru_maxrss KB cinsindendir
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def evaluate_engine(name, train, test, movie, k=10, n_users=200, relevant_rating=4.0, seed=42, **params):
+    """
+    Tek bir motoru eğitir ve örneklenen test kullanıcıları üzerinde değerlendirir.
+
+    Returns
+    -------
+    dict
+        engine, build_sec, p50_ms, p99_ms, peak_rss_mb, precision@k, recall@k, ndcg@k, users
+
+    """
+    start = time.perf_counter()
+    engine = ENGINES[name]().fit(train, movie, **params)
+    build_sec = time.perf_counter() - start
+
+    relevant = test[test["rating"] >= relevant_rating].groupby("userId")["movieId"].agg(set)
+    relevant = relevant[relevant.index.isin(train["userId"].unique())]
+    rng = np.random.default_rng(seed)
+    users = rng.choice(relevant.index.to_numpy(), size=min(n_users, len(relevant)), replace=False)
+    seen = train[train["userId"].isin(users)].groupby("userId")["movieId"].agg(set)
+
+    latencies, precisions, recalls, ndcgs = [], [], [], []
+    for user_id in users:
+        start = time.perf_counter()
+        try:
+            candidates = engine.recommend(user_id, n=k + len(seen[user_id]))
+        except KeyError:
+            # kullanıcı motorun matrisinde yok (ör. min_count filtresi)
+            candidates = np.array([], dtype=np.int64)
+        latencies.append(time.perf_counter() - start)
+        recommended = [movie_id for movie_id in candidates.tolist() if movie_id not in seen[user_id]][:k]
+        precisions.append(precision_at_k(recommended, relevant[user_id], k))
+        recalls.append(recall_at_k(recommended, relevant[user_id], k))
+        ndcgs.append(ndcg_at_k(recommended, relevant[user_id], k))
+
+    latencies = np.array(latencies) * 1000
+    return {"engine": name,
+            "build_sec": build_sec,
+            "p50_ms": float(np.percentile(latencies, 50)) if len(latencies) else np.nan,
+            "p99_ms": float(np.percentile(latencies, 99)) if len(latencies) else np.nan,
+            "peak_rss_mb": peak_rss_mb(),
+            f"precision@{k}": float(np.mean(precisions)) if precisions else np.nan,
+            f"recall@{k}": float(np.mean(recalls)) if recalls else np.nan,
+            f"ndcg@{k}": float(np.mean(ndcgs)) if ndcgs else np.nan,
+            "users": len(users)}
+
+
+def run_benchmark(movie, rating, engines=("popular", "item", "user", "mf"), split="loo", k=10, n_users=200,
+                  relevant_rating=4.0, seed=42, isolate=False, **params):
+    """
+    Aynı split üzerinde motorları sırayla değerlendirir.
+
+    isolate=True ise her motor ayrı (spawn) bir process'te çalışır; peak RSS o motorun
+    kendi bellek tepe noktası olur. Aksi halde RSS process'in o ana kadarki tepe noktasıdır.
+
+    Returns
+    -------
+    pd.DataFrame
+        motor başına bir satır; split, seed ve k kolonlarıyla
+
+    """
+    split_params = {"seed": seed} if split == "loo" else {}
+    train, test = SPLITS[split](rating, **split_params)
+    eval_params = dict(k=k, n_users=n_users, relevant_rating=relevant_rating, seed=seed, **params)
+    rows = []
+    for name in engines:
+        if isolate:
+            context = multiprocessing.get_context("spawn")
+            with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+                rows.append(executor.submit(evaluate_engine, name, train, test, movie, **eval_params).result())
+        else:
+            rows.append(evaluate_engine(name, train, test, movie, **eval_params))
+    return pd.DataFrame(rows).assign(split=split, seed=seed, k=k)
+
+
+def attach_overviews(movie, metadata):
+    # movies_metadata.csv isimleri yılsız ("Toy Story"), MovieLens isimleri yıllı ("Toy Story (1995)")
+    key = movie["title"].astype(str).str.replace(r"\s*\(\d{4}\)\s*$", "", regex=True).str.strip()
+    overviews = metadata.dropna(subset=["title"]).drop_duplicates("title").set_index("title")["overview"]
+    return movie.assign(overview=key.map(overviews).to_numpy())
+
+
+#############################################
+# 6. Komut Satırı (CLI)
+#############################################
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="week7 recommender'larının offline değerlendirmesi")
+    parser.add_argument("--synthetic", action="store_true", help="gerçek veri yerine sentetik veri üret")
+    parser.add_argument("--synthetic-users", type=int, default=2000)
+    parser.add_argument("--synthetic-items", type=int, default=500)
+    parser.add_argument("--movie-path", default=MOVIE_PATH)
+    parser.add_argument("--rating-path", default=RATING_PATH)
+    parser.add_argument("--metadata-path", help="content motoru için overview içeren movies_metadata.csv")
+    parser.add_argument("--engines", nargs="+", choices=sorted(ENGINES), default=["popular", "item", "user", "mf"])
+    parser.add_argument("--split", choices=sorted(SPLITS), default="loo")
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--relevant-rating", type=float, default=4.0)
+    parser.add_argument("--min-count", type=int, help="varsayılan: gerçek veride 1000, sentetikte 20")
+    parser.add_argument("--min-support", type=int, default=50)
+    parser.add_argument("--cor-th", type=float, default=0.65)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--isolate", action="store_true", help="her motoru ayrı process'te çalıştır")
+    parser.add_argument("--output", help="sonuçların yazılacağı csv")
+    args = parser.parse_args(argv)
+
+    if args.synthetic:
+        movie, rating = make_synthetic_movielens(args.synthetic_users, args.synthetic_items, seed=args.seed)
+        min_count = 20 if args.min_count is None else args.min_count
+        min_support = min(args.min_support, 10)
+    else:
+        movie = read_movies(args.movie_path)
+        movie = movie.assign(title=movie["title"].astype(str))
+        rating = read_ratings(args.rating_path, with_timestamp=True)
+        if args.metadata_path:
+            metadata = pd.read_csv(args.metadata_path, usecols=["title", "overview"], low_memory=False)
+            movie = attach_overviews(movie, metadata)
+        elif "content" in args.engines:
+            parser.error("gerçek veride content motoru için --metadata-path gerekli")
+        min_count = 1000 if args.min_count is None else args.min_count
+        min_support = args.min_support
+
+    results = run_benchmark(movie, rating, engines=args.engines, split=args.split, k=args.k, n_users=args.users,
+                            relevant_rating=args.relevant_rating, seed=args.seed, isolate=args.isolate,
+                            min_count=min_count, min_support=min_support, cor_th=args.cor_th)
+    print(results.to_string(index=False, float_format=lambda x: f"{x:.4f}"))
+    if args.output:
+        results.to_csv(args.output, index=False)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,223 @@
+#############################################
+# Öneri Sonuçları İçin Ortak Cache (TTL + LRU)
+#############################################
+
+# Popüler filmler ve aktif kullanıcılar için item_based, content_based ve user_based
+# recommender'lar aynı sorguyu tekrar tekrar baştan hesaplıyor. Burada sonuçlar
+# (engine, model versiyonu, sorgu, parametreler) anahtarıyla saklanır:
+# - boyut sınırlı LRU: en uzun süredir kullanılmayan sonuç atılır,
+# - TTL: süresi dolan sonuç okunurken atılır ve yeniden hesaplanır,
+# - hit/miss/expired/eviction sayaçları engine bazında tutulur,
+# - her model (matris, index, komşu tablosu, MF modeli) build/load sırasında process içinde
+#   tekrar kullanılmayan bir model_version alır; anahtara id() yerine bu girer,
+# - matris veya index yeniden oluşturulduğunda (build/refit) notify_rebuilt(engine)
+#   çağrılır; engine'in versiyonu artar ve eski sonuçlar tüm cache'lerden silinir.
+
+# 1. ResultCache
+# 2. Yeniden Oluşturma Bildirimi
+# 3. Recommender Fonksiyonlarının Sarılması
+
+import inspect
+import itertools
+import threading
+import time
+import weakref
+from collections import Counter, OrderedDict, namedtuple
+
+import numpy as np
+
+ENGINES = ("content", "item", "user", "mf")
+
+_Entry = namedtuple("_Entry", ["value", "expires"])
+
+_model_versions = itertools.count(1)
+
+
+def new_model_version():
+    # id() serbest kalan nesnelerin kimliğini yeniden kullanabilir; bu sayaç hiç tekrar etmez
+    return next(_model_versions)
+
+
+def model_version(model):
+    # build/load sırasında verilmiş versiyon; verilmemişse nesneye ilk görüldüğü anda yenisi atanır
+    if model is None:
+        return None
+    version = getattr(model, "model_version", None)
+    if version is None:
+        try:
+            version = model.model_version = new_model_version()
+        except AttributeError:
+            raise TypeError(f"{type(model).__name__} nesnesinin model_version'ı yok; "
+                            f"build/load sırasında new_model_version() ile verilmeli") from None
+    return version
+
+
+def _freeze(value):
+    # sorgu ve parametreleri hash'lenebilir anahtara çevirir
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, (list, tuple, np.ndarray)):
+        return tuple(_freeze(v) for v in value)
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    return value
+
+
+#############################################
+# 1. ResultCache
+#############################################
+
+class ResultCache:
+    """
+    Thread-safe TTL + LRU sonuç cache'i.
+
+    Parameters
+    ----------
+    maxsize: int
+        tutulacak en fazla sonuç sayısı
+    ttl: float
+        saniye cinsinden sonuç ömrü; None ise süresiz
+    clock: callable
+        zaman kaynağı (varsayılan time.monotonic)
+
+    """
+
+    def __init__(self, maxsize=1024, ttl=3600, clock=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.clock = clock
+        self._entries = OrderedDict()
+        self._versions = Counter()
+        self._counts = Counter()
+        self._lock = threading.Lock()
+        _caches.add(self)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def version(self, engine):
+        return self._versions[engine]
+
+    def key(self, engine, query, model=None, **params):
+        # modelin versiyonu da anahtara girer: aynı engine farklı matrislerle (ör. min_count) kullanılabilir
+        return (engine, self._versions[engine], model_version(model), _freeze(query), _freeze(params))
+
+    def get(self, key):
+        # (bulundu mu, değer)
+        engine = key[0]
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._counts[engine, "misses"] += 1
+                return False, None
+            if entry.expires is not None and entry.expires <= self.clock():
+                del self._entries[key]
+                self._counts[engine, "expired"] += 1
+                self._counts[engine, "misses"] += 1
+                return False, None
+            self._entries.move_to_end(key)
+            self._counts[engine, "hits"] += 1
+            return True, entry.value
+
+    def put(self, key, value):
+        engine = key[0]
+        with self._lock:
+            if key[1] != self._versions[engine]:
+                # hesaplama sürerken engine yeniden oluşturuldu; eski sonuç saklanmaz
+                return
+            expires = None if self.ttl is None else self.clock() + self.ttl
+            self._entries[key] = _Entry(value, expires)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                evicted, _ = self._entries.popitem(last=False)
+                self._counts[evicted[0], "evictions"] += 1
+
+    def invalidate(self, engine=None):
+        # engine verilirse sadece onun sonuçları, verilmezse tümü silinir; versiyon artar
+        with self._lock:
+            engines = ENGINES if engine is None else (engine,)
+            for name in engines:
+                self._versions[name] += 1
+            stale = [key for key in self._entries if key[0] in engines]
+            for key in stale:
+                del self._entries[key]
+            for name in engines:
+                self._counts[name, "invalidations"] += 1
+            return len(stale)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def metrics(self):
+        """
+        Engine bazında sayaçlar.
+
+        Returns
+        -------
+        dict
+            {engine: {"hits", "misses", "expired", "evictions", "invalidations", "size", "hit_rate"}}
+
+        """
+        with self._lock:
+            sizes = Counter(key[0] for key in self._entries)
+            result = {}
+            for engine in sorted({engine for engine, _ in self._counts} | set(sizes)):
+                row = {event: self._counts[engine, event]
+                       for event in ("hits", "misses", "expired", "evictions", "invalidations")}
+                row["size"] = sizes[engine]
+                lookups = row["hits"] + row["misses"]
+                row["hit_rate"] = row["hits"] / lookups if lookups else 0.0
+                result[engine] = row
+            return result
+
+
+#############################################
+# 2. Yeniden Oluşturma Bildirimi
+#############################################
+
+_caches = weakref.WeakSet()
+
+
+def notify_rebuilt(engine):
+    # matrisi/index'i yeniden oluşturan fonksiyonlar çağırır; process'teki tüm cache'ler temizlenir
+    for cache in list(_caches):
+        cache.invalidate(engine)
+
+
+RESULT_CACHE = ResultCache()
+
+
+#############################################
+# 3. Recommender Fonksiyonlarının Sarılması
+#############################################
+
+class CachedRecommender:
+    """
+    func(query, model, **params) şeklindeki bir recommender'ı cache'ler.
+
+    Örnek:
+    user_based = CachedRecommender(user_neighbours.user_based_recommender, "user")
+    user_based(random_user, user_movie_matrix, cor_th=0.70, score=4)
+
+    Dönen DataFrame/Series'in kopyası verilir; çağıran tarafın değişiklikleri cache'i bozmaz.
+
+    """
+
+    def __init__(self, func, engine, cache=None):
+        self.func = func
+        self.engine = engine
+        self.cache = RESULT_CACHE if cache is None else cache
+        # varsayılan değerle verilen ve hiç verilmeyen parametreler aynı anahtarı üretir
+        self.defaults = {name: p.default for name, p in inspect.signature(func).parameters.items()
+                         if p.default is not inspect.Parameter.empty}
+
+    def __call__(self, query, model=None, **params):
+        # bound method'larda (ör. ContentRecommender.recommend) model, metodun nesnesidir
+        owner = model if model is not None else getattr(self.func, "__self__", None)
+        key = self.cache.key(self.engine, query, owner, **{**self.defaults, **params})
+        found, value = self.cache.get(key)
+        if not found:
+            value = self.func(query, model, **params) if model is not None else self.func(query, **params)
+            self.cache.put(key, value)
+        return value.copy() if hasattr(value, "copy") else value
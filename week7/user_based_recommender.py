@@ -17,17 +17,10 @@ pd.set_option('display.max_columns', None)
 pd.set_option('display.width', 500)
 pd.set_option('display.expand_frame_repr', False)
 
-def create_user_movie_df():
-    movie = pd.read_csv('datasets/movie.csv')
-    rating = pd.read_csv('datasets/rating.csv')
-    df = movie.merge(rating, how="left", on="movieId")
-    comment_counts = pd.DataFrame(df["title"].value_counts())
-    rare_movies = comment_counts[comment_counts["title"] <= 1000].index
-    common_movies = df[~df["title"].isin(rare_movies)]
-    user_movie_df = common_movies.pivot_table(index=["userId"], columns=["title"], values="rating")
-    return user_movie_df
+# csv'ler compact dtype'larla okunur ve cache'lenir (movielens_io.py)
+from movielens_io import create_user_movie_df, read_movies, read_ratings
 
-user_movie_df = create_user_movie_df()
+user_movie_df = create_user_movie_df('datasets/movie.csv', 'datasets/rating.csv')
 
 random_user = int(pd.Series(user_movie_df.index).sample(1, random_state=45).values)
 
@@ -101,7 +94,7 @@ top_users = top_users.sort_values(by='corr', ascending=False)
 top_users.rename(columns={"user_id_2": "userId"}, inplace=True)
 
 
-rating = pd.read_csv('datasets/rating.csv')
+rating = read_ratings('datasets/rating.csv')
 top_users_ratings = top_users.merge(rating[["userId", "movieId", "rating"]], how='inner')
 
 top_users_ratings = top_users_ratings[top_users_ratings["userId"] != random_user]
@@ -123,7 +116,7 @@ recommendation_df[recommendation_df["weighted_rating"] > 3.5]
 
 movies_to_be_recommend = recommendation_df[recommendation_df["weighted_rating"] > 3.5].sort_values("weighted_rating", ascending=False)
 
-movie = pd.read_csv('datasets/movie_lens_dataset/movie.csv')
+movie = read_movies()
 movies_to_be_recommend.merge(movie[["movieId", "title"]])
 
 
@@ -132,19 +125,15 @@ movies_to_be_recommend.merge(movie[["movieId", "title"]])
 # Adım 6: Çalışmanın Fonksiyonlaştırılması
 #############################################
 
-def create_user_movie_df():
-    import pandas as pd
-    movie = pd.read_csv('datasets/movie_lens_dataset/movie.csv')
-    rating = pd.read_csv('datasets/movie_lens_dataset/rating.csv')
-    df = movie.merge(rating, how="left", on="movieId")
-    comment_counts = pd.DataFrame(df["title"].value_counts())
-    rare_movies = comment_counts[comment_counts["title"] <= 1000].index
-    common_movies = df[~df["title"].isin(rare_movies)]
-    user_movie_df = common_movies.pivot_table(index=["userId"], columns=["title"], values="rating")
-    return user_movie_df
-
 user_movie_df = create_user_movie_df()
 
+# pivot_table yerine sparse matris: bellek kullanıcı x film yerine rating sayısı ile büyür
+from rating_matrix import load_user_movie_matrix
+
+user_movie_matrix = load_user_movie_matrix()
+user_movie_matrix.shape
+user_movie_matrix.user_ratings(random_user)
+
 # perc = len(movies_watched) * 60 / 100
 # users_same_movies = user_movie_count[user_movie_count["movie_count"] > perc]["userId"]
 
@@ -173,7 +162,7 @@ def user_based_recommender(random_user, user_movie_df, ratio=60, cor_th=0.65, sc
 
     top_users = top_users.sort_values(by='corr', ascending=False)
     top_users.rename(columns={"user_id_2": "userId"}, inplace=True)
-    rating = pd.read_csv('datasets/movie_lens_dataset/rating.csv')
+    rating = read_ratings()
     top_users_ratings = top_users.merge(rating[["userId", "movieId", "rating"]], how='inner')
     top_users_ratings['weighted_rating'] = top_users_ratings['corr'] * top_users_ratings['rating']
 
@@ -181,7 +170,7 @@ def user_based_recommender(random_user, user_movie_df, ratio=60, cor_th=0.65, sc
     recommendation_df = recommendation_df.reset_index()
 
     movies_to_be_recommend = recommendation_df[recommendation_df["weighted_rating"] > score].sort_values("weighted_rating", ascending=False)
-    movie = pd.read_csv('datasets/movie_lens_dataset/movie.csv')
+    movie = read_movies()
     return movies_to_be_recommend.merge(movie[["movieId", "title"]])
 
 
@@ -190,3 +179,42 @@ random_user = int(pd.Series(user_movie_df.index).sample(1).values)
 user_based_recommender(random_user, user_movie_df, cor_th=0.70, score=4)
 
 
+
+
+# Sadece hedef kullanıcı ile adaylar arasındaki korelasyonlar hesaplanır (N x N corr yok)
+# En benzer kullanıcıların ratingleri her çağrıda rating.csv okunmadan paylaşılan store'dan alınır
+import user_neighbours
+
+user_neighbours.top_similar_users(user_movie_matrix, random_user, cor_th=0.70)
+user_neighbours.user_based_recommender(random_user, user_movie_matrix, cor_th=0.70, score=4)
+
+# Tüm kullanıcılar için gecelik toplu öneri (bloklar halinde, process pool ile, csv/parquet'e akıtarak):
+# python user_batch.py user_recommendations.parquet --n-jobs 4 --block-size 256
+# similarity="pearson" user_based_recommender ile aynı korelasyonu kullanır.
+
+# Benzer kullanıcı/film araması için değiştirilebilir ANN backend'i (exact veya LSH):
+import ann
+
+lsh = ann.LSHBackend(n_tables=16, n_bits=10, n_probes=4).fit(ann.user_vectors(user_movie_matrix))
+neighbours, sims = lsh.query_rows([user_movie_matrix.user_code(random_user)], k=20)
+# recall@k / gecikme raporu: python ann.py --kind user --tables 16 --bits 10 --probes 4
+
+# Aynı imzayla matrix factorization (ALS) motoru: skorlama tek matris-vektör çarpımı
+# python mf_recommender.py mf_model.npz --factors 32 --iters 10 --n-jobs 4
+import mf_recommender
+
+mf_model = mf_recommender.load_mf_model("mf_model.npz")
+for engine, model in ((user_neighbours, user_movie_matrix), (mf_recommender, mf_model)):
+    engine.user_based_recommender(random_user, model, cor_th=0.70, score=4)
+
+# Aktif kullanıcılar için sonuç cache'i; rating matrisi yeniden oluşturulunca temizlenir
+from result_cache import RESULT_CACHE, CachedRecommender
+
+cached_user_based = CachedRecommender(user_neighbours.user_based_recommender, "user")
+cached_user_based(random_user, user_movie_matrix, cor_th=0.70, score=4)
+RESULT_CACHE.metrics()
+
+# Motorların kalite (precision/recall/NDCG@k) ve hız (p50/p99, peak RSS, build) karşılaştırması;
+# veri seti yoksa --synthetic ile sentetik MovieLens verisi üretilir:
+# python recommender_eval.py --synthetic --engines popular item user mf content --split loo --k 10
+# python recommender_eval.py --split time --users 500 --isolate --output eval.csv
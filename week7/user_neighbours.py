@@ -0,0 +1,105 @@
+#############################################
+# Hedef Kullanıcı Odaklı User-Based Komşu Arama
+#############################################
+
+# user_based_recommender, aday kullanıcıların hepsi için final_df.T.corr() ile
+# N x N korelasyon matrisi hesaplayıp tüm çiftleri unstack/sort ediyor, sonra
+# sadece hedef kullanıcının satırını kullanıyor. Burada sadece hedef kullanıcı ile
+# adaylar arasındaki korelasyonlar, sparse matris-vektör çarpımlarıyla hesaplanır.
+# En benzer kullanıcıların ratingleri paylaşılan RatingStore'dan okunur.
+
+# 1. Hedef Kullanıcı ile Pairwise Complete Pearson
+# 2. Weighted Average Recommendation Score
+
+import numpy as np
+import pandas as pd
+
+from rating_store import get_rating_store
+
+
+#############################################
+# 1. Hedef Kullanıcı ile Pairwise Complete Pearson
+#############################################
+
+def target_user_correlations(user_movie_matrix, random_user, ratio=60):
+    """
+    Hedef kullanıcı ile izlediği filmlerin ratio yüzdesinden fazlasını izleyen
+    kullanıcılar arasındaki Pearson korelasyonunu hesaplar.
+
+    Hedef kullanıcı izlediği tüm filmleri oyladığı için ortak filmler, aday kullanıcının
+    bu filmlerden oyladıklarıdır. final_df.T.corr() ile aynı pairwise complete korelasyon
+    co-rating toplamlarından bulunur.
+
+    Parameters
+    ----------
+    user_movie_matrix: RatingMatrix
+        sparse kullanıcı x film matrisi
+    random_user: int
+        hedef userId
+    ratio: int
+        aday olmak için ortak izlenmesi gereken film yüzdesi
+
+    Returns
+    -------
+    pd.DataFrame
+        'userId', 'corr', 'movie_count' (hedef kullanıcı hariç)
+
+    """
+    watched, target = user_movie_matrix.user_ratings(random_user)
+    target = target.astype(np.float64)
+    # ortak film sayıları: sadece izlenen filmlerin CSC sütunlarındaki kullanıcılar sayılır
+    counts = np.bincount(user_movie_matrix.csc[:, watched].indices, minlength=user_movie_matrix.shape[0])
+    perc = len(watched) * ratio / 100
+    candidates = np.flatnonzero(counts > perc)
+    candidates = candidates[candidates != user_movie_matrix.user_code(random_user)]
+
+    sub = user_movie_matrix.csr[candidates][:, watched].astype(np.float64).tocsr()
+    present = sub.copy()
+    present.data = np.ones_like(present.data)
+    n = counts[candidates].astype(np.float64)
+    sx = present @ target
+    sxx = present @ target ** 2
+    sy = np.asarray(sub.sum(axis=1)).ravel()
+    syy = np.asarray(sub.multiply(sub).sum(axis=1)).ravel()
+    sxy = sub @ target
+    with np.errstate(divide="ignore", invalid="ignore"):
+        corr = (n * sxy - sx * sy) / np.sqrt((n * sxx - sx ** 2) * (n * syy - sy ** 2))
+
+    return pd.DataFrame({"userId": user_movie_matrix.user_ids[candidates],
+                         "corr": corr,
+                         "movie_count": counts[candidates]}).dropna(subset=["corr"])
+
+
+def top_similar_users(user_movie_matrix, random_user, ratio=60, cor_th=0.65):
+    corr_df = target_user_correlations(user_movie_matrix, random_user, ratio=ratio)
+    top_users = corr_df[corr_df["corr"] >= cor_th][["userId", "corr"]]
+    return top_users.sort_values(by="corr", ascending=False).reset_index(drop=True)
+
+
+#############################################
+# 2. Weighted Average Recommendation Score
+#############################################
+
+def user_based_recommender(random_user, user_movie_matrix, ratio=60, cor_th=0.65, score=3.5, rating_store=None):
+    """
+    user_based_recommender'ın sparse karşılığı.
+
+    En benzer kullanıcıların ratingleri her çağrıda rating.csv okunmadan,
+    paylaşılan RatingStore'dan slice olarak alınır; weighted_rating ortalaması
+    bincount ile film bazında toplanır.
+
+    """
+    if rating_store is None:
+        rating_store = get_rating_store()
+    top_users = top_similar_users(user_movie_matrix, random_user, ratio=ratio, cor_th=cor_th)
+    positions, movie_ids, ratings = rating_store.ratings_of(top_users["userId"].to_numpy())
+    weighted = top_users["corr"].to_numpy()[positions] * ratings
+
+    movie_codes, movie_ids = pd.factorize(movie_ids, sort=True)
+    weighted_rating = np.bincount(movie_codes, weights=weighted) / np.bincount(movie_codes)
+    recommendation_df = pd.DataFrame({"movieId": movie_ids, "weighted_rating": weighted_rating})
+
+    movies_to_be_recommend = recommendation_df[recommendation_df["weighted_rating"] > score].sort_values(
+        "weighted_rating", ascending=False)
+    movies_to_be_recommend["title"] = rating_store.titles_of(movies_to_be_recommend["movieId"].to_numpy())
+    return movies_to_be_recommend.dropna(subset=["title"]).reset_index(drop=True)